@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+class Overloaded(Exception):
+    """The queue in front of scoring is full; the request was not admitted."""
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before scoring finished."""
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """Raise ``DeadlineExceeded`` if ``deadline`` (a ``time.monotonic()`` value) has passed.
+
+    Scoring functions call this before starting, so work that waited too
+    long in a thread pool queue is dropped instead of run for nobody.
+    """
+    if deadline is not None and time.monotonic() > deadline:
+        raise DeadlineExceeded()
+
+
+class AdmissionController:
+    """Bound concurrent scoring calls and the queue waiting for them.
+
+    At most ``max_concurrency`` calls run at once and ``max_queue`` more wait
+    for a slot. Anything beyond that fails at once with ``Overloaded``, so
+    latency under overload is bounded by the queue instead of growing with the
+    backlog. With ``timeout_s``, a request that is still waiting or scoring at
+    its deadline gets ``DeadlineExceeded`` right away. Its work is not
+    cancelled (a scoring thread cannot be stopped), but keeps its slot until it
+    ends, so overrunning calls still count against the limit. Work that has
+    not started yet should skip itself with ``check_deadline``.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, timeout_s: float = 0.0) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if max_queue < 0:
+            raise ValueError("max_queue cannot be negative.")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout_s = max(timeout_s, 0.0)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_s": self.timeout_s,
+            "active": self.active,
+            "waiting": self.waiting,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+    async def run(self, work: Callable[[Optional[float]], Awaitable[Any]]) -> Any:
+        """Await ``work(deadline)`` once a slot is free.
+
+        ``deadline`` is a ``time.monotonic()`` value, or None without a
+        timeout, for ``work`` to pass on to ``check_deadline``.
+        """
+        deadline = time.monotonic() + self.timeout_s if self.timeout_s else None
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            raise Overloaded()
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._remaining(deadline))
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise DeadlineExceeded() from None
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        task = asyncio.ensure_future(work(deadline))
+        task.add_done_callback(self._release)
+        try:
+            # shield: neither the deadline nor a client disconnect frees the
+            # slot before the work has really finished.
+            return await asyncio.wait_for(asyncio.shield(task), self._remaining(deadline))
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise DeadlineExceeded() from None
+        except DeadlineExceeded:
+            self.timed_out += 1
+            raise
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+    def _release(self, task: asyncio.Future) -> None:
+        self.active -= 1
+        self._slots.release()
+        if not task.cancelled():
+            # Mark the exception retrieved when nobody awaits the task any more.
+            task.exception()
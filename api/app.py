@@ -1,36 +1,546 @@
+import asyncio
+import hashlib
+import os
+import secrets
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, ConfigDict
 
-from src.inference import predict_with_probability_from_payload, load_model
+from api.admission import AdmissionController, DeadlineExceeded, Overloaded, check_deadline
+from api.batching import MicroBatcher
+from src import metrics
+from src.drift_monitor import DriftMonitor, load_reference_profile
+from src.inference import (
+    load_compiled_model,
+    load_model,
+    payload_schema,
+    predict_batch,
+    predict_with_probability_from_payload,
+)
+from src.prediction_cache import LocalBackend, PredictionCache, RedisBackend
+from src.prediction_log import PredictionLogger
 
-app = FastAPI()
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-MODEL_PATH = PROJECT_ROOT / "models" / "model.pkl"
+MODEL_PATH = Path(os.getenv("RIDE_API_MODEL_PATH", PROJECT_ROOT / "models" / "model.pkl"))
+COMPILED_MODEL_PATH = Path(
+    os.getenv("RIDE_API_COMPILED_MODEL_PATH", PROJECT_ROOT / "models" / "model_compiled.npz")
+)
+# Serve with the array-backed scorer exported by train.py instead of the pickle.
+USE_COMPILED_MODEL = os.getenv("RIDE_API_COMPILED_MODEL", "0") == "1"
+# Map model arrays read-only from disk so that uvicorn workers share them
+# through the page cache instead of each holding a private copy.
+MODEL_MMAP_MODE = "r" if os.getenv("RIDE_API_MMAP", "0") == "1" else None
+# Load and warm up the model at startup rather than on the first request.
+EAGER_MODEL_LOAD = os.getenv("RIDE_API_EAGER_LOAD", "1") == "1"
+MAX_BATCH_ROWS = 10_000
+# Micro-batching of concurrent /predict calls; a window of 0 ms disables it.
+BATCH_WINDOW_MS = float(os.getenv("RIDE_API_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_ROWS = int(os.getenv("RIDE_API_BATCH_MAX_ROWS", "64"))
+# Load shedding: at most MAX_CONCURRENCY scoring calls run at once and
+# MAX_QUEUE more wait; further requests get 503 with Retry-After. 0 disables
+# the limiter. REQUEST_TIMEOUT_S abandons a request still waiting or scoring
+# after that long (504); 0 means no deadline.
+MAX_CONCURRENCY = int(os.getenv("RIDE_API_MAX_CONCURRENCY", "0"))
+MAX_QUEUE = int(os.getenv("RIDE_API_MAX_QUEUE", "64"))
+REQUEST_TIMEOUT_S = float(os.getenv("RIDE_API_REQUEST_TIMEOUT_S", "0"))
+RETRY_AFTER_S = int(os.getenv("RIDE_API_RETRY_AFTER_S", "1"))
+# Poll the model file's mtime and hot-reload on change; 0 disables the watcher.
+RELOAD_INTERVAL_S = float(os.getenv("RIDE_API_RELOAD_INTERVAL_S", "0"))
+# When set, POST /admin/reload requires a matching X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("RIDE_API_ADMIN_TOKEN")
+# /predict result cache; a size of 0 disables it. With a Redis URL the entries
+# are shared by all workers instead of held per process.
+CACHE_SIZE = int(os.getenv("RIDE_API_CACHE_SIZE", "0"))
+CACHE_TTL_S = float(os.getenv("RIDE_API_CACHE_TTL_S", "30"))
+CACHE_REDIS_URL = os.getenv("RIDE_API_CACHE_REDIS_URL")
+# Streaming drift monitor over the last N scored rows; 0 disables it.
+DRIFT_REFERENCE_PATH = Path(
+    os.getenv("RIDE_API_DRIFT_REFERENCE_PATH", PROJECT_ROOT / "models" / "drift_reference.json")
+)
+DRIFT_WINDOW = int(os.getenv("RIDE_API_DRIFT_WINDOW", "0"))
+DRIFT_MIN_SAMPLES = int(os.getenv("RIDE_API_DRIFT_MIN_SAMPLES", "200"))
+# Directory for the JSONL prediction log; unset disables logging.
+PREDICTION_LOG_DIR = os.getenv("RIDE_API_PREDICTION_LOG_DIR")
+PREDICTION_LOG_QUEUE = int(os.getenv("RIDE_API_PREDICTION_LOG_QUEUE", "10000"))
+PREDICTION_LOG_SEGMENT_MB = float(os.getenv("RIDE_API_PREDICTION_LOG_SEGMENT_MB", "64"))
+PREDICTION_LOG_SEGMENT_S = float(os.getenv("RIDE_API_PREDICTION_LOG_SEGMENT_S", "3600"))
 
-model = None
+REQUESTS = metrics.REGISTRY.counter(
+    "ride_api_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")
+)
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "ride_api_request_duration_seconds", "End-to-end HTTP request latency.", ("route",)
+)
+ERRORS = metrics.REGISTRY.counter(
+    "ride_api_errors_total", "Failed prediction requests by route and error type.", ("route", "error")
+)
+BATCH_ROWS = metrics.REGISTRY.histogram(
+    "ride_api_batch_rows",
+    "Rows per scoring call; source is the batch endpoint or the micro-batcher.",
+    ("source",),
+    buckets=metrics.SIZE_BUCKETS,
+)
+MODEL_LOAD_SECONDS = metrics.REGISTRY.gauge(
+    "ride_model_load_seconds", "Duration of the last model load, by phase.", ("phase",)
+)
+MODEL_RELOADS = metrics.REGISTRY.counter("ride_model_reloads_total", "Model reloads by outcome.", ("outcome",))
+SHED = metrics.REGISTRY.counter(
+    "ride_api_shed_total", "Requests rejected with 503 because the scoring queue was full.", ("route",)
+)
+TIMEOUTS = metrics.REGISTRY.counter(
+    "ride_api_timeouts_total", "Requests abandoned with 504 after their deadline.", ("route",)
+)
 
 
-def _get_model():
-    global model
-    if model is None:
+def _build_prediction_cache() -> Optional[PredictionCache]:
+    if CACHE_REDIS_URL:
+        # Optional dependency, only needed for the shared cache.
+        import redis
+
+        return PredictionCache(RedisBackend(redis.Redis.from_url(CACHE_REDIS_URL), CACHE_TTL_S))
+    if CACHE_SIZE > 0:
+        return PredictionCache(LocalBackend(CACHE_SIZE, CACHE_TTL_S))
+    return None
+
+
+# The served model and its load details, always published together so a
+# reader never pairs one model with another's version.
+serving: tuple[Any, dict[str, Any]] = (None, {})
+prediction_cache = _build_prediction_cache()
+drift_monitor: Optional[DriftMonitor] = None
+prediction_logger: Optional[PredictionLogger] = None
+batcher: Optional[MicroBatcher] = None
+admission: Optional[AdmissionController] = None
+reload_lock = threading.Lock()
+reload_status: dict[str, Any] = {"state": "idle"}
+
+
+def _active_model_path() -> Path:
+    return COMPILED_MODEL_PATH if USE_COMPILED_MODEL else MODEL_PATH
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _load_from_mlflow(run_id: str):
+    # Imported lazily: MLflow is only needed for registry reloads.
+    import mlflow.sklearn
+
+    from src.config import MLFLOW_TRACKING_URI
+
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    pipeline = mlflow.sklearn.load_model(f"runs:/{run_id}/model")
+    pipeline.mlflow_run_id = run_id
+    if not USE_COMPILED_MODEL:
+        return pipeline
+
+    from src.train import export_compiled_model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled_path = Path(tmp) / "model_compiled.npz"
+        export_compiled_model(pipeline, compiled_path)
+        return load_compiled_model(compiled_path)
+
+
+def _load_model_version(run_id: Optional[str] = None) -> tuple[Any, dict[str, Any]]:
+    """Load and warm up a model without touching the one being served."""
+    model_path = _active_model_path()
+    started = time.perf_counter()
+    if run_id is not None:
+        loaded = _load_from_mlflow(run_id)
+    elif USE_COMPILED_MODEL:
+        loaded = load_compiled_model(model_path, mmap_mode=MODEL_MMAP_MODE)
+    else:
+        loaded = load_model(model_path, mmap_mode=MODEL_MMAP_MODE)
+    load_seconds = time.perf_counter() - started
+
+    # Score an all-defaults row so lazy initialisation happens before traffic.
+    started = time.perf_counter()
+    predict_with_probability_from_payload({}, loaded)
+    warmup_seconds = time.perf_counter() - started
+
+    if run_id is not None:
+        info = {"model_source": f"runs:/{run_id}/model", "model_mtime_ns": None, "model_size_bytes": None}
+    else:
+        stat = model_path.stat()
+        info = {
+            "model_source": str(model_path),
+            "model_mtime_ns": stat.st_mtime_ns,
+            "model_size_bytes": stat.st_size,
+        }
+    MODEL_LOAD_SECONDS.set("load", value=load_seconds)
+    MODEL_LOAD_SECONDS.set("warmup", value=warmup_seconds)
+    run_version = getattr(loaded, "mlflow_run_id", None)
+    info.update(
+        {
+            "model_version": f"run:{run_version}" if run_version else f"sha256:{_file_digest(model_path)}",
+            "model_format": "compiled" if USE_COMPILED_MODEL else "pickle",
+            "mmap": MODEL_MMAP_MODE is not None and run_id is None,
+            "load_seconds": load_seconds,
+            "warmup_seconds": warmup_seconds,
+            "loaded_at": time.time(),
+            "pid": os.getpid(),
+        }
+    )
+    return loaded, info
+
+
+def _swap_model(loaded, info: dict[str, Any]) -> None:
+    # Rebinding the global is atomic; requests already holding the previous
+    # pair finish with it.
+    global serving
+    serving = (loaded, info)
+    # Keys carry the model version, so this only frees the previous entries.
+    if prediction_cache is not None:
+        prediction_cache.clear()
+    _reset_drift_monitor()
+
+
+def _reset_drift_monitor() -> None:
+    # Each model is compared with the profile of its own training data, so
+    # the window restarts whenever the model changes.
+    global drift_monitor
+    if DRIFT_WINDOW <= 0:
+        return
+    try:
+        profile = load_reference_profile(DRIFT_REFERENCE_PATH)
+    except (FileNotFoundError, ValueError):
+        drift_monitor = None
+        return
+    drift_monitor = DriftMonitor(profile, window_size=DRIFT_WINDOW, min_samples=DRIFT_MIN_SAMPLES)
+
+
+def _observe_drift(payloads: list[dict[str, Any]]) -> None:
+    monitor, current_model = drift_monitor, serving[0]
+    if monitor is None or current_model is None:
+        return
+    rows, _, _ = payload_schema(current_model).encode_rows(payloads)
+    try:
+        monitor.update(rows.frame())
+    except ValueError:
+        # The profile does not match this model's columns; nothing to compare.
+        pass
+
+
+def _served_model() -> tuple[Any, Optional[str]]:
+    # One read of the published pair: results cached under this version
+    # always come from this model, even if a reload swaps in between.
+    current_model, info = _get_serving()
+    return current_model, info.get("model_version")
+
+
+def _get_serving() -> tuple[Any, dict[str, Any]]:
+    if serving[0] is None:
         try:
-            model = load_model(MODEL_PATH)
+            # Shares the reload lock so a first load cannot race a reload.
+            with reload_lock:
+                if serving[0] is None:
+                    _swap_model(*_load_model_version())
         except FileNotFoundError:
             raise HTTPException(
                 status_code=503,
                 detail=(
-                    f"Model not found at {MODEL_PATH}. "
+                    f"Model not found at {_active_model_path()}. "
                     "Train first using: python src\\train.py"
                 ),
             )
-    return model
+    return serving
+
+
+def reload_model(run_id: Optional[str] = None) -> dict[str, Any]:
+    """Load, warm up and swap in a new model.
+
+    Holds ``reload_lock`` throughout, so a reload or first load already in
+    progress finishes first.
+    """
+    global reload_status
+    with reload_lock:
+        reload_status = {"state": "reloading", "run_id": run_id, "started_at": time.time()}
+        try:
+            loaded, info = _load_model_version(run_id)
+            _swap_model(loaded, info)
+        except Exception as exc:
+            MODEL_RELOADS.inc("failed")
+            reload_status = {"state": "failed", "run_id": run_id, "error": f"{type(exc).__name__}: {exc}"}
+            raise
+        reload_status = {"state": "ok", "run_id": run_id, "model_version": info["model_version"]}
+        MODEL_RELOADS.inc("ok")
+    return info
+
+
+def _reload_in_background(run_id: Optional[str]) -> None:
+    try:
+        reload_model(run_id)
+    except Exception:
+        # Recorded in reload_status; the previous model keeps serving.
+        pass
+
+
+async def _watch_model_file() -> None:
+    last_seen = serving[1].get("model_mtime_ns")
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL_S)
+        try:
+            mtime_ns = _active_model_path().stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+        if mtime_ns == last_seen or mtime_ns == serving[1].get("model_mtime_ns"):
+            continue
+        if not reload_lock.locked():
+            last_seen = mtime_ns
+            await run_in_threadpool(_reload_in_background, None)
+
+
+def _score_coalesced(payloads: list[dict[str, Any]]) -> list[Any]:
+    BATCH_ROWS.observe(len(payloads), "micro_batch")
+    current_model, version = _served_model()
+    started = time.perf_counter()
+    try:
+        results = predict_batch(payloads, current_model, prediction_cache, version)
+    except Exception:
+        # A failure that is not tied to one row's validation; score rows one by
+        # one so only the offending request sees the error.
+        return [_score_isolated(payload, current_model) for payload in payloads]
+    _log_predictions(payloads, results, current_model, version, started, "/predict")
+    return [
+        # Re-raise row errors through the single-row path so each request gets
+        # the same exception type, and status code, as without micro-batching.
+        _score_isolated(payload, current_model)
+        if result["error"] is not None
+        else (result["is_cancelled"], result["cancellation_probability"])
+        for payload, result in zip(payloads, results)
+    ]
+
+
+def _score_single(payload: dict[str, Any], deadline: Optional[float] = None) -> tuple[int, float]:
+    check_deadline(deadline)
+    current_model, version = _served_model()
+    started = time.perf_counter()
+    prediction, probability = predict_with_probability_from_payload(payload, current_model, prediction_cache, version)
+    if prediction_logger is not None:
+        latency_ms = (time.perf_counter() - started) * 1e3
+        prediction_logger.log(payload, current_model, prediction, probability, version, latency_ms)
+    return prediction, probability
+
+
+def _log_predictions(payloads, results, current_model, version, started: float, endpoint: str) -> None:
+    # Latency is that of the whole scoring call the row was part of.
+    if prediction_logger is None:
+        return
+    latency_ms = (time.perf_counter() - started) * 1e3
+    for payload, result in zip(payloads, results):
+        if result["error"] is None:
+            prediction_logger.log(
+                payload,
+                current_model,
+                result["is_cancelled"],
+                result["cancellation_probability"],
+                version,
+                latency_ms,
+                endpoint,
+            )
+
+
+async def _score_payload(payload: dict[str, Any], deadline: Optional[float] = None) -> tuple[int, float]:
+    if batcher is not None:
+        return await batcher.submit(payload, deadline)
+    return await run_in_threadpool(_score_single, payload, deadline)
+
+
+def _score_rows(rows: list[dict[str, Any]], deadline: Optional[float] = None) -> list[dict[str, Any]]:
+    check_deadline(deadline)
+    current_model, version = _served_model()
+    started = time.perf_counter()
+    results = predict_batch(rows, current_model)
+    _log_predictions(rows, results, current_model, version, started, "/predict/batch")
+    return results
+
+
+async def _admit(route: str, work):
+    """Run ``work(deadline)`` through the admission controller, if enabled."""
+    if admission is None:
+        return await work(None)
+    try:
+        return await admission.run(work)
+    except Overloaded:
+        SHED.inc(route)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is overloaded; retry later.",
+            headers={"Retry-After": str(RETRY_AFTER_S)},
+        )
+    except DeadlineExceeded:
+        TIMEOUTS.inc(route)
+        raise HTTPException(
+            status_code=504, detail=f"Prediction did not finish within {admission.timeout_s:g}s."
+        )
+
+
+def _score_isolated(payload: dict[str, Any], current_model) -> Any:
+    try:
+        return predict_with_probability_from_payload(payload, current_model)
+    except Exception as exc:
+        return exc
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    global admission, batcher, prediction_logger
+    watcher: Optional[asyncio.Task] = None
+    if PREDICTION_LOG_DIR:
+        prediction_logger = PredictionLogger(
+            Path(PREDICTION_LOG_DIR),
+            max_queue=PREDICTION_LOG_QUEUE,
+            max_segment_bytes=int(PREDICTION_LOG_SEGMENT_MB * 1024 * 1024),
+            max_segment_seconds=PREDICTION_LOG_SEGMENT_S,
+        )
+        prediction_logger.start()
+    if EAGER_MODEL_LOAD:
+        try:
+            await run_in_threadpool(_get_serving)
+        except HTTPException:
+            # Keep serving; /ready reports not ready and /predict returns 503
+            # until a model is available.
+            pass
+    if BATCH_WINDOW_MS > 0:
+        batcher = MicroBatcher(_score_coalesced, BATCH_WINDOW_MS, BATCH_MAX_ROWS)
+        await batcher.start()
+    if MAX_CONCURRENCY > 0:
+        admission = AdmissionController(MAX_CONCURRENCY, MAX_QUEUE, REQUEST_TIMEOUT_S)
+    if RELOAD_INTERVAL_S > 0:
+        watcher = asyncio.create_task(_watch_model_file())
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if batcher is not None:
+            await batcher.stop()
+            batcher = None
+        admission = None
+        if prediction_logger is not None:
+            await run_in_threadpool(prediction_logger.stop)
+            prediction_logger = None
+
+
+class MetricsMiddleware:
+    """Count requests and time them from the first byte to the response.
+
+    The start time is stored in the ASGI scope so handlers can time the
+    body parsing and validation that happens before they run.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        scope.setdefault("state", {})["request_started"] = started
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The route template, not the raw path, keeps label cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUESTS.inc(route, scope["method"], str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+
+
+def _record_parse_time(request: Request) -> None:
+    started = getattr(request.state, "request_started", None)
+    if started is not None:
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - started, "parse_validate")
+
+
+app = FastAPI(lifespan=lifespan)
+if metrics.ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
 def home():
-    return {"message": "Ride Cancellation API"}
+    return {"message": "Ride Cancellation API", "model_version": serving[1].get("model_version")}
+
+
+@app.get("/metrics")
+def metrics_route():
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/drift")
+def drift():
+    if drift_monitor is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Drift monitoring is off. Set RIDE_API_DRIFT_WINDOW and provide {DRIFT_REFERENCE_PATH}.",
+        )
+    return drift_monitor.report()
+
+
+@app.get("/ready")
+def ready():
+    current_model, info = serving
+    if current_model is None:
+        return JSONResponse(
+            status_code=503, content={"ready": False, "pid": os.getpid(), "reload": reload_status}
+        )
+    cache = prediction_cache.stats() if prediction_cache is not None else None
+    log = prediction_logger.stats() if prediction_logger is not None else None
+    limiter = admission.stats() if admission is not None else None
+    return {
+        "ready": True,
+        **info,
+        "reload": reload_status,
+        "cache": cache,
+        "prediction_log": log,
+        "admission": limiter,
+    }
+
+
+class ReloadRequest(BaseModel):
+    run_id: Optional[str] = None
+
+
+@app.post("/admin/reload", status_code=202)
+def admin_reload(
+    background_tasks: BackgroundTasks,
+    request: Optional[ReloadRequest] = None,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    if not ADMIN_TOKEN:
+        # A reload replaces the served model, so it needs an explicit token.
+        raise HTTPException(status_code=404, detail="Admin routes are disabled; set RIDE_API_ADMIN_TOKEN.")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    if reload_lock.locked():
+        raise HTTPException(status_code=409, detail="A model reload is already in progress.")
+    run_id = request.run_id if request is not None else None
+    background_tasks.add_task(_reload_in_background, run_id)
+    return {"status": "reloading", "run_id": run_id, "current_model_version": serving[1].get("model_version")}
 
 
 class PredictionRequest(BaseModel):
@@ -42,19 +552,69 @@ class PredictionResponse(BaseModel):
     cancellation_probability: float
 
 
+class BatchPredictionRequest(BaseModel):
+    rows: list[dict[str, Any]]
+
+
+class BatchPredictionItem(BaseModel):
+    is_cancelled: Optional[int] = None
+    cancellation_probability: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    results: list[BatchPredictionItem]
+
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict(data: PredictionRequest):
+async def predict(data: PredictionRequest, request: Request, background_tasks: BackgroundTasks):
+    _record_parse_time(request)
+    # The request model declares no fields, so the extras are the payload;
+    # reading them avoids the copy model_dump() makes.
+    payload = data.model_extra or {}
+    if drift_monitor is not None:
+        # Runs after the response is sent.
+        background_tasks.add_task(_observe_drift, [payload])
     try:
-        prediction, probability = predict_with_probability_from_payload(
-            data.model_dump(), _get_model()
-        )
+        prediction, probability = await _admit("/predict", lambda deadline: _score_payload(payload, deadline))
         return PredictionResponse(
             is_cancelled=int(prediction),
             cancellation_probability=float(probability),
         )
-    except HTTPException:
+    except HTTPException as exc:
+        ERRORS.inc("/predict", f"http_{exc.status_code}")
         raise
     except ValueError as exc:
+        ERRORS.inc("/predict", "invalid_payload")
         raise HTTPException(status_code=422, detail=str(exc))
     except Exception as exc:
+        ERRORS.inc("/predict", "prediction_failed")
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {exc}")
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch_route(data: BatchPredictionRequest, request: Request, background_tasks: BackgroundTasks):
+    _record_parse_time(request)
+    if len(data.rows) > MAX_BATCH_ROWS:
+        ERRORS.inc("/predict/batch", "batch_too_large")
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: {len(data.rows)} rows (max {MAX_BATCH_ROWS}).",
+        )
+    BATCH_ROWS.observe(len(data.rows), "batch_endpoint")
+    if drift_monitor is not None:
+        background_tasks.add_task(_observe_drift, data.rows)
+    try:
+        results = await _admit(
+            "/predict/batch", lambda deadline: run_in_threadpool(_score_rows, data.rows, deadline)
+        )
+        row_errors = sum(item["error"] is not None for item in results)
+        if row_errors:
+            ERRORS.inc("/predict/batch", "invalid_row", amount=row_errors)
+        return BatchPredictionResponse(results=[BatchPredictionItem(**item) for item in results])
+    except HTTPException as exc:
+        ERRORS.inc("/predict/batch", f"http_{exc.status_code}")
+        raise
+    except Exception as exc:
+        ERRORS.inc("/predict/batch", "prediction_failed")
         raise HTTPException(status_code=400, detail=f"Prediction failed: {exc}")
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row requests into one scoring call.
+
+    Requests are queued until ``max_wait_ms`` has passed since the first one
+    arrived or ``max_batch_rows`` are waiting, whichever comes first. The batch
+    is scored by ``score_fn`` in a worker thread so the event loop keeps
+    accepting requests. ``score_fn`` returns one item per payload; an item that
+    is an exception is raised to that request only. A request submitted with a
+    ``deadline`` (a ``time.monotonic()`` value) that has passed by the time its
+    batch is formed is cancelled instead of scored.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[list[dict[str, Any]]], list[Any]],
+        max_wait_ms: float,
+        max_batch_rows: int,
+    ) -> None:
+        if max_batch_rows < 1:
+            raise ValueError("max_batch_rows must be at least 1.")
+        self.score_fn = score_fn
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, payload: dict[str, Any], deadline: Optional[float] = None) -> Any:
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() must be awaited before submit().")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future, deadline))
+        return await future
+
+    async def _collect(self) -> list[tuple[dict[str, Any], asyncio.Future, Optional[float]]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_rows:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything that arrived while we were waiting rides along for free.
+        while len(batch) < self.max_batch_rows and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            collected = await self._collect()
+            # Read the clock once the batching window has closed: a deadline
+            # that ran out while the batch was filling must still cancel.
+            now = time.monotonic()
+            pending = []
+            for payload, future, deadline in collected:
+                # Requests whose client went away or whose deadline passed are not scored.
+                if not future.done() and deadline is not None and now > deadline:
+                    future.cancel()
+                if not future.done():
+                    pending.append((payload, future))
+            batch = pending
+            if not batch:
+                continue
+            try:
+                results = await asyncio.to_thread(self.score_fn, [payload for payload, _ in batch])
+            except Exception as exc:
+                results = [exc] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -1,8 +1,35 @@
 import streamlit as st
 import requests
 import os
+import time
+
+import pandas as pd
 from streamlit.errors import StreamlitSecretNotFoundError
 
+try:
+    from app.sweep import (
+        SWEEP_FIELDS,
+        PredictionAPIError,
+        build_grid,
+        grid_values,
+        make_session,
+        predict_payload,
+        score_payloads,
+    )
+except ModuleNotFoundError:
+    from sweep import (
+        SWEEP_FIELDS,
+        PredictionAPIError,
+        build_grid,
+        grid_values,
+        make_session,
+        predict_payload,
+        score_payloads,
+    )
+
+# Identical requests within this window are answered from Streamlit's cache.
+CACHE_TTL_S = 600
+
 st.set_page_config(page_title="Ride Cancellation Predictor", page_icon="🚖")
 
 st.title("Ride Cancellation Predictor")
@@ -22,6 +49,56 @@ default_api_url = (
 )
 api_url = st.text_input("Prediction API URL", value=default_api_url)
 
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    # One pooled session per app process; keeps connections to the API open.
+    return make_session()
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def predict_one(url: str, payload: dict) -> dict:
+    return predict_payload(get_session(), url, payload)
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def run_sweep(url: str, base: dict, field: str, values: list, series_field, series_values: list):
+    grid = build_grid(base, field, values, series_field, series_values)
+    results, endpoint = score_payloads(get_session(), url, grid)
+    frame = pd.DataFrame(grid)[[field] + ([series_field] if series_field else [])]
+    frame["cancellation_probability"] = [result.get("cancellation_probability") for result in results]
+    frame["error"] = [result.get("error") for result in results]
+    return frame, endpoint
+
+
+def _grid_inputs(field: str, key: str) -> list:
+    spec = SWEEP_FIELDS[field]
+    columns = st.columns(3)
+    start = columns[0].number_input("From", value=float(spec["start"]), key=f"{key}_start")
+    stop = columns[1].number_input("To", value=float(spec["stop"]), key=f"{key}_stop")
+    points = columns[2].number_input("Points", min_value=1, max_value=200, value=spec["points"], key=f"{key}_points")
+    return grid_values(field, start, stop, points)
+
+
+mode = st.radio("Mode", ["Single prediction", "Sweep"], horizontal=True)
+if mode == "Sweep":
+    st.subheader("Sweep")
+    st.caption("Scores every grid point with the ride details below; the swept fields override them.")
+    field_names = list(SWEEP_FIELDS)
+    sweep_field = st.selectbox(
+        "Sweep field", field_names, format_func=lambda name: SWEEP_FIELDS[name]["label"]
+    )
+    sweep_values = _grid_inputs(sweep_field, "sweep")
+    series_options = ["none"] + [name for name in field_names if name != sweep_field]
+    series_field = st.selectbox(
+        "One curve per",
+        series_options,
+        index=series_options.index("ride_distance") if "ride_distance" in series_options else 0,
+        format_func=lambda name: "(single curve)" if name == "none" else SWEEP_FIELDS[name]["label"],
+    )
+    series_field = None if series_field == "none" else series_field
+    series_values = _grid_inputs(series_field, "series") if series_field else []
+
 with st.form("predict_form"):
     st.subheader("Ride Details")
     vehicle_type = st.selectbox(
@@ -61,7 +138,7 @@ with st.form("predict_form"):
     booking_month = st.slider("Booking Month", min_value=1, max_value=12, value=6)
     is_weekend = st.selectbox("Is Weekend", [0, 1], index=0)
 
-    submitted = st.form_submit_button("Predict")
+    submitted = st.form_submit_button("Run sweep" if mode == "Sweep" else "Predict")
 
 if submitted:
     payload = {
@@ -83,17 +160,25 @@ if submitted:
         "booking_hour": booking_hour,
     }
     try:
-        response = requests.post(api_url, json=payload, timeout=10)
-
-        if response.status_code >= 400:
-            detail = response.text
-            try:
-                detail = response.json().get("detail", detail)
-            except ValueError:
-                pass
-            st.error(f"Prediction failed ({response.status_code}): {detail}")
+        if mode == "Sweep":
+            started = time.perf_counter()
+            frame, endpoint = run_sweep(api_url, payload, sweep_field, sweep_values, series_field, series_values)
+            elapsed = time.perf_counter() - started
+            scored = frame.dropna(subset=["cancellation_probability"])
+            if series_field:
+                label = SWEEP_FIELDS[series_field]["label"]
+                chart = scored.pivot(index=sweep_field, columns=series_field, values="cancellation_probability")
+                chart.columns = [f"{label} = {value:g}" for value in chart.columns]
+            else:
+                chart = scored.set_index(sweep_field)[["cancellation_probability"]]
+            st.line_chart(chart, x_label=SWEEP_FIELDS[sweep_field]["label"], y_label="Cancellation probability")
+            st.caption(f"{len(frame)} points via /predict{'/batch' if endpoint == 'batch' else ''} in {elapsed:.2f}s")
+            failed = frame["error"].notna().sum()
+            if failed:
+                st.warning(f"{failed} grid points failed: {frame['error'].dropna().iloc[0]}")
+            st.dataframe(frame, hide_index=True)
         else:
-            result = response.json()
+            result = predict_one(api_url, payload)
             is_cancelled = int(result.get("is_cancelled", 0))
             probability = float(result.get("cancellation_probability", 0.0))
             if is_cancelled == 1:
@@ -102,6 +187,8 @@ if submitted:
                 st.success("Predicted outcome: Not cancelled")
             st.write(f"Cancellation probability: {probability:.3f}")
             st.json(result)
+    except PredictionAPIError as exc:
+        st.error(str(exc))
     except requests.exceptions.ConnectionError:
         st.error(
             "Could not connect to API. "
@@ -0,0 +1,130 @@
+"""What-if sweeps for the Streamlit client, kept free of Streamlit so they can be tested.
+
+A sweep varies one payload field over a grid (optionally crossed with a
+second field) and scores every point. Points go to ``/predict/batch`` in
+chunks when the API has it, otherwise to ``/predict`` one by one, over a
+shared ``requests.Session`` so connections are reused.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Any, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_ROWS = 500
+MAX_WORKERS = 8
+REQUEST_TIMEOUT_S = 10
+# Fields an analyst can sweep, with the grid the UI offers by default.
+SWEEP_FIELDS = {
+    "booking_hour": {"label": "Booking Hour", "start": 0, "stop": 23, "points": 24, "integer": True},
+    "ride_distance": {"label": "Ride Distance", "start": 1.0, "stop": 40.0, "points": 8, "integer": False},
+    "avg_vtat": {"label": "Avg VTAT", "start": 2.0, "stop": 20.0, "points": 8, "integer": False},
+    "booking_value": {"label": "Booking Value", "start": 100.0, "stop": 1500.0, "points": 8, "integer": False},
+}
+
+
+class PredictionAPIError(RuntimeError):
+    """The prediction API answered with an error status."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(f"Prediction failed ({status_code}): {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def make_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def grid_values(field: str, start: float, stop: float, points: int) -> list[float]:
+    values = np.linspace(start, stop, max(int(points), 1))
+    if SWEEP_FIELDS.get(field, {}).get("integer"):
+        return sorted({int(round(value)) for value in values})
+    return [round(float(value), 4) for value in values]
+
+
+def build_grid(
+    base: dict[str, Any],
+    field: str,
+    values: list[Any],
+    series_field: Optional[str] = None,
+    series_values: Optional[list[Any]] = None,
+) -> list[dict[str, Any]]:
+    """One payload per grid point: ``base`` with ``field`` (and ``series_field``) overridden."""
+    series = list(series_values) if series_field else [None]
+    grid = []
+    for series_value, value in product(series, values):
+        payload = dict(base)
+        payload[field] = value
+        if series_field:
+            payload[series_field] = series_value
+        grid.append(payload)
+    return grid
+
+
+def batch_url(predict_url: str) -> Optional[str]:
+    url = predict_url.rstrip("/")
+    return f"{url}/batch" if url.endswith("/predict") else None
+
+
+def _raise_for_error(response: requests.Response) -> None:
+    if response.status_code < 400:
+        return
+    detail = response.text
+    try:
+        detail = response.json().get("detail", detail)
+    except ValueError:
+        pass
+    raise PredictionAPIError(response.status_code, str(detail))
+
+
+def predict_payload(session: requests.Session, predict_url: str, payload: dict[str, Any]) -> dict[str, Any]:
+    response = session.post(predict_url, json=payload, timeout=REQUEST_TIMEOUT_S)
+    _raise_for_error(response)
+    return response.json()
+
+
+def _post_chunk(session: requests.Session, url: str, rows: list[dict[str, Any]]) -> Optional[list[dict[str, Any]]]:
+    response = session.post(url, json={"rows": rows}, timeout=REQUEST_TIMEOUT_S)
+    if response.status_code in (404, 405):
+        # No batch endpoint on this API; the caller falls back to /predict.
+        return None
+    _raise_for_error(response)
+    return response.json()["results"]
+
+
+def _post_single(session: requests.Session, url: str, payload: dict[str, Any]) -> dict[str, Any]:
+    try:
+        return {**predict_payload(session, url, payload), "error": None}
+    except PredictionAPIError as exc:
+        if exc.status_code != 422:
+            raise
+        # A bad grid point should not sink the whole sweep, as in the batch endpoint.
+        return {"is_cancelled": None, "cancellation_probability": None, "error": exc.detail}
+
+
+def score_payloads(
+    session: requests.Session,
+    predict_url: str,
+    payloads: list[dict[str, Any]],
+    chunk_rows: int = CHUNK_ROWS,
+    max_workers: int = MAX_WORKERS,
+    use_batch: bool = True,
+) -> tuple[list[dict[str, Any]], str]:
+    """Score ``payloads`` in order; returns the results and the endpoint used."""
+    chunks = [payloads[start:start + chunk_rows] for start in range(0, len(payloads), chunk_rows)]
+    url = batch_url(predict_url) if use_batch else None
+    if url is not None and chunks:
+        first = _post_chunk(session, url, chunks[0])
+        if first is not None:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                rest = list(pool.map(lambda chunk: _post_chunk(session, url, chunk), chunks[1:]))
+            return [item for part in [first, *rest] for item in part], "batch"
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda payload: _post_single(session, predict_url, payload), payloads)), "single"
@@ -0,0 +1,46 @@
+"""Compare /predict/batch throughput against looping over /predict.
+
+Run from the project root:
+
+    python -m benchmarks.bench_batch_predict --rows 2000
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+import api.app as api_app
+from benchmarks.synthetic import sample_payloads, train_synthetic_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batch vs single-row prediction routes.")
+    parser.add_argument("--rows", type=int, default=2000, help="Number of payloads to score")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="Synthetic rows used to fit the model")
+    args = parser.parse_args()
+
+    model, X_test = train_synthetic_model(args.train_rows)
+    payloads = sample_payloads(X_test, args.rows)
+    api_app.serving = (model, {})
+    client = TestClient(api_app.app)
+
+    start = time.perf_counter()
+    for payload in payloads:
+        response = client.post("/predict", json=payload)
+        response.raise_for_status()
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post("/predict/batch", json={"rows": payloads})
+    response.raise_for_status()
+    batch_seconds = time.perf_counter() - start
+
+    n = len(payloads)
+    print(f"rows scored:        {n}")
+    print(f"loop /predict:      {n / single_seconds:10.1f} rows/sec ({single_seconds:.2f}s)")
+    print(f"/predict/batch:     {n / batch_seconds:10.1f} rows/sec ({batch_seconds:.2f}s)")
+    print(f"speedup:            {single_seconds / batch_seconds:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
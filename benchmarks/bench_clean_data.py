@@ -0,0 +1,117 @@
+"""Wall time and peak memory of clean_data, legacy vs dtype-optimized.
+
+Writes a synthetic bookings CSV (10M rows by default, generated in chunks),
+loads it once, then runs each implementation on the same raw frame. Wall
+time is measured on a plain run. Peak memory comes from a second run under
+tracemalloc, which sees NumPy and pandas buffers but slows Python code down.
+
+    python -m benchmarks.bench_clean_data --rows 10000000
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import make_bookings
+from src.preprocess import clean_data, load_data
+
+NULL_LIKE = {"", "nan", "none", "null"}
+KNOWN_STATUSES = {"completed", "cancelled by driver", "cancelled by customer", "no driver found", "incomplete"}
+LEAKAGE_COLUMNS = [
+    "booking_status",
+    "reason_for_cancelling_by_customer",
+    "driver_cancellation_reason",
+    "incomplete_rides_reason",
+    "incomplete_rides",
+]
+ID_COLUMNS = ["booking_id", "customer_id"]
+
+
+def legacy_clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    """clean_data as it was before the copy-free rework."""
+    out = df.copy()
+    out.columns = out.columns.str.strip().str.lower().str.replace(" ", "_", regex=False)
+
+    out = out.copy()
+    status = out["booking_status"].astype(str).str.strip().str.lower()
+    status = status.mask(status.isin(NULL_LIKE))
+    out = out.loc[status.notna()].copy()
+    status = out["booking_status"].astype(str).str.strip().str.lower()
+    out = out.loc[status.isin(KNOWN_STATUSES)].copy()
+    status = out["booking_status"].astype(str).str.strip().str.lower()
+    out["is_cancelled"] = (status != "completed").astype(int)
+
+    out = out.copy()
+    if "date" in out.columns:
+        parsed_date = pd.to_datetime(out["date"], errors="coerce", dayfirst=False)
+        out["booking_day_of_week"] = parsed_date.dt.dayofweek.fillna(-1).astype(int)
+        out["booking_month"] = parsed_date.dt.month.fillna(0).astype(int)
+        out["is_weekend"] = out["booking_day_of_week"].isin([5, 6]).astype(int)
+        out = out.drop(columns=["date"])
+    if "time" in out.columns:
+        hour_token = out["time"].astype(str).str.extract(r"^\s*(\d{1,2})")[0]
+        hour = pd.to_numeric(hour_token, errors="coerce")
+        hour = hour.where(hour.between(0, 23), -1)
+        out["booking_hour"] = hour.fillna(-1).astype(int)
+        out = out.drop(columns=["time"])
+
+    out = out.drop(columns=[c for c in LEAKAGE_COLUMNS + ID_COLUMNS if c in out.columns])
+    feature_cols = [c for c in out.columns if c != "is_cancelled"]
+    out = out.drop(columns=[c for c in feature_cols if out[c].nunique(dropna=False) <= 1])
+
+    numeric_cols = [c for c in out.select_dtypes(include=["number"]).columns if c != "is_cancelled"]
+    categorical_cols = list(out.select_dtypes(include=["object"]).columns)
+    if numeric_cols:
+        out[numeric_cols] = out[numeric_cols].fillna(out[numeric_cols].median())
+    if categorical_cols:
+        out[categorical_cols] = out[categorical_cols].fillna("unknown")
+    return out
+
+
+def write_bookings_csv(path: Path, n_rows: int, chunk_rows: int = 1_000_000) -> None:
+    for index, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = make_bookings(min(chunk_rows, n_rows - start), seed=index)
+        chunk.to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+
+
+def measure(fn, raw: pd.DataFrame) -> tuple[float, float, pd.DataFrame]:
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(raw)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark clean_data time and peak memory.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Synthetic rows in the bookings file")
+    parser.add_argument("--csv", help="Reuse an existing bookings CSV instead of generating one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(args.csv) if args.csv else Path(tmp) / "bookings.csv"
+        if not args.csv:
+            write_bookings_csv(csv_path, args.rows)
+        raw = load_data(csv_path)
+
+    print(f"raw frame: {len(raw):,} rows, {raw.memory_usage(deep=True).sum() / 2**20:,.0f} MiB")
+    for name, fn in [("legacy clean_data", legacy_clean_data), ("clean_data", clean_data)]:
+        elapsed, peak_mib, result = measure(fn, raw)
+        size_mib = result.memory_usage(deep=True).sum() / 2**20
+        print(f"{name:18s} {elapsed:8.2f} s  peak {peak_mib:9,.0f} MiB  result {size_mib:8,.0f} MiB")
+        del result
+
+
+if __name__ == "__main__":
+    main()
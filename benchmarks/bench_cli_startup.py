@@ -0,0 +1,77 @@
+"""Wall time of one ``src/predict.py`` call, in-process vs. forwarded to the daemon.
+
+Each call is a fresh ``python src/predict.py --distance 4.5 --booking-hour 10``
+process, as in a shell batch job. The in-process runs pass ``--no-daemon``;
+the daemon runs go through a ``predict.py --serve`` process started once.
+
+    python -m benchmarks.bench_cli_startup --calls 20
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+
+from benchmarks.synthetic import train_synthetic_model
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PREDICT = [sys.executable, str(PROJECT_ROOT / "src" / "predict.py")]
+
+
+def _time_calls(args: list[str], calls: int) -> tuple[list[float], list[dict]]:
+    wall, timings = [], []
+    for _ in range(calls):
+        start = time.perf_counter()
+        completed = subprocess.run(PREDICT + args, capture_output=True, text=True, check=True)
+        wall.append(time.perf_counter() - start)
+        timings.append(json.loads(completed.stderr.strip().splitlines()[-1]))
+    return wall, timings
+
+
+def _wait_for(socket_path: Path, timeout_s: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not socket_path.exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"daemon did not start on {socket_path}")
+        time.sleep(0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark predict.py startup with and without the daemon.")
+    parser.add_argument("--calls", type=int, default=20, help="predict.py processes per mode")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="Synthetic rows used to fit the model")
+    args = parser.parse_args()
+
+    model, _ = train_synthetic_model(args.train_rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "model.pkl"
+        socket_path = Path(tmp) / "predict.sock"
+        joblib.dump(model, model_path)
+        common = ["--distance", "4.5", "--booking-hour", "10", "--model-path", str(model_path)]
+        common += ["--socket", str(socket_path), "--timing"]
+
+        results = {"in-process": _time_calls(common + ["--no-daemon"], args.calls)}
+        daemon = subprocess.Popen(PREDICT + ["--serve", "--model-path", str(model_path), "--socket", str(socket_path)])
+        try:
+            _wait_for(socket_path)
+            results["daemon"] = _time_calls(common, args.calls)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    for name, (wall, timings) in results.items():
+        modes = {timing["mode"] for timing in timings}
+        startup = statistics.median(timing["startup_seconds"] for timing in timings)
+        print(
+            f"{name:10s} wall p50 {statistics.median(wall) * 1000:7.0f} ms  max {max(wall) * 1000:7.0f} ms  "
+            f"startup p50 {startup * 1000:7.0f} ms  mode {', '.join(sorted(modes))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
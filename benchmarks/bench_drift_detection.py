@@ -0,0 +1,106 @@
+"""Wall time of the drift check: full load vs. column-pruned, sampled load.
+
+Writes synthetic reference and current bookings CSVs (20M rows each by
+default; the current file has longer rides and higher fares), then times
+
+* full: every column read with inferred dtypes, tests on all rows, one process
+* sampled: only the compared columns with dtype hints, a stratified sample,
+  tests spread over ``--jobs`` processes
+
+and prints load, test and total seconds plus the slowest columns.
+
+    python -m benchmarks.bench_drift_detection --rows 20000000 --sample-size 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_bookings
+from monitoring.drift_detection import load_table, run_column_tests
+
+COLUMNS = [
+    "vehicle_type",
+    "pickup_location",
+    "drop_location",
+    "avg_vtat",
+    "avg_ctat",
+    "booking_value",
+    "ride_distance",
+    "driver_ratings",
+    "customer_rating",
+    "payment_method",
+]
+
+
+def write_bookings_csv(path: Path, n_rows: int, shift: float = 0.0, chunk_rows: int = 1_000_000) -> None:
+    for index, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = make_bookings(min(chunk_rows, n_rows - start), seed=index + (1000 if shift else 0))
+        if shift:
+            chunk["Ride Distance"] = chunk["Ride Distance"] * (1 + shift)
+            chunk["Booking Value"] = chunk["Booking Value"] * (1 + shift)
+        chunk.to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+
+
+def run(reference_path: Path, current_path: Path, columns, jobs: int, **load_options) -> dict:
+    started = time.perf_counter()
+    reference = load_table(reference_path, "reference", columns, **load_options)
+    current = load_table(current_path, "current", columns, **load_options)
+    loaded = time.perf_counter()
+    results = run_column_tests(reference, current, COLUMNS, jobs=jobs)
+    finished = time.perf_counter()
+    return {
+        "rows": (len(reference), len(current)),
+        "load_seconds": loaded - started,
+        "test_seconds": finished - loaded,
+        "total_seconds": finished - started,
+        "drifted": sorted(result["column"] for result in results if result["drift"]),
+        "slowest": sorted(results, key=lambda result: -result["seconds"])[:3],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the drift check on large synthetic files.")
+    parser.add_argument("--rows", type=int, default=20_000_000, help="Synthetic rows per file")
+    parser.add_argument("--sample-size", type=int, default=200_000, help="Rows sampled from each file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processes for the sampled run")
+    parser.add_argument("--skip-full", action="store_true", help="Only time the sampled run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_path = Path(tmp) / "reference.csv"
+        current_path = Path(tmp) / "current.csv"
+        write_bookings_csv(reference_path, args.rows)
+        write_bookings_csv(current_path, args.rows, shift=0.2)
+
+        runs = []
+        if not args.skip_full:
+            runs.append(("full", run(reference_path, current_path, None, jobs=1, dtype_hints=False)))
+        runs.append(
+            (
+                "sampled",
+                run(
+                    reference_path,
+                    current_path,
+                    COLUMNS,
+                    jobs=args.jobs,
+                    sample_size=args.sample_size,
+                    stratify_by="vehicle_type",
+                    dtype_hints=True,
+                ),
+            )
+        )
+
+    for name, result in runs:
+        print(
+            f"{name:8s} rows {result['rows'][0]:>11,} / {result['rows'][1]:>11,}  "
+            f"load {result['load_seconds']:7.2f} s  tests {result['test_seconds']:7.2f} s  "
+            f"total {result['total_seconds']:7.2f} s  drifted {', '.join(result['drifted']) or '-'}"
+        )
+        for column in result["slowest"]:
+            print(f"    {column['column']:20s} {column['test']:20s} {column['seconds'] * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Feature width and scoring latency with and without the location index.
+
+Both pipelines are fitted on the same synthetic bookings, with pickup and
+drop drawn from ``--locations`` names (the NCR dataset has 176). The
+baseline one-hot encodes both columns; the other replaces them with the
+``LocationIndex`` aggregates. Payloads are the same raw test rows for both,
+so the location pipeline pays for its lookups.
+
+    python -m benchmarks.bench_location_index --rows 50000 --locations 176
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from benchmarks.synthetic import make_bookings, sample_payloads
+from src.inference import predict_batch, predict_with_probability_from_payload
+from src.preprocess import clean_data
+from src.train import build_pipeline
+
+
+def _fit(df, location_features: bool, n_estimators: int):
+    pipeline, X_train, X_test, y_train, y_test = build_pipeline(df, location_features=location_features)
+    pipeline.set_params(classifier__n_estimators=n_estimators)
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    width = len(pipeline.named_steps["preprocessor"].get_feature_names_out())
+    roc_auc = roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1])
+    return pipeline, X_test, width, fit_seconds, roc_auc
+
+
+def _latency(model, payloads: list[dict], batch_rows: int) -> tuple[float, float]:
+    for payload in payloads[:10]:
+        predict_with_probability_from_payload(payload, model)
+    single = []
+    for payload in payloads:
+        start = time.perf_counter()
+        predict_with_probability_from_payload(payload, model)
+        single.append((time.perf_counter() - start) * 1e3)
+    batch = [payloads[i % len(payloads)] for i in range(batch_rows)]
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        predict_batch(batch, model)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(single), min(timings) / batch_rows * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the location index against one-hot locations.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic bookings to train on")
+    parser.add_argument("--locations", type=int, default=176, help="Distinct pickup/drop locations")
+    parser.add_argument("--trees", type=int, default=100, help="Trees per forest")
+    parser.add_argument("--requests", type=int, default=300, help="Single-row requests timed")
+    parser.add_argument("--batch-rows", type=int, default=2_000, help="Rows per timed batch")
+    args = parser.parse_args()
+
+    raw = make_bookings(args.rows)
+    rng = np.random.default_rng(7)
+    names = np.array([f"Location {i:03d}" for i in range(args.locations)])
+    # Skewed, as in real traffic: a few hubs and a long tail of rare routes.
+    weights = rng.zipf(1.5, args.locations).astype(float)
+    weights /= weights.sum()
+    raw["Pickup Location"] = rng.choice(names, size=args.rows, p=weights)
+    raw["Drop Location"] = rng.choice(names, size=args.rows, p=weights)
+    df = clean_data(raw)
+
+    baseline, X_test, *baseline_stats = _fit(df, False, args.trees)
+    indexed, _, *indexed_stats = _fit(df, True, args.trees)
+    payloads = sample_payloads(X_test, args.requests)
+
+    print(f"{len(df):,} rows, {args.locations} locations, {args.trees} trees")
+    print(f"{'':16s} {'width':>6s} {'fit s':>7s} {'ROC AUC':>8s} {'p50 ms':>8s} {'batch ms/row':>13s}")
+    for name, model, (width, fit_seconds, roc_auc) in [
+        ("one-hot", baseline, baseline_stats),
+        ("location index", indexed, indexed_stats),
+    ]:
+        p50, per_row = _latency(model, payloads, args.batch_rows)
+        print(f"{name:16s} {width:6d} {fit_seconds:7.2f} {roc_auc:8.4f} {p50:8.3f} {per_row:13.4f}")
+
+
+if __name__ == "__main__":
+    main()
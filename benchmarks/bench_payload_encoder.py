@@ -0,0 +1,129 @@
+"""Payload encoding cost: per-call dict rows vs. the compiled PayloadSchema.
+
+The legacy path is ``build_model_row`` as it was before the schema: a fresh
+default dict per call, a loop over every payload key, then a list of dicts
+turned into a DataFrame. The schema path encodes straight into column
+buffers. Both are timed on the same payloads. Results are checked to be
+equal first, including the error message of every invalid payload.
+
+    python -m benchmarks.bench_payload_encoder --payloads 20000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import sample_payloads, train_synthetic_model
+from src.inference import extract_expected_columns, payload_schema
+
+
+def legacy_build_model_row(payload, categorical_cols, numerical_cols):
+    row = {col: "unknown" for col in categorical_cols}
+    row.update({col: 0.0 for col in numerical_cols})
+
+    for key, value in payload.items():
+        if key in row:
+            row[key] = value
+
+    if "distance" in payload and "ride_distance" in row:
+        row["ride_distance"] = float(payload["distance"])
+    if "booking_hour" in payload:
+        hour = int(payload["booking_hour"])
+        if hour < 0 or hour > 23:
+            raise ValueError("booking_hour must be between 0 and 23.")
+        if "booking_hour" in row:
+            row["booking_hour"] = float(hour)
+        elif "time" in row:
+            row["time"] = f"{hour:02d}:00"
+
+    for col in numerical_cols:
+        try:
+            row[col] = float(row[col])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid numeric value for '{col}': {row[col]}")
+
+    return row
+
+
+def _outcome(fn, payload):
+    try:
+        return fn(payload)
+    except (TypeError, ValueError) as exc:
+        return type(exc), str(exc)
+
+
+def _best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark payload encoding before and after the compiled schema.")
+    parser.add_argument("--payloads", type=int, default=20_000, help="Payloads encoded per pass")
+    parser.add_argument("--repeats", type=int, default=5, help="Passes per variant; the fastest is reported")
+    args = parser.parse_args()
+
+    model, X_test = train_synthetic_model(5_000)
+    categorical_cols, numerical_cols, expected_cols = extract_expected_columns(model)
+    schema = payload_schema(model)
+    distinct = sample_payloads(X_test, len(X_test))
+    payloads = [dict(distinct[i % len(distinct)]) for i in range(args.payloads)]
+    for payload in payloads[::50]:
+        payload["extra_field"] = "ignored"
+    payloads[1::97] = [{"distance": "4.5", "booking_hour": 9.7}] * len(payloads[1::97])
+    payloads[2::89] = [{"ride_distance": "far"}] * len(payloads[2::89])
+    payloads[3::83] = [{"booking_hour": 30}] * len(payloads[3::83])
+
+    def legacy(payload):
+        return legacy_build_model_row(payload, categorical_cols, numerical_cols)
+
+    mismatches = sum(_outcome(legacy, payload) != _outcome(schema.encode, payload) for payload in payloads)
+    if mismatches:
+        raise SystemExit(f"{mismatches} payloads encode differently")
+
+    def legacy_single():
+        for payload in payloads:
+            try:
+                legacy(payload)
+            except ValueError:
+                pass
+
+    def schema_single():
+        for payload in payloads:
+            try:
+                schema.encode_values(payload)
+            except ValueError:
+                pass
+
+    def legacy_batch():
+        rows = []
+        for payload in payloads:
+            try:
+                rows.append(legacy(payload))
+            except ValueError:
+                pass
+        return pd.DataFrame(rows, columns=expected_cols)
+
+    def schema_batch():
+        rows, _, _ = schema.encode_rows(payloads)
+        return rows.frame()
+
+    print(f"{len(payloads):,} payloads, {len(expected_cols)} model columns, all outcomes equal")
+    for name, before, after in [
+        ("single rows", legacy_single, schema_single),
+        ("batch + frame", legacy_batch, schema_batch),
+    ]:
+        before_s = _best_of(before, args.repeats)
+        after_s = _best_of(after, args.repeats)
+        print(
+            f"{name:14s} legacy {before_s / len(payloads) * 1e6:6.2f} us/row  "
+            f"schema {after_s / len(payloads) * 1e6:6.2f} us/row  ({before_s / after_s:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Latency of the /predict path: legacy double pass vs single-pass scoring.
+
+The legacy path re-reads the schema from the preprocessor and runs
+``model.predict`` followed by ``model.predict_proba`` on the same frame.
+The compiled variant serves the array-backed export from ``train.py``.
+
+    python -m benchmarks.bench_single_predict --requests 300
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import api.app as api_app
+from benchmarks.synthetic import sample_payloads, train_synthetic_model
+from src.inference import build_model_row, load_compiled_model, predict_with_probability_from_payload
+from src.train import export_compiled_model
+
+
+def legacy_predict_with_probability_from_payload(payload, model, cache=None, model_version=None):
+    # cache and model_version are accepted for the route's call signature and ignored.
+    preprocessor = model.named_steps["preprocessor"]
+    categorical_cols = list(preprocessor.transformers_[0][2])
+    numerical_cols = list(preprocessor.transformers_[1][2])
+    row = build_model_row(payload, categorical_cols, numerical_cols)
+    df = pd.DataFrame([row], columns=categorical_cols + numerical_cols)
+    prediction = int(model.predict(df)[0])
+    probability = float(model.predict_proba(df)[0][1])
+    return prediction, probability
+
+
+def _time_route(client: TestClient, payloads: list[dict]) -> list[float]:
+    latencies = []
+    for payload in payloads:
+        start = time.perf_counter()
+        client.post("/predict", json=payload).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _summary(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"mean {statistics.fmean(ordered):7.2f} ms  p50 {statistics.median(ordered):7.2f} ms  p99 {p99:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /predict latency before and after single-pass scoring.")
+    parser.add_argument("--requests", type=int, default=300, help="Number of /predict calls per variant")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="Synthetic rows used to fit the model")
+    args = parser.parse_args()
+
+    model, X_test = train_synthetic_model(args.train_rows)
+    payloads = sample_payloads(X_test, args.requests)
+    api_app.serving = (model, {})
+    client = TestClient(api_app.app)
+    _time_route(client, payloads[:10])
+
+    api_app.predict_with_probability_from_payload = legacy_predict_with_probability_from_payload
+    before = _time_route(client, payloads)
+    api_app.predict_with_probability_from_payload = predict_with_probability_from_payload
+    after = _time_route(client, payloads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled_path = Path(tmp) / "model_compiled.npz"
+        export_compiled_model(model, compiled_path)
+        api_app.serving = (load_compiled_model(compiled_path), {})
+    compiled = _time_route(client, payloads)
+
+    print(f"before (predict + predict_proba): {_summary(before)}")
+    print(f"after  (single predict_proba):    {_summary(after)}")
+    print(f"compiled scorer:                  {_summary(compiled)}")
+
+
+if __name__ == "__main__":
+    main()
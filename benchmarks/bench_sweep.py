@@ -0,0 +1,76 @@
+"""Streamlit sweep latency against a local API: per-point requests.post vs. the sweep client.
+
+Starts ``uvicorn api.app:app`` on a synthetic model and scores a 24-hour x
+``--series`` ride-distance grid three ways: a fresh ``requests.post`` per
+point (the app's old single-prediction path), the pooled session against
+``/predict``, and chunks to ``/predict/batch``. Streamlit's cache is not
+involved, so these are cold-cache times.
+
+    python -m benchmarks.bench_sweep --series 8
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import requests
+
+from app.sweep import build_grid, grid_values, make_session, score_payloads
+from benchmarks.load_test_api import start_server
+from benchmarks.synthetic import sample_payloads, train_synthetic_model
+
+
+def _best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit what-if sweeps against a local API.")
+    parser.add_argument("--series", type=int, default=8, help="Ride-distance curves (grid is 24 x series)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per variant; the fastest is reported")
+    args = parser.parse_args()
+
+    model, X_test = train_synthetic_model(5_000)
+    base = sample_payloads(X_test, 1)[0]
+    grid = build_grid(
+        base,
+        "booking_hour",
+        grid_values("booking_hour", 0, 23, 24),
+        "ride_distance",
+        grid_values("ride_distance", 1.0, 40.0, args.series),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "model.pkl"
+        joblib.dump(model, model_path)
+        process, base_url = start_server({}, model_path)
+        try:
+            predict_url = f"{base_url}/predict"
+            session = make_session()
+            score_payloads(session, predict_url, grid[:10])
+
+            def per_point_post():
+                for payload in grid:
+                    requests.post(predict_url, json=payload, timeout=10).raise_for_status()
+
+            variants = [
+                ("requests.post per point", per_point_post),
+                ("pooled session /predict", lambda: score_payloads(session, predict_url, grid, use_batch=False)),
+                ("batch chunks", lambda: score_payloads(session, predict_url, grid)),
+            ]
+            print(f"{len(grid)} grid points (24 x {args.series})")
+            for name, fn in variants:
+                print(f"{name:26s} {_best_of(fn, args.repeats) * 1e3:8.1f} ms")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
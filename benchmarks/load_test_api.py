@@ -0,0 +1,199 @@
+"""Load-test /predict on a local uvicorn server, with and without micro-batching.
+
+Each scenario starts a fresh ``uvicorn api.app:app`` subprocess serving a
+model trained on synthetic bookings, then fires concurrent requests with
+httpx and reports p50/p99 latency and throughput.
+
+With ``--shedding`` the scenarios instead compare an unbounded server with
+one behind the admission controller. Requests arrive open-loop at ``--rate``
+per second, above what the server can score, so an unbounded backlog keeps
+growing. Latency is measured from each request's scheduled start and is
+reported for all requests and for the 200s.
+
+    python -m benchmarks.load_test_api --requests 2000 --concurrency 64
+    python -m benchmarks.load_test_api --shedding --rate 40 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import joblib
+
+from benchmarks.synthetic import sample_payloads, train_synthetic_model
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env_overrides: dict[str, str], model_path: Path) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, "RIDE_API_MODEL_PATH": str(model_path), **env_overrides}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/", timeout=1.0).raise_for_status()
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become ready within 60s")
+
+
+async def run_load(
+    base_url: str, payloads: list[dict], total: int, concurrency: int, path: str = "/predict"
+) -> dict[str, float]:
+    latencies: list[float] = []
+    ok_latencies: list[float] = []
+    status_counts: dict[str, int] = {}
+    counter = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=payloads[i % len(payloads)])
+                status = str(response.status_code)
+            except httpx.TransportError as exc:
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status == "200":
+                ok_latencies.append(latencies[-1])
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        # Warm up the model load before timing.
+        await client.post(path, json=payloads[0])
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    ok_ordered = sorted(ok_latencies) or [float("nan")]
+    return {
+        "p50_ms": statistics.median(ordered),
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "ok_p99_ms": ok_ordered[min(len(ok_ordered) - 1, int(len(ok_ordered) * 0.99))],
+        "throughput_rps": len(ordered) / elapsed,
+        "goodput_rps": len(ok_latencies) / elapsed,
+        "status_counts": status_counts,
+    }
+
+
+async def run_open_loop(base_url: str, payloads: list[dict], rate: float, duration: float) -> dict[str, float]:
+    latencies: list[float] = []
+    ok_latencies: list[float] = []
+    status_counts: dict[str, int] = {}
+
+    async def fire(client: httpx.AsyncClient, i: int, scheduled: float) -> None:
+        try:
+            response = await client.post("/predict", json=payloads[i % len(payloads)])
+            status = str(response.status_code)
+        except httpx.TransportError as exc:
+            status = type(exc).__name__
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        if status == "200":
+            ok_latencies.append(latencies[-1])
+        status_counts[status] = status_counts.get(status, 0) + 1
+
+    total = int(rate * duration)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=64)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        await client.post("/predict", json=payloads[0])
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            scheduled = start + i / rate
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            tasks.append(asyncio.create_task(fire(client, i, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    ok_ordered = sorted(ok_latencies) or [float("nan")]
+    return {
+        "p50_ms": statistics.median(ordered),
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "ok_p99_ms": ok_ordered[min(len(ok_ordered) - 1, int(len(ok_ordered) * 0.99))],
+        "throughput_rps": len(ordered) / elapsed,
+        "goodput_rps": len(ok_latencies) / elapsed,
+        "status_counts": status_counts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the prediction API with and without micro-batching.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total /predict calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent in-flight requests")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="Micro-batching window")
+    parser.add_argument("--max-rows", type=int, default=64, help="Micro-batching max rows per batch")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="Synthetic rows used to fit the model")
+    parser.add_argument("--shedding", action="store_true", help="Compare unbounded vs. admission-controlled serving")
+    parser.add_argument("--rate", type=float, default=40.0, help="Shedding: offered requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="Shedding: seconds of offered load")
+    parser.add_argument("--max-concurrency", type=int, default=2, help="Admission control: concurrent scoring calls")
+    parser.add_argument("--max-queue", type=int, default=8, help="Admission control: requests waiting for a slot")
+    parser.add_argument("--timeout-s", type=float, default=1.0, help="Admission control: per-request deadline")
+    args = parser.parse_args()
+
+    model, X_test = train_synthetic_model(args.train_rows)
+    payloads = sample_payloads(X_test, 500)
+    if args.shedding:
+        scenarios = {
+            "unbounded": {"RIDE_API_MAX_CONCURRENCY": "0"},
+            f"admission ({args.max_concurrency} + {args.max_queue} queued, {args.timeout_s:g}s)": {
+                "RIDE_API_MAX_CONCURRENCY": str(args.max_concurrency),
+                "RIDE_API_MAX_QUEUE": str(args.max_queue),
+                "RIDE_API_REQUEST_TIMEOUT_S": str(args.timeout_s),
+            },
+        }
+    else:
+        scenarios = {
+            "per-request handler": {"RIDE_API_BATCH_WINDOW_MS": "0"},
+            f"micro-batched ({args.window_ms:g} ms / {args.max_rows} rows)": {
+                "RIDE_API_BATCH_WINDOW_MS": str(args.window_ms),
+                "RIDE_API_BATCH_MAX_ROWS": str(args.max_rows),
+            },
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "model.pkl"
+        joblib.dump(model, model_path)
+        for name, env in scenarios.items():
+            process, base_url = start_server(env, model_path)
+            try:
+                if args.shedding:
+                    stats = asyncio.run(run_open_loop(base_url, payloads, args.rate, args.duration))
+                else:
+                    stats = asyncio.run(run_load(base_url, payloads, args.requests, args.concurrency))
+            finally:
+                process.terminate()
+                process.wait()
+            print(
+                f"{name:40s} p50 {stats['p50_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  "
+                f"p99 (200s) {stats['ok_p99_ms']:8.1f} ms  {stats['throughput_rps']:8.1f} req/s  "
+                f"{stats['goodput_rps']:8.1f} ok/s  statuses {stats['status_counts']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""End-to-end performance suite with a stored baseline.
+
+Measures, on synthetic NCR bookings:
+
+* preprocess: ``clean_data`` throughput
+* train: ``build_pipeline`` plus fit time
+* inference: single-row latency of ``predict_with_probability_from_payload``
+  and per-row cost of ``predict_batch``
+* api: ``/predict`` and ``/predict/batch`` throughput through a test client
+
+Results are written as JSON. With ``--baseline`` every metric is compared
+with the stored value and the run exits with status 1 when one is worse by
+more than ``--threshold`` (a fraction, 0.25 = 25 %).
+
+    python -m benchmarks.suite --output bench_results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --output benchmarks/baseline.json    # refresh the baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import sklearn
+
+from benchmarks.synthetic import make_bookings, sample_payloads
+from src.inference import predict_batch, predict_with_probability_from_payload
+from src.preprocess import clean_data
+from src.train import build_pipeline
+
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+# Profiles keep CI runs short; "full" is closer to the real dataset size.
+PROFILES = {
+    "quick": {"preprocess_rows": 50_000, "train_rows": 5_000, "single_requests": 100, "batch_rows": 1_000},
+    "full": {"preprocess_rows": 500_000, "train_rows": 50_000, "single_requests": 500, "batch_rows": 5_000},
+}
+
+
+def _metric(value: float, unit: str, better: str) -> dict[str, Any]:
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def _best_of(fn: Callable[[], Any], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q))
+
+
+def bench_preprocess(config: dict[str, int], repeats: int) -> dict[str, Any]:
+    raw = make_bookings(config["preprocess_rows"], seed=1)
+    seconds = _best_of(lambda: clean_data(raw), repeats)
+    return {"preprocess.clean_data_rows_per_s": _metric(len(raw) / seconds, "rows/s", "higher")}
+
+
+def bench_train(config: dict[str, int]):
+    df = clean_data(make_bookings(config["train_rows"], seed=2))
+    start = time.perf_counter()
+    pipeline, X_train, X_test, y_train, _ = build_pipeline(df)
+    pipeline.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    return pipeline, X_test, {"train.fit_seconds": _metric(seconds, "s", "lower")}
+
+
+def bench_inference(model, payloads: list[dict], config: dict[str, int], repeats: int) -> dict[str, Any]:
+    single = payloads[: config["single_requests"]]
+    predict_with_probability_from_payload(single[0], model)
+    latencies = []
+    for payload in single:
+        start = time.perf_counter()
+        predict_with_probability_from_payload(payload, model)
+        latencies.append((time.perf_counter() - start) * 1e3)
+
+    batch = payloads[: config["batch_rows"]]
+    batch_seconds = _best_of(lambda: predict_batch(batch, model), repeats)
+    return {
+        "inference.single_p50_ms": _metric(statistics.median(latencies), "ms", "lower"),
+        "inference.single_p99_ms": _metric(_percentile(latencies, 99), "ms", "lower"),
+        "inference.batch_ms_per_row": _metric(batch_seconds / len(batch) * 1e3, "ms/row", "lower"),
+    }
+
+
+def bench_api(model, payloads: list[dict], config: dict[str, int], repeats: int) -> dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    import api.app as api_app
+
+    api_app.serving = (model, {})
+    client = TestClient(api_app.app)
+    single = payloads[: config["single_requests"]]
+    for payload in single[:10]:
+        client.post("/predict", json=payload).raise_for_status()
+
+    def predict_each():
+        for payload in single:
+            client.post("/predict", json=payload).raise_for_status()
+
+    batch = payloads[: config["batch_rows"]]
+    predict_seconds = _best_of(predict_each, repeats)
+    batch_seconds = _best_of(lambda: client.post("/predict/batch", json={"rows": batch}).raise_for_status(), repeats)
+    return {
+        "api.predict_requests_per_s": _metric(len(single) / predict_seconds, "req/s", "higher"),
+        "api.batch_rows_per_s": _metric(len(batch) / batch_seconds, "rows/s", "higher"),
+    }
+
+
+def run_suite(profile: str = "quick", repeats: int = 3) -> dict[str, Any]:
+    config = PROFILES[profile]
+    metrics: dict[str, Any] = {}
+    metrics.update(bench_preprocess(config, repeats))
+    model, X_test, train_metrics = bench_train(config)
+    metrics.update(train_metrics)
+    distinct = sample_payloads(X_test, len(X_test))
+    needed = max(config["single_requests"], config["batch_rows"])
+    payloads = [distinct[i % len(distinct)] for i in range(needed)]
+    metrics.update(bench_inference(model, payloads, config, repeats))
+    metrics.update(bench_api(model, payloads, config, repeats))
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "profile": profile,
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "created_at": time.time(),
+        "metrics": metrics,
+    }
+
+
+def compare_results(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> list[dict[str, Any]]:
+    """Per-metric change against the baseline; ``regression`` marks changes past ``threshold``.
+
+    ``change`` is signed so that positive means worse, whatever the metric's
+    direction. Metrics missing on either side are skipped.
+    """
+    rows = []
+    for name, entry in current["metrics"].items():
+        reference = baseline.get("metrics", {}).get(name)
+        if reference is None or not reference["value"]:
+            continue
+        relative = (entry["value"] - reference["value"]) / reference["value"]
+        change = -relative if entry["better"] == "higher" else relative
+        rows.append(
+            {
+                "metric": name,
+                "baseline": reference["value"],
+                "current": entry["value"],
+                "unit": entry["unit"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance suite and compare with a baseline.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick", help="Workload sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats for timed sections; the fastest counts")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction before a metric counts as a regression",
+    )
+    args = parser.parse_args(argv)
+    if args.baseline and not Path(args.baseline).exists():
+        parser.error(f"baseline not found: {args.baseline} (create one with --output)")
+
+    results = run_suite(args.profile, args.repeats)
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if not args.baseline:
+        for name, entry in results["metrics"].items():
+            print(f"{name:34s} {entry['value']:14,.3f} {entry['unit']}")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    if baseline.get("profile") != results["profile"]:
+        print(f"warning: baseline profile {baseline.get('profile')!r} differs from {results['profile']!r}", file=sys.stderr)
+    rows = compare_results(results, baseline, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(
+            f"{row['metric']:34s} {row['baseline']:14,.3f} -> {row['current']:14,.3f} {row['unit']:7s} "
+            f"{row['change']:+7.1%} {flag}"
+        )
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
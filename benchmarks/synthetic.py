@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.preprocess import clean_data
+    from src.train import build_pipeline
+except ModuleNotFoundError:
+    from preprocess import clean_data
+    from train import build_pipeline
+
+
+VEHICLE_TYPES = ["eBike", "Bike", "Auto", "Go Mini", "Go Sedan", "Premier Sedan", "Uber XL"]
+PAYMENT_METHODS = ["Cash", "UPI", "Credit Card", "Debit Card", "Uber Wallet"]
+LOCATIONS = [
+    "Palam Vihar", "Jhilmil", "Khandsa", "Central Secretariat", "Ghitorni Village",
+    "AIIMS", "Vaishali", "Mayur Vihar", "Noida Sector 62", "Cyber Hub",
+    "Saket", "Dwarka Mor", "Karol Bagh", "Lajpat Nagar", "Rajouri Garden",
+    "Nehru Place", "Indirapuram", "Pitampura", "Rohini", "Hauz Khas",
+]
+STATUSES = ["Completed", "Cancelled by Driver", "Cancelled by Customer", "No Driver Found", "Incomplete"]
+STATUS_WEIGHTS = [0.62, 0.18, 0.07, 0.07, 0.06]
+
+
+def make_bookings(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate raw bookings with the NCR ride-bookings CSV schema."""
+    rng = np.random.default_rng(seed)
+    status = rng.choice(STATUSES, size=n_rows, p=STATUS_WEIGHTS)
+    completed = status == "Completed"
+    cancelled_by_customer = status == "Cancelled by Customer"
+    cancelled_by_driver = status == "Cancelled by Driver"
+    incomplete = status == "Incomplete"
+
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, n_rows), unit="D")
+    seconds = rng.integers(0, 24 * 3600, n_rows)
+
+    def _maybe(values: np.ndarray, keep: np.ndarray) -> np.ndarray:
+        out = values.astype(float)
+        out[~keep] = np.nan
+        return out
+
+    has_trip = completed | incomplete
+    frame = pd.DataFrame(
+        {
+            "Date": dates.strftime("%Y-%m-%d"),
+            "Time": _format_times(seconds),
+            "Booking ID": [f'"CNR{i:07d}"' for i in range(n_rows)],
+            "Booking Status": status,
+            "Customer ID": [f'"CID{v:07d}"' for v in rng.integers(0, max(n_rows // 3, 1), n_rows)],
+            "Vehicle Type": rng.choice(VEHICLE_TYPES, size=n_rows),
+            "Pickup Location": rng.choice(LOCATIONS, size=n_rows),
+            "Drop Location": rng.choice(LOCATIONS, size=n_rows),
+            "Avg VTAT": _maybe(rng.gamma(4.0, 2.2, n_rows).round(1), status != "No Driver Found"),
+            "Avg CTAT": _maybe(rng.gamma(6.0, 5.0, n_rows).round(1), has_trip),
+            "Cancelled Rides by Customer": _maybe(np.ones(n_rows), cancelled_by_customer),
+            "Reason for cancelling by Customer": np.where(cancelled_by_customer, "Driver is not moving towards pickup location", None),
+            "Cancelled Rides by Driver": _maybe(np.ones(n_rows), cancelled_by_driver),
+            "Driver Cancellation Reason": np.where(cancelled_by_driver, "Personal & Car related issues", None),
+            "Incomplete Rides": _maybe(np.ones(n_rows), incomplete),
+            "Incomplete Rides Reason": np.where(incomplete, "Vehicle Breakdown", None),
+            "Booking Value": _maybe(rng.lognormal(6.0, 0.6, n_rows).round(0), has_trip),
+            "Ride Distance": _maybe(rng.uniform(1.0, 50.0, n_rows).round(2), has_trip),
+            "Driver Ratings": _maybe(rng.uniform(3.0, 5.0, n_rows).round(1), completed),
+            "Customer Rating": _maybe(rng.uniform(3.0, 5.0, n_rows).round(1), completed),
+            "Payment Method": np.where(has_trip, rng.choice(PAYMENT_METHODS, size=n_rows), None),
+        }
+    )
+    return frame
+
+
+def _format_times(seconds: np.ndarray) -> np.ndarray:
+    hours = (seconds // 3600).astype(str)
+    minutes = ((seconds // 60) % 60).astype(str)
+    secs = (seconds % 60).astype(str)
+    return np.char.add(
+        np.char.add(np.char.add(np.char.zfill(hours, 2), ":"), np.char.add(np.char.zfill(minutes, 2), ":")),
+        np.char.zfill(secs, 2),
+    )
+
+
+def train_synthetic_model(n_rows: int = 5_000, seed: int = 42, n_estimators: int | None = None):
+    """Fit the production pipeline on synthetic bookings; returns (pipeline, X_test)."""
+    df = clean_data(make_bookings(n_rows, seed=seed))
+    pipeline, X_train, X_test, y_train, _ = build_pipeline(df)
+    if n_estimators is not None:
+        pipeline.set_params(classifier__n_estimators=n_estimators)
+    pipeline.fit(X_train, y_train)
+    return pipeline, X_test
+
+
+def sample_payloads(X: pd.DataFrame, n: int) -> list[dict]:
+    rows = X.head(n).to_dict(orient="records")
+    return [{k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()} for row in rows]
@@ -1,15 +1,37 @@
 from pathlib import Path
 import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
-from evidently import Report
-from evidently.presets import DataDriftPreset
+from scipy import stats
+from scipy.spatial import distance
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.prediction_log import read_prediction_log
+from src.preprocess import clean_data
+
 DEFAULT_REFERENCE = PROJECT_ROOT / "data" / "ncr_ride_bookings.csv"
 DEFAULT_CURRENT = DEFAULT_REFERENCE
 DEFAULT_OUTPUT = Path(__file__).resolve().parent / "drift_report.html"
+DEFAULT_STATS_OUTPUT = Path(__file__).resolve().parent / "drift_report.json"
+# Rows read to choose dtype hints before the full load.
+DTYPE_SAMPLE_ROWS = 10_000
+# Text columns with at most this share of distinct values load as category.
+CATEGORY_MAX_UNIQUE_SHARE = 0.5
+# Same defaults as Evidently's DataDriftPreset: p-value tests up to 1000 rows,
+# distance measures above.
+SMALL_SAMPLE_ROWS = 1000
+P_VALUE_THRESHOLD = 0.05
+DISTANCE_THRESHOLD = 0.1
 
 
 def _resolve_path(path_str: str) -> Path:
@@ -22,52 +44,304 @@ def _resolve_path(path_str: str) -> Path:
     return p.resolve()
 
 
+def _normalize_name(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out.columns = (
-        out.columns
-        .str.strip()
-        .str.lower()
-        .str.replace(" ", "_", regex=False)
-    )
-    return out
+    # Renames in place; the data is not copied.
+    df.columns = [_normalize_name(col) for col in df.columns]
+    return df
 
 
-def _load_csv(path: Path, label: str) -> pd.DataFrame:
+def _check_exists(path: Path, label: str) -> None:
     if not path.exists():
         raise FileNotFoundError(
             f"{label} file not found: {path}. "
             f"Provide an existing path via --{label}."
         )
-    return pd.read_csv(path)
+
+
+def _read_header(path: Path) -> dict[str, str]:
+    """Map normalized column names to the names used in the file."""
+    return {_normalize_name(col): col for col in pd.read_csv(path, nrows=0).columns}
+
+
+def _infer_dtypes(path: Path, columns: list[str]) -> dict[str, str]:
+    # Low-cardinality text as category and floats as float32 shrink the
+    # loaded frame several times over.
+    sample = pd.read_csv(path, usecols=columns, nrows=DTYPE_SAMPLE_ROWS)
+    hints = {}
+    for col in columns:
+        values = sample[col]
+        if values.isna().all():
+            # An empty sample says nothing about the rest of the file.
+            continue
+        if pd.api.types.is_float_dtype(values):
+            hints[col] = "float32"
+        elif not pd.api.types.is_numeric_dtype(values) and values.nunique() <= CATEGORY_MAX_UNIQUE_SHARE * len(values):
+            hints[col] = "category"
+    return hints
+
+
+def _count_rows(path: Path) -> int:
+    with open(path, "rb") as handle:
+        lines = sum(block.count(b"\n") for block in iter(lambda: handle.read(1 << 24), b""))
+    return max(lines - 1, 0)
+
+
+def stratified_sample(
+    df: pd.DataFrame, fraction: float, stratify_by: str | None, rng: np.random.Generator
+) -> pd.DataFrame:
+    """Keep ``fraction`` of the rows, in the same proportion within each stratum."""
+    if fraction >= 1.0:
+        return df
+    if stratify_by is None:
+        keep = rng.random(len(df)) < fraction
+        return df.loc[keep]
+    groups = df.groupby(stratify_by, dropna=False, observed=True, sort=False).indices
+    positions = []
+    for indices in groups.values():
+        # Round randomly so that small strata are kept in expectation.
+        target = len(indices) * fraction
+        size = int(target) + int(rng.random() < target - int(target))
+        positions.append(rng.choice(indices, size=size, replace=False))
+    return df.iloc[np.sort(np.concatenate(positions))] if positions else df.iloc[:0]
+
+
+def load_table(
+    path: Path,
+    label: str,
+    columns: list[str] | None = None,
+    sample_size: int | None = None,
+    stratify_by: str | None = None,
+    seed: int = 42,
+    dtype_hints: bool = True,
+    chunksize: int = 1_000_000,
+) -> pd.DataFrame:
+    """Read only ``columns`` (normalized names) and optionally sample while streaming.
+
+    With ``sample_size`` the file is read in chunks and each chunk is sampled
+    with the same fraction, so memory stays around one chunk plus the sample.
+    """
+    _check_exists(path, label)
+    header = _read_header(path)
+    wanted = list(header) if columns is None else [col for col in columns if col in header]
+    if stratify_by is not None and stratify_by not in header:
+        raise ValueError(f"--stratify-by column '{stratify_by}' not found in {label} data.")
+    load_columns = wanted + ([stratify_by] if stratify_by and stratify_by not in wanted else [])
+    usecols = [header[col] for col in load_columns]
+    dtypes = _infer_dtypes(path, usecols) if dtype_hints else None
+    read = (path, usecols, load_columns, sample_size, stratify_by, seed, chunksize)
+    try:
+        return _read_table(*read, dtypes)
+    except (TypeError, ValueError):
+        if not dtypes:
+            raise
+        # The hints come from the first rows; a column that turns to text
+        # further down cannot be parsed with them.
+        return _read_table(*read, None)
+
+
+def _read_table(
+    path: Path,
+    usecols: list[str],
+    load_columns: list[str],
+    sample_size: int | None,
+    stratify_by: str | None,
+    seed: int,
+    chunksize: int,
+    dtypes: dict[str, str] | None,
+) -> pd.DataFrame:
+    if sample_size is None:
+        return _normalize_columns(pd.read_csv(path, usecols=usecols, dtype=dtypes))[load_columns]
+
+    fraction = sample_size / max(_count_rows(path), 1)
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        chunk = _normalize_columns(chunk)
+        chunks.append(stratified_sample(chunk, fraction, stratify_by, rng))
+    frame = pd.concat(chunks, ignore_index=True)
+    if dtypes:
+        # Per-chunk categoricals can disagree on categories; re-unify them.
+        for col, dtype in dtypes.items():
+            if dtype == "category":
+                frame[_normalize_name(col)] = frame[_normalize_name(col)].astype("category")
+    return frame[load_columns]
+
+
+def column_drift(name: str, reference: np.ndarray, current: np.ndarray, numeric: bool) -> dict:
+    """Drift test for one column, chosen the way Evidently's preset does."""
+    started = time.perf_counter()
+    reference = reference[~pd.isna(reference)]
+    current = current[~pd.isna(current)]
+    small = min(len(reference), len(current)) <= SMALL_SAMPLE_ROWS
+    if len(reference) == 0 or len(current) == 0:
+        test, statistic, drift, threshold = "empty", float("nan"), False, None
+    elif numeric:
+        reference = reference.astype(float)
+        current = current.astype(float)
+        if small:
+            test, threshold = "ks", P_VALUE_THRESHOLD
+            statistic = float(stats.ks_2samp(reference, current).pvalue)
+            drift = statistic < threshold
+        else:
+            test, threshold = "wasserstein_normed", DISTANCE_THRESHOLD
+            scale = np.std(reference) or 1.0
+            statistic = float(stats.wasserstein_distance(reference, current) / scale)
+            drift = statistic >= threshold
+    else:
+        counts = pd.concat(
+            [pd.Series(reference).astype(str).value_counts(), pd.Series(current).astype(str).value_counts()],
+            axis=1,
+        ).fillna(0)
+        reference_counts, current_counts = counts.to_numpy(dtype=float).T
+        if small:
+            test, threshold = "chi_square", P_VALUE_THRESHOLD
+            table = np.vstack([reference_counts, current_counts])
+            table = table[:, table.sum(axis=0) > 0]
+            statistic = float(stats.chi2_contingency(table).pvalue) if table.shape[1] > 1 else 1.0
+            drift = statistic < threshold
+        else:
+            test, threshold = "jensen_shannon", DISTANCE_THRESHOLD
+            statistic = float(distance.jensenshannon(reference_counts, current_counts))
+            drift = statistic >= threshold
+    return {
+        "column": name,
+        "type": "numeric" if numeric else "categorical",
+        "test": test,
+        "statistic": statistic,
+        "threshold": threshold,
+        "drift": bool(drift),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _column_arrays(reference: pd.DataFrame, current: pd.DataFrame, col: str):
+    numeric = pd.api.types.is_numeric_dtype(reference[col]) and pd.api.types.is_numeric_dtype(current[col])
+    if numeric:
+        return reference[col].to_numpy(dtype=float, na_value=np.nan), current[col].to_numpy(dtype=float, na_value=np.nan), True
+    return reference[col].astype(object).to_numpy(), current[col].astype(object).to_numpy(), False
+
+
+def run_column_tests(reference: pd.DataFrame, current: pd.DataFrame, columns: list[str], jobs: int = 1) -> list[dict]:
+    """Per-column drift tests, spread over ``jobs`` processes."""
+    tasks = [(col, *_column_arrays(reference, current, col)) for col in columns]
+    if jobs <= 1:
+        return [column_drift(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(column_drift, *task) for task in tasks]
+        return [future.result() for future in futures]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate an Evidently data drift report.")
     parser.add_argument("--reference", default=str(DEFAULT_REFERENCE), help="Path to reference CSV")
     parser.add_argument("--current", default=str(DEFAULT_CURRENT), help="Path to current CSV")
-    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Path to output HTML report")
+    parser.add_argument("--output", help="Output path (default: drift_report.html, or .json for --engine stats)")
+    parser.add_argument(
+        "--current-log",
+        help="Prediction log directory written by the API (RIDE_API_PREDICTION_LOG_DIR); used instead of --current",
+    )
+    parser.add_argument("--since-hours", type=float, help="Only use logged predictions from the last N hours")
+    parser.add_argument("--model-version", help="Only use predictions made by this model version")
+    parser.add_argument(
+        "--engine",
+        choices=["evidently", "stats"],
+        default="evidently",
+        help="evidently: HTML report; stats: column-parallel tests with a JSON summary",
+    )
+    parser.add_argument("--columns", help="Comma-separated columns to compare (default: all common columns)")
+    parser.add_argument("--sample-size", type=int, help="Rows to sample from each dataset")
+    parser.add_argument("--stratify-by", help="Column whose proportions the sample preserves")
+    parser.add_argument("--seed", type=int, default=42, help="Sampling seed")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processes for --engine stats")
+    parser.add_argument("--no-dtype-hints", action="store_true", help="Let pandas infer dtypes")
     args = parser.parse_args()
 
     reference_path = _resolve_path(args.reference)
-    current_path = _resolve_path(args.current)
-    output_path = _resolve_path(args.output)
+    default_output = DEFAULT_STATS_OUTPUT if args.engine == "stats" else DEFAULT_OUTPUT
+    output_path = _resolve_path(args.output) if args.output else default_output
+    requested = [_normalize_name(col) for col in args.columns.split(",")] if args.columns else None
+    load_options = {
+        "sample_size": args.sample_size,
+        "stratify_by": _normalize_name(args.stratify_by) if args.stratify_by else None,
+        "seed": args.seed,
+        "dtype_hints": not args.no_dtype_hints,
+    }
+    timings = {}
 
-    reference = _normalize_columns(_load_csv(reference_path, "reference"))
-    current = _normalize_columns(_load_csv(current_path, "current"))
+    started = time.perf_counter()
+    if args.current_log:
+        # Logged rows are model inputs, so compare them with the cleaned
+        # training features rather than the raw CSV.
+        since = time.time() - args.since_hours * 3600 if args.since_hours else None
+        logged = read_prediction_log(_resolve_path(args.current_log), since=since, model_version=args.model_version)
+        if logged.empty:
+            raise ValueError(f"No logged predictions found in {args.current_log}.")
+        current = logged[[col for col in logged.columns if not col.startswith("_")]]
+        if args.sample_size and len(current) > args.sample_size:
+            current = current.sample(n=args.sample_size, random_state=args.seed)
+        timings["load_current_seconds"] = time.perf_counter() - started
+        started = time.perf_counter()
+        # clean_data applies its own dtype plan to the raw text columns.
+        load_options["dtype_hints"] = False
+        reference = clean_data(load_table(reference_path, "reference", **load_options)).drop(columns="is_cancelled")
+        timings["load_reference_seconds"] = time.perf_counter() - started
+    else:
+        current_path = _resolve_path(args.current)
+        _check_exists(current_path, "current")
+        # Read only the columns both files share (or the requested ones).
+        shared = [col for col in _read_header(reference_path) if col in _read_header(current_path)]
+        wanted = [col for col in requested if col in shared] if requested else shared
+        reference = load_table(reference_path, "reference", wanted, **load_options)
+        timings["load_reference_seconds"] = time.perf_counter() - started
+        started = time.perf_counter()
+        current = load_table(current_path, "current", wanted, **load_options)
+        timings["load_current_seconds"] = time.perf_counter() - started
 
     common_columns = [col for col in reference.columns if col in current.columns]
+    if requested:
+        common_columns = [col for col in common_columns if col in requested]
     if not common_columns:
         raise ValueError("No common columns found between reference and current datasets.")
 
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    if args.engine == "stats":
+        results = run_column_tests(reference, current, common_columns, jobs=args.jobs)
+        timings["tests_seconds"] = time.perf_counter() - started
+        summary = {
+            "reference_rows": len(reference),
+            "current_rows": len(current),
+            "drifted_columns": sum(result["drift"] for result in results),
+            "share_drifted": sum(result["drift"] for result in results) / len(results),
+            "timings": timings,
+            "columns": results,
+        }
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        for result in sorted(results, key=lambda item: -item["seconds"]):
+            print(
+                f"{result['column']:32s} {result['test']:20s} {result['statistic']:10.4f} "
+                f"{'DRIFT' if result['drift'] else 'ok':5s} {result['seconds'] * 1000:8.1f} ms"
+            )
+        print(f"Drift summary saved to: {output_path}")
+        return
+
+    # Imported here so the stats engine works without Evidently installed.
+    from evidently import Report
+    from evidently.presets import DataDriftPreset
+
     report = Report(metrics=[DataDriftPreset()])
     snapshot = report.run(
         reference_data=reference[common_columns],
         current_data=current[common_columns],
     )
+    timings["report_seconds"] = time.perf_counter() - started
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
     snapshot.save_html(str(output_path))
+    print(", ".join(f"{name} {seconds:.2f}" for name, seconds in timings.items()))
     print(f"Drift report saved to: {output_path}")
 
 
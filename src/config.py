@@ -2,7 +2,12 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_PATH = PROJECT_ROOT / "data" / "ncr_ride_bookings.csv"
+FEATURE_CACHE_DIR = PROJECT_ROOT / "data" / "cache"
 MODEL_PATH = PROJECT_ROOT / "models" / "model.pkl"
+COMPILED_MODEL_PATH = PROJECT_ROOT / "models" / "model_compiled.npz"
+DRIFT_REFERENCE_PATH = PROJECT_ROOT / "models" / "drift_reference.json"
+LOCATION_INDEX_PATH = PROJECT_ROOT / "models" / "location_index.json"
 MLFLOW_DB_PATH = PROJECT_ROOT / "mlflow.db"
 MLFLOW_TRACKING_URI = f"sqlite:///{MLFLOW_DB_PATH.as_posix()}"
 MLFLOW_EXPERIMENT = "ride-cancellation"
+DECISION_THRESHOLD = 0.5
@@ -0,0 +1,228 @@
+"""Streaming drift detection against compact reference sketches.
+
+``build_reference_profile`` summarises the training features once: quantile
+bins for numeric columns and frequency tables for categoricals. A
+``DriftMonitor`` keeps bin counts for a sliding window of live model rows,
+updated incrementally, and compares them with the reference using PSI, a
+binned KS statistic (numeric) and chi-square (categorical).
+"""
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+PROFILE_VERSION = 1
+NUMERIC_QUANTILES = 20
+MAX_CATEGORIES = 50
+# Floor for empty bins so PSI and chi-square stay finite.
+EPSILON = 1e-4
+
+DEFAULT_THRESHOLDS = {"psi": 0.2, "ks": 0.1, "chi2_p_value": 0.01}
+
+
+def build_reference_profile(df: pd.DataFrame) -> dict[str, Any]:
+    """Summarise each column of the training features for drift monitoring."""
+    features: dict[str, Any] = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+            present = numbers[~np.isnan(numbers)]
+            quantiles = np.linspace(0, 1, NUMERIC_QUANTILES + 1)[1:-1]
+            edges = np.unique(np.quantile(present, quantiles)) if len(present) else np.empty(0)
+            counts = _numeric_counts(numbers, edges)
+            features[col] = {"type": "numeric", "edges": edges.tolist(), "proportions": _proportions(counts)}
+        else:
+            frequencies = values.astype(object).where(values.notna(), "unknown").astype(str).value_counts()
+            categories = frequencies.index[:MAX_CATEGORIES].tolist()
+            counts = np.append(frequencies.iloc[:MAX_CATEGORIES].to_numpy(), frequencies.iloc[MAX_CATEGORIES:].sum())
+            features[col] = {"type": "categorical", "categories": categories, "proportions": _proportions(counts)}
+    return {"version": PROFILE_VERSION, "rows": int(len(df)), "features": features}
+
+
+def save_reference_profile(profile: dict[str, Any], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(profile), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def load_reference_profile(path: Path) -> dict[str, Any]:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Drift reference profile not found: {path}")
+    profile = json.loads(path.read_text(encoding="utf-8"))
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"Unsupported drift profile version: {profile.get('version')}")
+    return profile
+
+
+def _proportions(counts: np.ndarray) -> list[float]:
+    total = counts.sum()
+    return (counts / total).tolist() if total else np.zeros(len(counts)).tolist()
+
+
+def _numeric_bins(numbers: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    # Bins 0..len(edges) follow the quantile edges; the last bin holds NaN.
+    bins = np.searchsorted(edges, numbers, side="right")
+    bins[np.isnan(numbers)] = len(edges) + 1
+    return bins
+
+
+def _numeric_counts(numbers: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.bincount(_numeric_bins(numbers, edges), minlength=len(edges) + 2)
+
+
+def _psi(observed: np.ndarray, expected: np.ndarray) -> float:
+    observed = np.clip(observed, EPSILON, None)
+    expected = np.clip(expected, EPSILON, None)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+
+class DriftMonitor:
+    """Sliding-window drift statistics for live model rows.
+
+    The last ``window_size`` rows are kept as one bin index per feature in a
+    ring buffer, so each update and eviction only adjusts counts. ``report``
+    reads the counts; it does not rescan the window.
+    """
+
+    def __init__(
+        self,
+        profile: dict[str, Any],
+        window_size: int = 5000,
+        min_samples: int = 200,
+        thresholds: Optional[dict[str, float]] = None,
+    ) -> None:
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1.")
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.features = list(profile["features"])
+        self._specs = []
+        offset = 0
+        for name in self.features:
+            spec = dict(profile["features"][name])
+            spec["reference"] = np.asarray(spec["proportions"], dtype=float)
+            spec["offset"] = offset
+            if spec["type"] == "numeric":
+                spec["edges"] = np.asarray(spec["edges"], dtype=float)
+            else:
+                spec["index"] = {category: i for i, category in enumerate(spec["categories"])}
+            offset += len(spec["reference"])
+            self._specs.append(spec)
+        self._counts = np.zeros(offset, dtype=np.int64)
+        self._ring = np.zeros((window_size, len(self.features)), dtype=np.int32)
+        self._position = 0
+        self._filled = 0
+        self._total_rows = 0
+        self._lock = threading.Lock()
+
+    def _encode(self, frame: pd.DataFrame) -> np.ndarray:
+        bins = np.empty((len(frame), len(self.features)), dtype=np.int32)
+        for j, (name, spec) in enumerate(zip(self.features, self._specs)):
+            if name not in frame:
+                raise ValueError(f"Missing drift feature '{name}'.")
+            if spec["type"] == "numeric":
+                numbers = pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                local = _numeric_bins(numbers, spec["edges"])
+            else:
+                labels = frame[name].astype(object).where(frame[name].notna(), "unknown").astype(str)
+                # Categories outside the reference table share the last bin.
+                local = labels.map(spec["index"]).fillna(len(spec["categories"])).to_numpy(dtype=np.int32)
+            bins[:, j] = spec["offset"] + local
+        return bins
+
+    def update(self, rows) -> None:
+        """Add model rows (a DataFrame or a list of dicts) to the window."""
+        frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+        if frame.empty:
+            return
+        bins = self._encode(frame)
+        with self._lock:
+            self._total_rows += len(bins)
+            # Rows beyond one window would be evicted by this same update.
+            bins = bins[-self.window_size:]
+            slots = (self._position + np.arange(len(bins))) % self.window_size
+            # New rows go into free slots first, then over the oldest rows.
+            evicted = slots[len(slots) - max(0, self._filled + len(bins) - self.window_size):]
+            if len(evicted):
+                np.subtract.at(self._counts, self._ring[evicted].ravel(), 1)
+            self._ring[slots] = bins
+            np.add.at(self._counts, bins.ravel(), 1)
+            self._position = int((self._position + len(bins)) % self.window_size)
+            self._filled = min(self.window_size, self._filled + len(bins))
+
+    def report(self) -> dict[str, Any]:
+        """Drift statistics and alerts for the current window, as JSON-ready data."""
+        started = time.perf_counter()
+        with self._lock:
+            counts = self._counts.copy()
+            window_rows = self._filled
+            total_rows = self._total_rows
+
+        features: dict[str, Any] = {}
+        alerts: list[dict[str, Any]] = []
+        enough = window_rows >= self.min_samples
+        for name, spec in zip(self.features, self._specs):
+            reference = spec["reference"]
+            observed = counts[spec["offset"]:spec["offset"] + len(reference)]
+            proportions = observed / window_rows if window_rows else np.zeros(len(reference))
+            stats: dict[str, Any] = {"type": spec["type"], "psi": _psi(proportions, reference)}
+            breached = ["psi"] if stats["psi"] > self.thresholds["psi"] else []
+            if spec["type"] == "numeric":
+                # KS over the reference quantile bins; exact at every bin edge.
+                stats["ks"] = float(np.max(np.abs(np.cumsum(proportions) - np.cumsum(reference))))
+                if stats["ks"] > self.thresholds["ks"]:
+                    breached.append("ks")
+            else:
+                expected = np.clip(reference, EPSILON, None) * window_rows
+                statistic = float(np.sum((observed - expected) ** 2 / expected)) if window_rows else 0.0
+                stats["chi2"] = statistic
+                stats["chi2_p_value"] = float(chi2.sf(statistic, max(len(reference) - 1, 1))) if window_rows else 1.0
+                if stats["chi2_p_value"] < self.thresholds["chi2_p_value"]:
+                    breached.append("chi2_p_value")
+            fired = [
+                {"feature": name, "metric": metric, "value": stats[metric], "threshold": self.thresholds[metric]}
+                for metric in breached
+            ]
+            stats["drifted"] = enough and bool(fired)
+            if enough:
+                alerts.extend(fired)
+            features[name] = stats
+
+        return {
+            "window_rows": window_rows,
+            "window_size": self.window_size,
+            "rows_seen": total_rows,
+            "status": ("drift" if alerts else "ok") if enough else "insufficient_data",
+            "alerts": alerts,
+            "features": features,
+            "computed_ms": (time.perf_counter() - started) * 1e3,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check a file of model rows against a drift reference profile.")
+    parser.add_argument("--profile", required=True, help="Reference profile JSON written by train.py")
+    parser.add_argument("--current", required=True, help="CSV or Parquet file of model rows")
+    parser.add_argument("--window", type=int, default=5000, help="Rows in the sliding window")
+    args = parser.parse_args()
+
+    monitor = DriftMonitor(load_reference_profile(args.profile), window_size=args.window, min_samples=1)
+    current_path = Path(args.current)
+    frame = pd.read_parquet(current_path) if current_path.suffix == ".parquet" else pd.read_csv(current_path)
+    monitor.update(frame[monitor.features])
+    print(json.dumps(monitor.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
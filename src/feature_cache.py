@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+try:
+    import src.preprocess as preprocess
+    from src.config import FEATURE_CACHE_DIR
+except ModuleNotFoundError:
+    import preprocess
+    from config import FEATURE_CACHE_DIR
+
+
+def preprocess_version() -> str:
+    """Hash of the preprocessing code and pandas version.
+
+    Any edit to ``src/preprocess.py`` changes it, so stale cleaned frames are
+    never reused after the cleaning logic changes.
+    """
+    digest = hashlib.sha256(Path(preprocess.__file__).read_bytes())
+    digest.update(pd.__version__.encode())
+    return digest.hexdigest()[:16]
+
+
+def source_fingerprint(path: Path, hash_content: bool = True) -> dict[str, Any]:
+    stat = path.stat()
+    fingerprint: dict[str, Any] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if hash_content:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def cache_key(path: Path, hash_content: bool = True) -> str:
+    payload = {
+        "source": source_fingerprint(path, hash_content=hash_content),
+        "preprocess_version": preprocess_version(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def load_clean_data(
+    source_path,
+    cache_dir=FEATURE_CACHE_DIR,
+    rebuild: bool = False,
+    hash_content: bool = True,
+) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """Return ``clean_data(load_data(source_path))``, cached as Parquet.
+
+    The cache entry is keyed by the source file's size, mtime and (optionally)
+    content hash plus ``preprocess_version()``. ``rebuild`` ignores an existing
+    entry and overwrites it. The second return value describes what happened,
+    for logging.
+    """
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir)
+    started = time.perf_counter()
+    key = cache_key(source_path, hash_content=hash_content)
+    cache_path = cache_dir / f"{source_path.stem}-{key}.parquet"
+    info: dict[str, Any] = {
+        "feature_cache_key": key,
+        "feature_cache_path": str(cache_path),
+        "feature_cache_fingerprint_seconds": time.perf_counter() - started,
+    }
+
+    if cache_path.exists() and not rebuild:
+        started = time.perf_counter()
+        df = pd.read_parquet(cache_path)
+        info.update({"feature_cache_hit": True, "feature_cache_load_seconds": time.perf_counter() - started})
+        return df, info
+
+    started = time.perf_counter()
+    df = preprocess.clean_data(preprocess.load_data(source_path))
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, cache_path)
+    info.update(
+        {
+            "feature_cache_hit": False,
+            "feature_cache_build_seconds": build_seconds,
+            "feature_cache_write_seconds": time.perf_counter() - started,
+        }
+    )
+    return df, info
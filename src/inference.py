@@ -1,72 +1,656 @@
+import functools
+import json
+import math
+import weakref
+import zipfile
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import joblib
+import numpy as np
 import pandas as pd
 
+try:
+    from src import metrics
+    from src.location_index import LocationIndex
+    from src.metrics import time_stage
+except ModuleNotFoundError:
+    import metrics
+    from location_index import LocationIndex
+    from metrics import time_stage
 
-def load_model(model_path: Path):
+DEFAULT_DECISION_THRESHOLD = 0.5
+COMPILED_CHUNK_ROWS = 1024
+
+# Schema derived from a fitted model, keyed by the model object itself so a
+# reloaded model never sees a stale entry.
+_SCHEMA_CACHE: "weakref.WeakKeyDictionary[Any, tuple[list[str], list[str], list[str]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_PAYLOAD_SCHEMA_CACHE: "weakref.WeakKeyDictionary[Any, PayloadSchema]" = weakref.WeakKeyDictionary()
+
+
+def load_model(model_path: Path, mmap_mode: Optional[str] = None):
+    """Load the pickled pipeline.
+
+    ``mmap_mode`` is passed to ``joblib.load``; large NumPy arrays in the pickle
+    are then mapped from disk. Note that sklearn copies tree nodes into its own
+    buffers on unpickle, so workers only share pages for the compiled model.
+    """
     if not model_path.exists():
         raise FileNotFoundError(f"Model file not found: {model_path}")
-    return joblib.load(model_path)
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+class CompiledModel:
+    """Array-backed scorer exported by ``src.train.export_compiled_model``.
+
+    Encodes model rows with category lookup tables and walks every tree of the
+    forest at once with NumPy, without building a DataFrame.
+    """
+
+    def __init__(self, arrays) -> None:
+        self.categorical_cols = [str(c) for c in arrays["categorical_cols"]]
+        self.numerical_cols = [str(c) for c in arrays["numerical_cols"]]
+        self.expected_cols = self.categorical_cols + self.numerical_cols
+        # category_columns_<i> is only written when rare levels share a column.
+        self.category_index = [
+            {
+                str(category): int(offset) + int(column)
+                for category, column in zip(
+                    arrays[f"categories_{index}"],
+                    arrays.get(f"category_columns_{index}", range(len(arrays[f"categories_{index}"]))),
+                )
+            }
+            for index, offset in enumerate(arrays["onehot_offsets"])
+        ]
+        self.numeric_offset = int(arrays["n_features"]) - len(self.numerical_cols)
+        self.n_features = int(arrays["n_features"])
+        self.sparse_input = bool(arrays["sparse_input"])
+        self.classes_ = np.asarray(arrays["classes"])
+        self.decision_threshold = float(arrays["decision_threshold"])
+        self.mlflow_run_id = str(arrays["mlflow_run_id"]) if "mlflow_run_id" in arrays else ""
+        location_index = str(arrays["location_index"]) if "location_index" in arrays else ""
+        self.location_index = LocationIndex.from_dict(json.loads(location_index)) if location_index else None
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.missing_go_to_left = arrays["missing_go_to_left"]
+        self.leaf_value = arrays["leaf_value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+
+    def encode_rows(self, rows: list[dict[str, Any]]) -> np.ndarray:
+        # Trees compare float32 inputs against float64 thresholds, as sklearn does.
+        X = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        numeric_slice = slice(self.numeric_offset, self.n_features)
+        for i, row in enumerate(rows):
+            for col, table in zip(self.categorical_cols, self.category_index):
+                position = table.get(row[col]) if isinstance(row[col], str) else None
+                if position is not None:
+                    X[i, position] = 1.0
+            X[i, numeric_slice] = [row[col] for col in self.numerical_cols]
+        return X
+
+    def encode_columns(self, categorical: np.ndarray, numeric: np.ndarray) -> np.ndarray:
+        """``encode_rows`` for ``EncodedRows`` buffers (one object row per categorical column)."""
+        X = np.zeros((len(numeric), self.n_features), dtype=np.float32)
+        for values, table in zip(categorical, self.category_index):
+            for i, value in enumerate(values):
+                position = table.get(value) if isinstance(value, str) else None
+                if position is not None:
+                    X[i, position] = 1.0
+        X[:, self.numeric_offset:] = numeric
+        return X
+
+    def encode_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        """Vectorised ``encode_rows`` for a frame with the model's columns."""
+        X = np.zeros((len(frame), self.n_features), dtype=np.float32)
+        for col, table in zip(self.categorical_cols, self.category_index):
+            positions = frame[col].map(lambda value: table.get(value) if isinstance(value, str) else None)
+            rows = np.flatnonzero(positions.notna().to_numpy())
+            X[rows, positions.iloc[rows].to_numpy(dtype=np.int64)] = 1.0
+        X[:, self.numeric_offset:] = frame[self.numerical_cols].to_numpy(dtype=np.float32)
+        return X
+
+    def predict_proba_encoded(self, X: np.ndarray) -> np.ndarray:
+        if self.sparse_input and np.isnan(X).any():
+            # The forest rejects NaN in sparse input; keep the pipeline's behaviour.
+            raise ValueError("Input X contains NaN.")
+        flat = X.ravel()
+        row_base = np.arange(X.shape[0])[:, None] * self.n_features
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            values = flat[row_base + self.feature[nodes]]
+            go_left = values <= self.threshold[nodes]
+            if not self.sparse_input:
+                go_left |= np.isnan(values) & self.missing_go_to_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.leaf_value[nodes].sum(axis=1) / len(self.roots)
+
+    def score_rows(self, rows: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+        # Chunk so the (rows x trees) node matrix stays small for large batches.
+        chunks = []
+        for start in range(0, len(rows), COMPILED_CHUNK_ROWS):
+            with time_stage("encode"):
+                X = self.encode_rows(rows[start:start + COMPILED_CHUNK_ROWS])
+            with time_stage("model"):
+                chunks.append(self.predict_proba_encoded(X))
+        probabilities = np.concatenate(chunks)
+        predictions = self.classes_.take((probabilities > self.decision_threshold).astype(int))
+        return predictions, probabilities
+
+    def score_columns(self, categorical: np.ndarray, numeric: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        chunks = []
+        for start in range(0, len(numeric), COMPILED_CHUNK_ROWS):
+            stop = start + COMPILED_CHUNK_ROWS
+            with time_stage("encode"):
+                X = self.encode_columns(categorical[:, start:stop], numeric[start:stop])
+            with time_stage("model"):
+                chunks.append(self.predict_proba_encoded(X))
+        probabilities = np.concatenate(chunks) if chunks else np.empty(0)
+        predictions = self.classes_.take((probabilities > self.decision_threshold).astype(int))
+        return predictions, probabilities
+
+    def score_frame(self, frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        probabilities = np.concatenate(
+            [
+                self.predict_proba_encoded(self.encode_frame(frame.iloc[start:start + COMPILED_CHUNK_ROWS]))
+                for start in range(0, len(frame), COMPILED_CHUNK_ROWS)
+            ]
+            or [np.empty(0)]
+        )
+        predictions = self.classes_.take((probabilities > self.decision_threshold).astype(int))
+        return predictions, probabilities
+
+
+def _memmap_npz(model_path: Path, mmap_mode: str) -> dict[str, np.ndarray]:
+    # np.savez stores members uncompressed, so each .npy member can be mapped
+    # straight from its offset inside the zip. Processes mapping the same file
+    # share the pages through the OS page cache.
+    arrays: dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(model_path) as archive, open(model_path, "rb") as handle:
+        for info in archive.infolist():
+            key = info.filename[: -len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[key] = np.load(archive.open(info), allow_pickle=False)
+                continue
+            handle.seek(info.header_offset)
+            local_header = handle.read(30)
+            name_length = int.from_bytes(local_header[26:28], "little")
+            extra_length = int.from_bytes(local_header[28:30], "little")
+            handle.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(handle)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+            if shape == () or 0 in shape:
+                handle.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[key] = np.lib.format.read_array(handle, allow_pickle=False)
+                continue
+            arrays[key] = np.memmap(
+                model_path,
+                dtype=dtype,
+                mode=mmap_mode,
+                offset=handle.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+def load_compiled_model(model_path: Path, mmap_mode: Optional[str] = None) -> CompiledModel:
+    if not model_path.exists():
+        raise FileNotFoundError(f"Compiled model file not found: {model_path}")
+    if mmap_mode is not None:
+        return CompiledModel(_memmap_npz(model_path, mmap_mode))
+    with np.load(model_path, allow_pickle=False) as arrays:
+        return CompiledModel({key: arrays[key] for key in arrays.files})
 
 
 def extract_expected_columns(model) -> tuple[list[str], list[str], list[str]]:
+    if isinstance(model, CompiledModel):
+        return model.categorical_cols, model.numerical_cols, model.expected_cols
+
+    try:
+        return _SCHEMA_CACHE[model]
+    except (KeyError, TypeError):
+        pass
+
     preprocessor = model.named_steps["preprocessor"]
     categorical_cols = list(preprocessor.transformers_[0][2])
     numerical_cols = list(preprocessor.transformers_[1][2])
     expected_cols = categorical_cols + numerical_cols
-    return categorical_cols, numerical_cols, expected_cols
+    schema = (categorical_cols, numerical_cols, expected_cols)
+    try:
+        _SCHEMA_CACHE[model] = schema
+    except TypeError:
+        pass
+    return schema
+
+
+def get_decision_threshold(model) -> float:
+    return float(getattr(model, "decision_threshold", DEFAULT_DECISION_THRESHOLD))
+
+
+class EncodedRows:
+    """Model rows held as column buffers: categorical values and float64 numerics.
+
+    ``categorical`` has one object row per categorical column and ``numeric``
+    one row per model row, both in the schema's column order.
+    """
+
+    def __init__(self, schema: "PayloadSchema", categorical: np.ndarray, numeric: np.ndarray) -> None:
+        self.schema = schema
+        self.categorical = categorical
+        self.numeric = numeric
+
+    def __len__(self) -> int:
+        return len(self.numeric)
+
+    def take(self, positions) -> "EncodedRows":
+        return EncodedRows(self.schema, self.categorical[:, positions], self.numeric[positions])
+
+    def row(self, i: int) -> dict[str, Any]:
+        """Row ``i`` as the dict ``build_model_row`` returns."""
+        values = list(self.categorical[:, i]) + self.numeric[i].tolist()
+        return dict(zip(self.schema.expected_cols, values))
+
+    def frame(self) -> pd.DataFrame:
+        columns: dict[str, Any] = dict(zip(self.schema.categorical_cols, self.categorical))
+        columns.update(zip(self.schema.numerical_cols, self.numeric.T))
+        return pd.DataFrame(columns, columns=self.schema.expected_cols)
+
+
+class PayloadSchema:
+    """Maps request payloads to model rows; compiled once per column layout.
+
+    Defaults, alias targets and column positions are worked out here, so
+    encoding a payload is one lookup per model column. Rows, messages and
+    exceptions are those of ``build_model_row``.
+    """
+
+    def __init__(
+        self,
+        categorical_cols: list[str],
+        numerical_cols: list[str],
+        location_index: Optional[LocationIndex] = None,
+    ) -> None:
+        self.categorical_cols = list(categorical_cols)
+        self.numerical_cols = list(numerical_cols)
+        self.expected_cols = self.categorical_cols + self.numerical_cols
+        self._defaults = [(col, "unknown") for col in self.categorical_cols] + [
+            (col, 0.0) for col in self.numerical_cols
+        ]
+        positions = {col: i for i, col in enumerate(self.expected_cols)}
+        self._numeric_positions = [(positions[col], col) for col in self.numerical_cols]
+        self._n_categorical = len(self.categorical_cols)
+        # Backward-compatible aliases used by the Streamlit form.
+        self._distance_position = positions.get("ride_distance")
+        self._hour_position = positions.get("booking_hour")
+        self._time_position = positions.get("time")
+        # Location aggregates are looked up from the pickup/drop pair, not read
+        # from the payload.
+        self._location_index = location_index
+        self._location_positions = (
+            [positions[name] for name in location_index.feature_names] if location_index is not None else []
+        )
+
+    def encode_values(self, payload: dict[str, Any]) -> list[Any]:
+        """Model row values in ``expected_cols`` order."""
+        values = [payload.get(col, default) for col, default in self._defaults]
+
+        if self._distance_position is not None and "distance" in payload:
+            values[self._distance_position] = float(payload["distance"])
+        if "booking_hour" in payload:
+            try:
+                hour = int(payload["booking_hour"])
+            except OverflowError:
+                raise ValueError("booking_hour must be between 0 and 23.") from None
+            if hour < 0 or hour > 23:
+                raise ValueError("booking_hour must be between 0 and 23.")
+            if self._hour_position is not None:
+                values[self._hour_position] = float(hour)
+            elif self._time_position is not None:
+                values[self._time_position] = f"{hour:02d}:00"
+        if self._location_index is not None:
+            features = self._location_index.lookup(payload.get("pickup_location"), payload.get("drop_location"))
+            for position, value in zip(self._location_positions, features):
+                values[position] = value
+
+        for position, col in enumerate(self.categorical_cols):
+            value = values[position]
+            if not isinstance(value, str) and not pd.api.types.is_scalar(value):
+                raise ValueError(f"Invalid categorical value for '{col}': {value}")
+        for position, col in self._numeric_positions:
+            try:
+                number = float(values[position])
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid numeric value for '{col}': {values[position]}")
+            # The models reject a whole matrix holding one infinity.
+            if not math.isfinite(number):
+                raise ValueError(f"Invalid numeric value for '{col}': {values[position]}")
+            values[position] = number
+        return values
+
+    def encode(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return dict(zip(self.expected_cols, self.encode_values(payload)))
+
+    def stack(self, values: list[list[Any]]) -> EncodedRows:
+        """Column buffers for rows returned by ``encode_values``."""
+        categorical = np.empty((self._n_categorical, len(values)), dtype=object)
+        numeric = np.empty((len(values), len(self.numerical_cols)))
+        if values:
+            columns = list(zip(*values))
+            for j in range(self._n_categorical):
+                # fromiter keeps list or dict values as single objects.
+                categorical[j] = np.fromiter(columns[j], dtype=object, count=len(values))
+            if self.numerical_cols:
+                numeric[:] = np.array(columns[self._n_categorical:], dtype=float).T
+        return EncodedRows(self, categorical, numeric)
+
+    def encode_rows(self, payloads: list[dict[str, Any]]) -> tuple[EncodedRows, list[int], dict[int, str]]:
+        """Encode payloads into column buffers.
+
+        Returns the valid rows, their positions in ``payloads`` and an error
+        message for each payload that failed validation.
+        """
+        values: list[list[Any]] = []
+        positions: list[int] = []
+        errors: dict[int, str] = {}
+        for index, payload in enumerate(payloads):
+            try:
+                values.append(self.encode_values(payload))
+            except (TypeError, ValueError) as exc:
+                errors[index] = str(exc)
+                continue
+            positions.append(index)
+        return self.stack(values), positions, errors
+
+
+@functools.lru_cache(maxsize=32)
+def _schema_for_columns(
+    categorical_cols: tuple[str, ...],
+    numerical_cols: tuple[str, ...],
+    location_index: Optional[LocationIndex] = None,
+) -> PayloadSchema:
+    return PayloadSchema(list(categorical_cols), list(numerical_cols), location_index)
+
+
+def payload_schema(model) -> PayloadSchema:
+    """The ``PayloadSchema`` of a fitted or compiled model, built once per model."""
+    try:
+        return _PAYLOAD_SCHEMA_CACHE[model]
+    except (KeyError, TypeError):
+        pass
+    categorical_cols, numerical_cols, _ = extract_expected_columns(model)
+    schema = PayloadSchema(categorical_cols, numerical_cols, getattr(model, "location_index", None))
+    try:
+        _PAYLOAD_SCHEMA_CACHE[model] = schema
+    except TypeError:
+        pass
+    return schema
 
 
 def build_model_row(
     payload: dict[str, Any],
     categorical_cols: list[str],
     numerical_cols: list[str],
+    location_index: Optional[LocationIndex] = None,
 ) -> dict[str, Any]:
-    row: dict[str, Any] = {col: "unknown" for col in categorical_cols}
-    row.update({col: 0.0 for col in numerical_cols})
+    return _schema_for_columns(tuple(categorical_cols), tuple(numerical_cols), location_index).encode(payload)
 
-    for key, value in payload.items():
-        if key in row:
-            row[key] = value
 
-    # Backward-compatible aliases used by the Streamlit form.
-    if "distance" in payload and "ride_distance" in row:
-        row["ride_distance"] = float(payload["distance"])
-    if "booking_hour" in payload:
-        hour = int(payload["booking_hour"])
-        if hour < 0 or hour > 23:
-            raise ValueError("booking_hour must be between 0 and 23.")
-        if "booking_hour" in row:
-            row["booking_hour"] = float(hour)
-        elif "time" in row:
-            row["time"] = f"{hour:02d}:00"
+def _as_float(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    # Returns the values as floats plus a mask of cells that did not convert
+    # to a finite number.
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        converted = values.to_numpy(dtype=float, na_value=np.nan)
+        return converted, np.isinf(converted)
+    converted = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return converted, (np.isnan(converted) & values.notna().to_numpy()) | np.isinf(converted)
+
+
+def _is_rejected_hour_text(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        int(value)
+    except ValueError:
+        return True
+    return False
+
+
+def build_model_frame(
+    payloads: pd.DataFrame,
+    categorical_cols: list[str],
+    numerical_cols: list[str],
+    location_index: Optional[LocationIndex] = None,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Apply ``build_model_row`` to every row of ``payloads`` at once.
+
+    An empty cell counts as a key missing from the payload. Returns the model
+    frame and a mask of rows the vectorised mapping could not validate (bad
+    numbers, out-of-range hours); callers pass those through
+    ``build_model_row`` to get the row or its exact error.
+    """
+    index = payloads.index
+    irregular = np.zeros(len(payloads), dtype=bool)
+    columns: dict[str, Any] = {}
+
+    for col in categorical_cols:
+        if col in payloads:
+            columns[col] = payloads[col].astype(object).where(payloads[col].notna(), "unknown")
+            if payloads[col].dtype == object:
+                irregular |= ~payloads[col].map(pd.api.types.is_scalar).to_numpy(dtype=bool)
+        else:
+            columns[col] = pd.Series("unknown", index=index, dtype=object)
 
     for col in numerical_cols:
-        try:
-            row[col] = float(row[col])
-        except (TypeError, ValueError):
-            raise ValueError(f"Invalid numeric value for '{col}': {row[col]}")
+        if col not in payloads:
+            columns[col] = np.zeros(len(payloads))
+            continue
+        values, bad = _as_float(payloads[col])
+        columns[col] = np.where(payloads[col].isna().to_numpy(), 0.0, values)
+        irregular |= bad
+
+    # Backward-compatible aliases used by the Streamlit form.
+    if "distance" in payloads and "ride_distance" in numerical_cols:
+        distance, bad = _as_float(payloads["distance"])
+        present = payloads["distance"].notna().to_numpy()
+        columns["ride_distance"] = np.where(present, distance, columns["ride_distance"])
+        irregular |= bad
+    if "booking_hour" in payloads:
+        hours, bad = _as_float(payloads["booking_hour"])
+        if not pd.api.types.is_numeric_dtype(payloads["booking_hour"]):
+            # int() rejects strings such as "7.5" that to_numeric accepts.
+            bad |= payloads["booking_hour"].map(_is_rejected_hour_text).to_numpy(dtype=bool)
+        hours = np.trunc(hours)
+        present = payloads["booking_hour"].notna().to_numpy()
+        with np.errstate(invalid="ignore"):
+            bad |= present & ~((hours >= 0) & (hours <= 23))
+        irregular |= bad
+        valid = present & ~bad
+        if "booking_hour" in numerical_cols:
+            columns["booking_hour"] = np.where(valid, hours, columns["booking_hour"])
+        elif "time" in columns:
+            labels = pd.Series(np.where(valid, hours, 0).astype(int), index=index).astype(str).str.zfill(2) + ":00"
+            columns["time"] = labels.where(valid, columns["time"])
+
+    if location_index is not None:
+        missing = pd.Series(None, index=index, dtype=object)
+        features = location_index.transform(
+            payloads["pickup_location"] if "pickup_location" in payloads else missing,
+            payloads["drop_location"] if "drop_location" in payloads else missing,
+        )
+        for position, name in enumerate(location_index.feature_names):
+            columns[name] = features[:, position]
+
+    frame = pd.DataFrame(columns, index=index)[categorical_cols + numerical_cols]
+    return frame, irregular
+
 
-    return row
+def _score_frame(df: pd.DataFrame, model) -> tuple[np.ndarray, np.ndarray]:
+    if not hasattr(model, "predict_proba"):
+        predictions = np.asarray(model.predict(df))
+        return predictions, np.zeros(len(df), dtype=float)
+
+    # One pass through the preprocessor and forest; the label is derived from
+    # the positive-class probability instead of a second model.predict() call.
+    steps = getattr(model, "steps", None)
+    if metrics.ENABLED and steps:
+        # Same computation as Pipeline.predict_proba, split to time each part.
+        with time_stage("preprocess"):
+            X = df
+            for _, step in steps[:-1]:
+                if step is not None and step != "passthrough":
+                    X = step.transform(X)
+        with time_stage("model"):
+            probabilities = steps[-1][1].predict_proba(X)[:, 1]
+    else:
+        probabilities = model.predict_proba(df)[:, 1]
+    classes = np.asarray(model.classes_)
+    predictions = classes.take((probabilities > get_decision_threshold(model)).astype(int))
+    return predictions, probabilities
+
+
+def _score_rows(rows: EncodedRows, model) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(model, CompiledModel):
+        return model.score_columns(rows.categorical, rows.numeric)
+    with time_stage("dataframe"):
+        df = rows.frame()
+    return _score_frame(df, model)
 
 
 def predict_from_payload(payload: dict[str, Any], model) -> int:
-    categorical_cols, numerical_cols, expected_cols = extract_expected_columns(model)
-    row = build_model_row(payload, categorical_cols, numerical_cols)
-    df = pd.DataFrame([row], columns=expected_cols)
-    return int(model.predict(df)[0])
+    prediction, _ = predict_with_probability_from_payload(payload, model)
+    return prediction
+
+
+def predict_with_probability_from_payload(
+    payload: dict[str, Any], model, cache=None, model_version: Optional[str] = None
+) -> tuple[int, float]:
+    """Score one payload.
+
+    With a ``PredictionCache``, a repeated model row for the same
+    ``model_version`` is answered without running the model.
+    """
+    schema = payload_schema(model)
+    with time_stage("build_model_row"):
+        values = schema.encode_values(payload)
+        rows = schema.stack([values])
+    if cache is not None:
+        key = cache.make_key(model_version, dict(zip(schema.expected_cols, values)), schema.expected_cols)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    predictions, probabilities = _score_rows(rows, model)
+    result = int(predictions[0]), float(probabilities[0])
+    if cache is not None:
+        cache.set(key, result)
+    return result
+
+
+def predict_batch(
+    payloads: list[dict[str, Any]], model, cache=None, model_version: Optional[str] = None
+) -> list[dict[str, Any]]:
+    """Score many payloads with one predict_proba call.
+
+    Results keep the input order. A payload that fails validation gets an
+    ``error`` message instead of a prediction; the rest of the batch is scored.
+    With a ``PredictionCache`` only rows that miss the cache are scored.
+    """
+    schema = payload_schema(model)
+    results: list[dict[str, Any]] = [{} for _ in payloads]
 
+    with time_stage("build_model_row"):
+        rows, positions, errors = schema.encode_rows(payloads)
+    for index, message in errors.items():
+        results[index] = {"is_cancelled": None, "cancellation_probability": None, "error": message}
 
-def predict_with_probability_from_payload(payload: dict[str, Any], model) -> tuple[int, float]:
+    keys: list[str] = []
+    if cache is not None and len(rows):
+        misses = []
+        for i, index in enumerate(positions):
+            key = cache.make_key(model_version, rows.row(i), schema.expected_cols)
+            cached = cache.get(key)
+            if cached is None:
+                misses.append(i)
+                keys.append(key)
+            else:
+                results[index] = {"is_cancelled": cached[0], "cancellation_probability": cached[1], "error": None}
+        rows = rows.take(misses)
+        positions = [positions[i] for i in misses]
+
+    if len(rows):
+        try:
+            scored = [_score_rows(rows, model)]
+            groups = [list(range(len(rows)))]
+        except Exception:
+            # A failure not caught by validation would sink every row; score
+            # them one by one so only the offending rows get the error.
+            scored, groups = [], []
+            for i, index in enumerate(positions):
+                try:
+                    scored.append(_score_rows(rows.take([i]), model))
+                    groups.append([i])
+                except Exception as exc:
+                    results[index] = {"is_cancelled": None, "cancellation_probability": None, "error": str(exc)}
+        for group, (predictions, probabilities) in zip(groups, scored):
+            for i, prediction, probability in zip(group, predictions, probabilities):
+                results[positions[i]] = {
+                    "is_cancelled": int(prediction),
+                    "cancellation_probability": float(probability),
+                    "error": None,
+                }
+                if cache is not None:
+                    cache.set(keys[i], (int(prediction), float(probability)))
+
+    return results
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def predict_frame(payloads: pd.DataFrame, model) -> pd.DataFrame:
+    """Score a DataFrame with one payload per row, like ``predict_batch``.
+
+    Returns ``is_cancelled``, ``cancellation_probability`` and ``error``
+    columns aligned with ``payloads``.
+    """
     categorical_cols, numerical_cols, expected_cols = extract_expected_columns(model)
-    row = build_model_row(payload, categorical_cols, numerical_cols)
-    df = pd.DataFrame([row], columns=expected_cols)
-    prediction = int(model.predict(df)[0])
+    location_index = getattr(model, "location_index", None)
+    frame, irregular = build_model_frame(payloads, categorical_cols, numerical_cols, location_index)
+    errors = np.full(len(frame), None, dtype=object)
+
+    for position in np.flatnonzero(irregular):
+        payload = {key: value for key, value in payloads.iloc[position].items() if not _is_missing(value)}
+        try:
+            row = build_model_row(payload, categorical_cols, numerical_cols, location_index)
+        except (TypeError, ValueError, OverflowError) as exc:
+            errors[position] = str(exc)
+            continue
+        for col in expected_cols:
+            frame.iat[position, frame.columns.get_loc(col)] = row[col]
 
-    probability = 0.0
-    if hasattr(model, "predict_proba"):
-        probability = float(model.predict_proba(df)[0][1])
+    valid = np.array([error is None for error in errors], dtype=bool)
+    predictions = np.full(len(frame), np.nan)
+    probabilities = np.full(len(frame), np.nan)
+    if valid.any():
+        scored = frame.loc[valid].astype({col: float for col in numerical_cols})
+        if isinstance(model, CompiledModel):
+            predictions[valid], probabilities[valid] = model.score_frame(scored)
+        else:
+            predictions[valid], probabilities[valid] = _score_frame(scored, model)
 
-    return prediction, probability
+    return pd.DataFrame(
+        {
+            "is_cancelled": pd.array(predictions, dtype="Float64").astype("Int64"),
+            "cancellation_probability": probabilities,
+            "error": pd.Series(errors, index=payloads.index, dtype=object),
+        },
+        index=payloads.index,
+    )
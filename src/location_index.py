@@ -0,0 +1,172 @@
+"""Per-location and per-route aggregates that replace raw location strings.
+
+``pickup_location`` and ``drop_location`` one-hot encode into hundreds of
+sparse columns, and the pair (the route) is never seen by the model. A
+``LocationIndex`` keeps, for every pickup, drop and route seen in training,
+the historical cancellation rate and the median VTAT/CTAT, shrunk towards
+the global value in proportion to how few bookings back them. Scoring a
+payload is then three dict lookups.
+
+Training rows get out-of-fold values (``out_of_fold_features``): each fold
+is looked up in an index built from the other folds, so a row's own label
+never feeds its features.
+"""
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+INDEX_VERSION = 1
+LOCATION_COLUMNS = ("pickup_location", "drop_location")
+KEYS = ("pickup", "drop", "route")
+TARGET = "is_cancelled"
+# Numeric columns aggregated by their median, when the frame has them.
+MEDIAN_COLUMNS = ("avg_vtat", "avg_ctat")
+DEFAULT_SMOOTHING = 20.0
+DEFAULT_FOLDS = 5
+
+
+class LocationIndex:
+    """Smoothed aggregates per pickup, drop and route.
+
+    ``tables`` maps each key to ``{level: values}``. Route levels are
+    ``(pickup, drop)`` tuples. Levels missing from a table, including
+    non-string values, fall back to ``defaults``, the global aggregates.
+    """
+
+    def __init__(
+        self,
+        value_names: list[str],
+        tables: dict[str, dict[Any, tuple[float, ...]]],
+        defaults: dict[str, tuple[float, ...]],
+        smoothing: float = DEFAULT_SMOOTHING,
+    ) -> None:
+        self.value_names = list(value_names)
+        self.tables = tables
+        self.defaults = defaults
+        self.smoothing = smoothing
+        self.feature_names = [f"{key}_{name}" for key in KEYS for name in self.value_names]
+
+    def lookup(self, pickup: Any, drop: Any) -> list[float]:
+        """Feature values, in ``feature_names`` order, for one pickup/drop pair."""
+        # Anything but a string (missing, numbers, JSON lists) is an unseen level.
+        pickup = pickup if isinstance(pickup, str) else None
+        drop = drop if isinstance(drop, str) else None
+        pickup_values = self.tables["pickup"].get(pickup, self.defaults["pickup"])
+        drop_values = self.tables["drop"].get(drop, self.defaults["drop"])
+        route_values = self.tables["route"].get((pickup, drop), self.defaults["route"])
+        return [*pickup_values, *drop_values, *route_values]
+
+    def transform(self, pickup: pd.Series, drop: pd.Series) -> np.ndarray:
+        """``lookup`` for every row; each distinct pair is looked up once."""
+        if not len(pickup):
+            return np.empty((0, len(self.feature_names)))
+        pairs = pd.MultiIndex.from_arrays([pickup.astype(object), drop.astype(object)])
+        codes, uniques = pd.factorize(pairs)
+        values = np.array([self.lookup(p, d) for p, d in uniques], dtype=float)
+        missing = np.asarray(self.lookup(None, None), dtype=float)
+        return np.vstack([values, missing])[codes]
+
+    def add_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with the location columns replaced by the index features."""
+        features = self.transform(df["pickup_location"], df["drop_location"])
+        out = df.drop(columns=list(LOCATION_COLUMNS))
+        for position, name in enumerate(self.feature_names):
+            out[name] = features[:, position].astype("float32")
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "smoothing": self.smoothing,
+            "value_names": self.value_names,
+            "defaults": {key: list(values) for key, values in self.defaults.items()},
+            "pickup": {level: list(values) for level, values in self.tables["pickup"].items()},
+            "drop": {level: list(values) for level, values in self.tables["drop"].items()},
+            "route": [[p, d, list(values)] for (p, d), values in self.tables["route"].items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LocationIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported location index version: {data.get('version')}")
+        tables = {
+            "pickup": {level: tuple(values) for level, values in data["pickup"].items()},
+            "drop": {level: tuple(values) for level, values in data["drop"].items()},
+            "route": {(p, d): tuple(values) for p, d, values in data["route"]},
+        }
+        defaults = {key: tuple(values) for key, values in data["defaults"].items()}
+        return cls(data["value_names"], tables, defaults, smoothing=data["smoothing"])
+
+
+def _smoothed(
+    df: pd.DataFrame, keys: list[str], value_cols: list[str], smoothing: float
+) -> tuple[pd.DataFrame, list[float]]:
+    # Shrink each level towards the global value: (n * level + m * global) / (n + m).
+    grouped = df.groupby(keys, observed=True, sort=False)
+    counts = grouped.size()
+    weight = (counts / (counts + smoothing)).to_numpy()[:, None]
+    prior = [float(df[TARGET].mean())] + [float(df[col].median()) for col in value_cols]
+    level = pd.concat([grouped[TARGET].mean()] + [grouped[col].median() for col in value_cols], axis=1)
+    values = weight * level.to_numpy(dtype=float) + (1 - weight) * np.asarray(prior)
+    return pd.DataFrame(values, index=level.index), prior
+
+
+def build_location_index(df: pd.DataFrame, smoothing: float = DEFAULT_SMOOTHING) -> LocationIndex:
+    """Index the location columns and ``is_cancelled`` of a cleaned training frame."""
+    value_cols = [col for col in MEDIAN_COLUMNS if col in df.columns]
+    frame = df[list(LOCATION_COLUMNS) + [TARGET] + value_cols].copy()
+    for col in LOCATION_COLUMNS:
+        frame[col] = frame[col].astype(object)
+    frame[TARGET] = frame[TARGET].astype(float)
+
+    tables: dict[str, dict[Any, tuple[float, ...]]] = {}
+    defaults: dict[str, tuple[float, ...]] = {}
+    groupings = {"pickup": ["pickup_location"], "drop": ["drop_location"], "route": list(LOCATION_COLUMNS)}
+    for key, columns in groupings.items():
+        values, prior = _smoothed(frame, columns, value_cols, smoothing)
+        tables[key] = dict(zip(values.index, map(tuple, values.to_numpy().tolist())))
+        defaults[key] = tuple(prior)
+    value_names = ["cancel_rate"] + [f"median_{col.removeprefix('avg_')}" for col in value_cols]
+    return LocationIndex(value_names, tables, defaults, smoothing=smoothing)
+
+
+def out_of_fold_features(
+    df: pd.DataFrame,
+    n_folds: int = DEFAULT_FOLDS,
+    smoothing: float = DEFAULT_SMOOTHING,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """``LocationIndex.add_features`` for training rows without target leakage."""
+    from sklearn.model_selection import KFold
+
+    features: Optional[np.ndarray] = None
+    folds = KFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(df)
+    for fit_rows, apply_rows in folds:
+        index = build_location_index(df.iloc[fit_rows], smoothing=smoothing)
+        part = df.iloc[apply_rows]
+        values = index.transform(part["pickup_location"], part["drop_location"])
+        if features is None:
+            features = np.empty((len(df), values.shape[1]))
+        features[apply_rows] = values
+    out = df.drop(columns=list(LOCATION_COLUMNS))
+    for position, name in enumerate(index.feature_names):
+        out[name] = features[:, position].astype("float32")
+    return out
+
+
+def save_location_index(index: LocationIndex, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(index.to_dict()), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def load_location_index(path: Path) -> LocationIndex:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Location index not found: {path}")
+    return LocationIndex.from_dict(json.loads(path.read_text(encoding="utf-8")))
@@ -1,13 +1,54 @@
+from __future__ import annotations
+
 import argparse
 import json
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+# Start of the --timing clock when run as a script: argparse, the lazy imports
+# and the model load below all count towards startup.
+IMPORT_STARTED = time.perf_counter()
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas, pyarrow and sklearn are imported inside the functions that need
+# them. Most of a single prediction's wall time used to be these imports, and
+# a call answered by the daemon needs none of them.
 try:
     from src.config import MODEL_PATH
-    from src.inference import load_model, predict_from_payload
 except ModuleNotFoundError:
     from config import MODEL_PATH
-    from inference import load_model, predict_from_payload
+
+BULK_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+DEFAULT_SOCKET_PATH = Path(
+    os.getenv(
+        "RIDE_PREDICT_SOCKET",
+        Path(tempfile.gettempdir()) / f"ride-predict-{getattr(os, 'getuid', lambda: 'user')()}.sock",
+    )
+)
+DAEMON_TIMEOUT_S = 30.0
+
+# Model loaded once per bulk-scoring worker process.
+_worker_model = None
+
+
+def _inference():
+    try:
+        from src import inference
+    except ModuleNotFoundError:
+        import inference
+    return inference
 
 
 def _read_payload(args: argparse.Namespace) -> dict:
@@ -26,14 +67,318 @@ def _read_payload(args: argparse.Namespace) -> dict:
     return payload
 
 
-def main() -> None:
+def _load_any_model(model_path: Path):
+    inference = _inference()
+    if model_path.suffix == ".npz":
+        return inference.load_compiled_model(model_path)
+    return inference.load_model(model_path)
+
+
+def _file_format(path: Path) -> str:
+    try:
+        return BULK_FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported file type '{path.suffix}'. Use one of: {', '.join(BULK_FORMATS)}.")
+
+
+def iter_chunks(path: Path, chunksize: int):
+    """Yield DataFrames of at most ``chunksize`` rows without reading the whole file."""
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    file_format = _file_format(path)
+    if file_format == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif file_format == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def _init_worker(model_path: str) -> None:
+    global _worker_model
+    _worker_model = _load_any_model(Path(model_path))
+
+
+def _score_chunk(index: int, chunk: pd.DataFrame, parts_dir: str, keep_columns: list[str]) -> int:
+    import pandas as pd
+
+    # Runs in a worker: score, then write the part atomically so that an
+    # existing part file always means a finished chunk.
+    # A fixed string dtype keeps the part schemas identical when a chunk has no errors.
+    scored = _inference().predict_frame(chunk, _worker_model).reset_index(drop=True).astype({"error": "string"})
+    kept = chunk[keep_columns].reset_index(drop=True)
+    part_path = Path(parts_dir) / f"part-{index:06d}.parquet"
+    tmp_path = part_path.with_suffix(".tmp")
+    pd.concat([kept, scored], axis=1).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+    return len(chunk)
+
+
+def _run_manifest(input_path: Path, model_path: Path, chunksize: int, keep_columns: list[str]) -> dict:
+    input_stat = input_path.stat()
+    model_stat = model_path.stat()
+    return {
+        "input": str(input_path.resolve()),
+        "input_size": input_stat.st_size,
+        "input_mtime_ns": input_stat.st_mtime_ns,
+        "model": str(model_path.resolve()),
+        "model_mtime_ns": model_stat.st_mtime_ns,
+        "chunksize": chunksize,
+        "keep_columns": keep_columns,
+    }
+
+
+def _merge_parts(parts: list[Path], output_path: Path) -> None:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_format = _file_format(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    writer = None
+    try:
+        for i, part in enumerate(parts):
+            frame = pd.read_parquet(part)
+            if output_format == "parquet":
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            elif output_format == "csv":
+                frame.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            else:
+                with open(tmp_path, "w" if i == 0 else "a", encoding="utf-8") as handle:
+                    frame.to_json(handle, orient="records", lines=True)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, output_path)
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    model_path: Path,
+    chunksize: int = 50_000,
+    workers: int = 1,
+    keep_columns: list[str] | None = None,
+    resume: bool = False,
+) -> dict:
+    """Score every row of ``input_path`` and write the results in input order.
+
+    Finished chunks are kept as Parquet parts in ``<output>.parts/``; with
+    ``resume`` a rerun skips them and only scores what is left.
+    """
+    keep_columns = keep_columns or []
+    parts_dir = output_path.with_name(output_path.name + ".parts")
+    manifest_path = parts_dir / "manifest.json"
+    manifest = _run_manifest(input_path, model_path, chunksize, keep_columns)
+    if resume and manifest_path.exists():
+        if json.loads(manifest_path.read_text(encoding="utf-8")) != manifest:
+            raise ValueError(
+                f"Checkpoint in {parts_dir} was written for a different input, model or chunk size."
+            )
+    else:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        parts_dir.mkdir(parents=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    started = time.perf_counter()
+    scored_rows = 0
+    skipped_chunks = 0
+    n_chunks = 0
+
+    def report(rows: int) -> None:
+        nonlocal scored_rows
+        scored_rows += rows
+        elapsed = time.perf_counter() - started
+        print(f"scored {scored_rows} rows ({scored_rows / elapsed:.0f} rows/s)", file=sys.stderr)
+
+    if workers <= 1:
+        _init_worker(str(model_path))
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(str(model_path),)) if workers > 1 else None
+    pending: deque = deque()
+    try:
+        for index, chunk in enumerate(iter_chunks(input_path, chunksize)):
+            n_chunks += 1
+            if (parts_dir / f"part-{index:06d}.parquet").exists():
+                skipped_chunks += 1
+                continue
+            missing = [col for col in keep_columns if col not in chunk]
+            if missing:
+                raise ValueError(f"--keep-columns not found in input: {missing}")
+            if executor is None:
+                report(_score_chunk(index, chunk, str(parts_dir), keep_columns))
+                continue
+            # Bound the chunks in flight so memory stays flat on large inputs.
+            pending.append(executor.submit(_score_chunk, index, chunk, str(parts_dir), keep_columns))
+            if len(pending) >= 2 * workers:
+                report(pending.popleft().result())
+        while pending:
+            report(pending.popleft().result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    scoring_seconds = time.perf_counter() - started
+    _merge_parts([parts_dir / f"part-{index:06d}.parquet" for index in range(n_chunks)], output_path)
+    shutil.rmtree(parts_dir)
+    return {
+        "chunks": n_chunks,
+        "resumed_chunks": skipped_chunks,
+        "scored_rows": scored_rows,
+        "seconds": time.perf_counter() - started,
+        "rows_per_second": scored_rows / scoring_seconds if scoring_seconds > 0 else 0.0,
+    }
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line: {"model_path": ..., "payloads": [...]}.
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.score(request["model_path"], request["payloads"])
+            except (json.JSONDecodeError, KeyError, TypeError) as exc:
+                response = {"error": f"invalid request: {exc}"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+# Windows has no Unix domain sockets; --serve refuses to start there and the
+# client always scores in-process.
+_UnixStreamServer = getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)
+
+
+class ScoringDaemon(socketserver.ThreadingMixIn, _UnixStreamServer):
+    """Keeps the model loaded and scores payloads sent by ``predict.py``.
+
+    Requests for another model file are refused so the client scores them
+    itself. A retrained model at the same path is reloaded on the next request.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, model_path: Path) -> None:
+        self.socket_path = Path(socket_path)
+        self.model_path = Path(model_path).resolve()
+        self._lock = threading.Lock()
+        _remove_stale_socket(self.socket_path)
+        self._load()
+        super().__init__(str(self.socket_path), _DaemonHandler)
+        # Only the owner may send payloads or read predictions.
+        os.chmod(self.socket_path, 0o600)
+
+    def _load(self) -> None:
+        self.model_mtime_ns = self.model_path.stat().st_mtime_ns
+        self.model = _load_any_model(self.model_path)
+
+    def score(self, model_path: str, payloads: list[dict[str, Any]]) -> dict[str, Any]:
+        if Path(model_path).resolve() != self.model_path:
+            return {"error": "model_mismatch", "model_path": str(self.model_path)}
+        with self._lock:
+            if self.model_path.stat().st_mtime_ns != self.model_mtime_ns:
+                self._load()
+            model = self.model
+        return {"results": _inference().predict_batch(payloads, model)}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+            return
+    raise RuntimeError(f"A scoring daemon is already listening on {socket_path}.")
+
+
+def score_via_daemon(
+    payloads: list[dict[str, Any]], model_path: Path, socket_path: Path = DEFAULT_SOCKET_PATH
+) -> Optional[list[dict[str, Any]]]:
+    """Results from a running daemon, or None when no daemon serves ``model_path``."""
+    if not hasattr(socket, "AF_UNIX") or not Path(socket_path).exists():
+        return None
+    request = json.dumps({"model_path": str(Path(model_path).resolve()), "payloads": payloads}) + "\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(DAEMON_TIMEOUT_S)
+            client.connect(str(socket_path))
+            client.sendall(request.encode("utf-8"))
+            with client.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line).get("results")
+    except json.JSONDecodeError:
+        return None
+
+
+def serve(model_path: Path, socket_path: Path = DEFAULT_SOCKET_PATH) -> None:
+    import signal
+
+    server = ScoringDaemon(socket_path, model_path)
+    # SIGTERM stops serve_forever from another thread so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"scoring daemon for {server.model_path} listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None, started: Optional[float] = None) -> None:
     parser = argparse.ArgumentParser(description="Run a single ride-cancellation prediction.")
     parser.add_argument("--model-path", default=MODEL_PATH, help="Path to model .pkl file")
     parser.add_argument("--payload", help="Inline JSON payload for prediction")
     parser.add_argument("--payload-file", help="Path to JSON payload file")
     parser.add_argument("--distance", type=float, help="Ride distance (alias for ride_distance)")
     parser.add_argument("--booking-hour", type=int, help="Booking hour 0-23 (maps to time HH:00)")
-    args = parser.parse_args()
+    parser.add_argument("--input", help="Bulk mode: CSV, Parquet or JSONL file with one payload per row")
+    parser.add_argument("--output", help="Bulk mode: output file (.csv, .parquet or .jsonl)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows per scored chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes")
+    parser.add_argument("--keep-columns", default="", help="Comma-separated input columns copied to the output")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted bulk run")
+    parser.add_argument("--serve", action="store_true", help="Run a scoring daemon that keeps the model loaded")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET_PATH), help="Unix socket of the scoring daemon")
+    parser.add_argument("--no-daemon", action="store_true", help="Always score in this process")
+    parser.add_argument("--timing", action="store_true", help="Print the scoring mode and startup time to stderr")
+    args = parser.parse_args(argv)
+    if started is None:
+        started = time.perf_counter()
+
+    if args.serve:
+        if not hasattr(socket, "AF_UNIX"):
+            parser.error("--serve needs Unix domain sockets, which this platform does not provide.")
+        serve(Path(args.model_path), Path(args.socket))
+        return
+
+    if args.input or args.output:
+        if not (args.input and args.output):
+            parser.error("--input and --output must be used together.")
+        summary = score_file(
+            Path(args.input),
+            Path(args.output),
+            Path(args.model_path),
+            chunksize=args.chunksize,
+            workers=args.workers,
+            keep_columns=[col for col in args.keep_columns.split(",") if col],
+            resume=args.resume,
+        )
+        print(json.dumps(summary))
+        return
 
     payload = _read_payload(args)
     if not payload:
@@ -43,11 +388,26 @@ def main() -> None:
         )
 
     model_path = Path(args.model_path)
-    model = load_model(model_path)
-    prediction = predict_from_payload(payload, model)
+    results = None if args.no_daemon else score_via_daemon([payload], model_path, Path(args.socket))
+    if results is not None:
+        mode = "daemon"
+        if results[0]["error"] is not None:
+            raise ValueError(results[0]["error"])
+        prediction = results[0]["is_cancelled"]
+        ready = time.perf_counter()
+    else:
+        mode = "in_process"
+        model = _load_any_model(model_path)
+        ready = time.perf_counter()
+        prediction = _inference().predict_from_payload(payload, model)
 
     print(json.dumps({"is_cancelled": prediction}))
+    if args.timing:
+        # startup: imports plus model load in-process, the round trip for the daemon.
+        finished = time.perf_counter()
+        timing = {"mode": mode, "startup_seconds": ready - started, "total_seconds": finished - started}
+        print(json.dumps(timing), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    main(started=IMPORT_STARTED)
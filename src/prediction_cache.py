@@ -0,0 +1,127 @@
+"""Cache of single-row predictions keyed on the model row and model version."""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Protocol
+
+try:
+    from src import metrics
+except ModuleNotFoundError:
+    import metrics
+
+CACHE_REQUESTS = metrics.REGISTRY.counter(
+    "ride_prediction_cache_requests_total", "Prediction cache lookups by result.", ("result",)
+)
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[tuple[int, float]]: ...
+
+    def set(self, key: str, value: tuple[int, float]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class LocalBackend:
+    """In-process LRU with a per-entry time to live."""
+
+    def __init__(self, max_entries: int, ttl_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple[float, tuple[int, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[tuple[int, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: tuple[int, float]) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared backend so all API workers see each other's entries.
+
+    ``client`` is anything with Redis' ``get(key)`` and ``set(key, value, ex=)``,
+    e.g. ``redis.Redis.from_url(...)``. Entries expire through Redis' TTL;
+    ``clear`` is a no-op because keys carry the model version.
+    """
+
+    def __init__(self, client, ttl_s: float, prefix: str = "ride:prediction:") -> None:
+        self.client = client
+        self.ttl_s = max(1, int(ttl_s))
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[tuple[int, float]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        prediction, probability = json.loads(raw)
+        return int(prediction), float(probability)
+
+    def set(self, key: str, value: tuple[int, float]) -> None:
+        self.client.set(self.prefix + key, json.dumps(list(value)), ex=self.ttl_s)
+
+    def clear(self) -> None:
+        return None
+
+
+class PredictionCache:
+    """Look up and store predictions for canonical model rows.
+
+    Keys hash the model version with the row's values in model column order.
+    A new model version therefore never reads entries of the previous one.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_version: Optional[str], row: dict[str, Any], columns: list[str]) -> str:
+        canonical = json.dumps([model_version, [row[col] for col in columns]], default=str, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[int, float]]:
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc("miss")
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.inc("hit")
+        return value
+
+    def set(self, key: str, value: tuple[int, float]) -> None:
+        self.backend.set(key, value)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses}
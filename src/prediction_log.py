@@ -0,0 +1,194 @@
+"""Append-only JSONL log of scored predictions, written off the request path.
+
+``PredictionLogger.log`` only puts the record on a bounded queue; a
+background thread builds the model row, appends JSON lines to the current
+segment and rotates segments by size and age. When the queue is full the
+record is dropped and counted instead of slowing the request.
+``read_prediction_log`` loads the segments back as a DataFrame of model rows.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+try:
+    from src import metrics
+    from src.inference import payload_schema
+except ModuleNotFoundError:
+    import metrics
+    from inference import payload_schema
+
+SEGMENT_GLOB = "predictions-*.jsonl"
+LOG_RECORDS = metrics.REGISTRY.counter(
+    "ride_prediction_log_records_total", "Prediction log records by outcome.", ("result",)
+)
+
+_STOP = object()
+
+
+class PredictionLogger:
+    def __init__(
+        self,
+        directory: Path,
+        max_queue: int = 10_000,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: float = 3600.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._handle = None
+        self._segment_opened = 0.0
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is queued, then close the current segment."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def log(
+        self,
+        payload: dict[str, Any],
+        model,
+        prediction: int,
+        probability: float,
+        model_version: Optional[str],
+        latency_ms: float,
+        endpoint: str = "/predict",
+    ) -> bool:
+        """Queue one scored payload; returns False if it was dropped."""
+        record = (time.time(), payload, model, prediction, probability, model_version, latency_ms, endpoint)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS.inc("dropped")
+            return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize()}
+
+    def _segment(self):
+        now = time.time()
+        if self._handle is not None and (
+            self._handle.tell() >= self.max_segment_bytes or now - self._segment_opened >= self.max_segment_seconds
+        ):
+            self._handle.close()
+            self._handle = None
+        if self._handle is None:
+            # Timestamp first so segments sort chronologically; the pid keeps
+            # workers from writing to the same file.
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            path = self.directory / f"predictions-{stamp}-{os.getpid()}.jsonl"
+            self._handle = open(path, "a", encoding="utf-8")
+            self._segment_opened = now
+        return self._handle
+
+    def _encode(self, record) -> Optional[str]:
+        timestamp, payload, model, prediction, probability, model_version, latency_ms, endpoint = record
+        try:
+            row = payload_schema(model).encode(payload)
+        except (TypeError, ValueError):
+            return None
+        return json.dumps(
+            {
+                "ts": timestamp,
+                "endpoint": endpoint,
+                "model_version": model_version,
+                "latency_ms": latency_ms,
+                "is_cancelled": prediction,
+                "cancellation_probability": probability,
+                "row": row,
+            },
+            default=str,
+        )
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Drain whatever else is waiting so one write covers many records.
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for record in batch:
+                if record is _STOP:
+                    stopping = True
+                    continue
+                line = self._encode(record)
+                if line is not None:
+                    lines.append(line)
+            if lines:
+                handle = self._segment()
+                handle.write("\n".join(lines) + "\n")
+                handle.flush()
+                self.written += len(lines)
+                LOG_RECORDS.inc("written", amount=len(lines))
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def read_prediction_log(
+    directory: Path,
+    since: Optional[float] = None,
+    model_version: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> pd.DataFrame:
+    """Load logged model rows, oldest first, as one DataFrame.
+
+    ``since`` is a Unix timestamp. ``max_rows`` keeps the most recent rows.
+    Metadata columns are prefixed with ``_`` (``_ts``, ``_model_version``,
+    ``_latency_ms``, ``_probability``, ...) so they never clash with features.
+    A partly written last line of an active segment is skipped.
+    """
+    records = []
+    for path in sorted(Path(directory).glob(SEGMENT_GLOB)):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since is not None and record["ts"] < since:
+                    continue
+                if model_version is not None and record["model_version"] != model_version:
+                    continue
+                records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    if max_rows is not None:
+        records = records[-max_rows:]
+
+    rows = pd.DataFrame([record["row"] for record in records])
+    meta = pd.DataFrame(
+        {
+            "_ts": [record["ts"] for record in records],
+            "_endpoint": [record["endpoint"] for record in records],
+            "_model_version": [record["model_version"] for record in records],
+            "_latency_ms": [record["latency_ms"] for record in records],
+            "_is_cancelled": [record["is_cancelled"] for record in records],
+            "_probability": [record["cancellation_probability"] for record in records],
+        }
+    )
+    return pd.concat([rows, meta], axis=1)
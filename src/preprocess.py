@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 
@@ -11,7 +16,14 @@ LEAKAGE_COLUMNS = [
     "incomplete_rides",
 ]
 ID_COLUMNS = ["booking_id", "customer_id"]
-NULL_LIKE = {"", "nan", "none", "null"}
+KNOWN_STATUSES = {
+    "completed",
+    "cancelled by driver",
+    "cancelled by customer",
+    "no driver found",
+    "incomplete",
+}
+INTEGER_DTYPES = ["int8", "int16", "int32", "int64"]
 
 
 def load_data(path):
@@ -19,7 +31,8 @@ def load_data(path):
 
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
+    # Shallow copy: new column labels without duplicating the data.
+    out = df.copy(deep=False)
     out.columns = (
         out.columns
         .str.strip()
@@ -36,46 +49,58 @@ def _build_target(df: pd.DataFrame) -> pd.DataFrame:
             f"Available columns: {list(df.columns)}"
         )
 
-    out = df.copy()
-    status = out["booking_status"].astype(str).str.strip().str.lower()
-    status = status.mask(status.isin(NULL_LIKE))
-    out = out.loc[status.notna()].copy()
-    status = out["booking_status"].astype(str).str.strip().str.lower()
-
-    known_statuses = {
-        "completed",
-        "cancelled by driver",
-        "cancelled by customer",
-        "no driver found",
-        "incomplete",
-    }
-    out = out.loc[status.isin(known_statuses)].copy()
-    status = out["booking_status"].astype(str).str.strip().str.lower()
-    out["is_cancelled"] = (status != "completed").astype(int)
-    return out
+    # Statuses are low-cardinality: normalise the distinct values once and map
+    # back through the codes instead of running string ops over every row.
+    codes, uniques = pd.factorize(df["booking_status"])
+    status = pd.Index(uniques.astype(str)).str.strip().str.lower()
+    known = np.append(status.isin(KNOWN_STATUSES), False)
+    completed = np.append(status == "completed", False)
+
+    keep = known[codes]
+    out = df.loc[keep] if not keep.all() else df.copy(deep=False)
+    return out.assign(is_cancelled=(~completed[codes[keep]]).astype("int8"))
+
+
+def _map_unique(values: pd.Series, transform) -> np.ndarray:
+    # Apply ``transform`` to the distinct values only; missing maps to -1.
+    codes, uniques = pd.factorize(values)
+    mapped = np.append(np.asarray(transform(pd.Series(uniques)), dtype="int8"), np.int8(-1))
+    return mapped[codes]
+
+
+def _day_of_week(dates: pd.Series) -> pd.Series:
+    return pd.to_datetime(dates, errors="coerce", dayfirst=False).dt.dayofweek.fillna(-1)
+
+
+def _month(dates: pd.Series) -> pd.Series:
+    return pd.to_datetime(dates, errors="coerce", dayfirst=False).dt.month.fillna(0)
+
+
+def _hour(times: pd.Series) -> pd.Series:
+    hour_token = times.astype(str).str.extract(r"^\s*(\d{1,2})")[0]
+    hour = pd.to_numeric(hour_token, errors="coerce")
+    return hour.where(hour.between(0, 23), -1).fillna(-1)
 
 
 def _engineer_datetime_features(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
+    out = df.copy(deep=False)
 
     if "date" in out.columns:
-        parsed_date = pd.to_datetime(out["date"], errors="coerce", dayfirst=False)
-        out["booking_day_of_week"] = parsed_date.dt.dayofweek.fillna(-1).astype(int)
-        out["booking_month"] = parsed_date.dt.month.fillna(0).astype(int)
-        out["is_weekend"] = out["booking_day_of_week"].isin([5, 6]).astype(int)
+        out["booking_day_of_week"] = _map_unique(out["date"], _day_of_week)
+        month = _map_unique(out["date"], _month)
+        out["booking_month"] = np.where(month == -1, 0, month).astype("int8")
+        out["is_weekend"] = out["booking_day_of_week"].isin([5, 6]).astype("int8")
         out = out.drop(columns=["date"])
 
     if "time" in out.columns:
-        hour_token = out["time"].astype(str).str.extract(r"^\s*(\d{1,2})")[0]
-        hour = pd.to_numeric(hour_token, errors="coerce")
-        hour = hour.where(hour.between(0, 23), -1)
-        out["booking_hour"] = hour.fillna(-1).astype(int)
+        out["booking_hour"] = _map_unique(out["time"], _hour)
         out = out.drop(columns=["time"])
 
     return out
 
 
-def clean_data(df):
+def _prepare_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # Row-local steps: safe to apply to each chunk of a larger file.
     df = _normalize_columns(df)
     df = _build_target(df)
     df = _engineer_datetime_features(df)
@@ -83,6 +108,63 @@ def clean_data(df):
     drop_columns = [c for c in LEAKAGE_COLUMNS + ID_COLUMNS if c in df.columns]
     if drop_columns:
         df = df.drop(columns=drop_columns)
+    return df
+
+
+def _fill_missing(df: pd.DataFrame, medians) -> pd.DataFrame:
+    numeric_cols = [c for c in df.select_dtypes(include=["number"]).columns if c != "is_cancelled"]
+    categorical_cols = list(df.select_dtypes(include=["object"]).columns)
+
+    for col in numeric_cols:
+        if df[col].hasnans:
+            df[col] = df[col].fillna(medians[col])
+    for col in categorical_cols:
+        if df[col].hasnans:
+            df[col] = df[col].fillna("unknown")
+    return df
+
+
+def _smallest_int_dtype(low, high) -> str:
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "int64"
+
+
+def _dtype_plan(df: pd.DataFrame, stats: Optional["_StreamingStats"] = None) -> dict[str, object]:
+    """Compact dtypes for a cleaned frame.
+
+    Floats become float32. The random forest casts its input to float32
+    anyway, so its fit is unchanged; the gradient booster bins float64
+    values, so it sees inputs rounded to about seven significant digits.
+    Integers take the smallest type holding their range and text columns
+    become ``category``. With ``stats``, ranges and categories come from the
+    whole file rather than from ``df``.
+    """
+    plan: dict[str, object] = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_float_dtype(series):
+            plan[col] = "float32"
+        elif pd.api.types.is_integer_dtype(series):
+            low, high = stats.value_range(col) if stats is not None else (series.min(), series.max())
+            plan[col] = _smallest_int_dtype(low, high) if len(series) else series.dtype
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            values = stats.categories(col) if stats is not None else series.unique()
+            plan[col] = pd.CategoricalDtype(sorted(values))
+    return plan
+
+
+def _apply_dtype_plan(df: pd.DataFrame, plan: dict[str, object]) -> pd.DataFrame:
+    for col, dtype in plan.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def clean_data(df):
+    df = _prepare_rows(df)
 
     # Drop constant features; they add noise and make model metadata larger.
     feature_cols = [c for c in df.columns if c != "is_cancelled"]
@@ -91,11 +173,196 @@ def clean_data(df):
         df = df.drop(columns=constant_cols)
 
     numeric_cols = [c for c in df.select_dtypes(include=["number"]).columns if c != "is_cancelled"]
-    categorical_cols = list(df.select_dtypes(include=["object"]).columns)
+    df = _fill_missing(df, df[numeric_cols].median())
+    return _apply_dtype_plan(df, _dtype_plan(df))
 
-    if numeric_cols:
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-    if categorical_cols:
-        df[categorical_cols] = df[categorical_cols].fillna("unknown")
 
-    return df
+class _StreamingStats:
+    """Global statistics ``clean_data`` needs, accumulated one chunk at a time.
+
+    Constant-column detection keeps at most two distinct values per column.
+    Medians are exact: they are read off merged per-value counts, so memory
+    grows with the number of distinct numeric values, not with the row count.
+    Text columns keep their distinct values for the final category dtype.
+    ``update`` can be limited to some columns, to re-scan them after
+    ``forget``.
+    """
+
+    def __init__(self) -> None:
+        self.columns: list[str] = []
+        self.rows = 0
+        self._distinct: dict[str, pd.Series] = {}
+        self._varying: set[str] = set()
+        self._counts: dict[str, pd.Series] = {}
+        self._text_values: dict[str, set] = {}
+        self._has_missing: set[str] = set()
+
+    def update(self, chunk: pd.DataFrame, columns: Optional[list[str]] = None) -> None:
+        if columns is None:
+            if not self.columns:
+                self.columns = list(chunk.columns)
+            self.rows += len(chunk)
+            columns = list(chunk.columns)
+
+        for col in columns:
+            if col in self._varying:
+                continue
+            seen = pd.concat([self._distinct.get(col, chunk[col].iloc[:0]), chunk[col].drop_duplicates().head(2)])
+            seen = seen.drop_duplicates()
+            if len(seen) > 1:
+                self._varying.add(col)
+                self._distinct.pop(col, None)
+            else:
+                self._distinct[col] = seen
+
+        for col in columns:
+            values = chunk[col]
+            if values.hasnans:
+                self._has_missing.add(col)
+            if pd.api.types.is_numeric_dtype(values):
+                counts = values.value_counts(dropna=True)
+                previous = self._counts.get(col)
+                self._counts[col] = counts if previous is None else previous.add(counts, fill_value=0)
+            else:
+                self._text_values.setdefault(col, set()).update(values.dropna().unique())
+
+    def mixed_columns(self) -> list[str]:
+        """Columns parsed as numbers in some chunks and as text in others."""
+        return [c for c in self.columns if c in self._counts and c in self._text_values]
+
+    def forget(self, columns: list[str]) -> None:
+        for col in columns:
+            self._varying.discard(col)
+            self._has_missing.discard(col)
+            for values in (self._distinct, self._counts, self._text_values):
+                values.pop(col, None)
+
+    def value_range(self, col: str) -> tuple:
+        counts = self._counts.get(col)
+        if counts is None or counts.empty:
+            return 0, 0
+        return counts.index.min(), counts.index.max()
+
+    def categories(self, col: str) -> set:
+        values = set(self._text_values.get(col, set()))
+        if col in self._has_missing:
+            values.add("unknown")
+        return values
+
+    def constant_columns(self) -> list[str]:
+        return [c for c in self.columns if c != "is_cancelled" and c not in self._varying]
+
+    def medians(self, columns: list[str]) -> pd.Series:
+        return pd.Series({col: self._median(col) for col in columns}, dtype="float64")
+
+    def _median(self, col: str) -> float:
+        counts = self._counts.get(col)
+        if counts is None or counts.sum() == 0:
+            return np.nan
+        counts = counts.sort_index()
+        values = counts.index.to_numpy(dtype="float64")
+        cumulative = np.cumsum(counts.to_numpy(dtype="int64"))
+        n = int(cumulative[-1])
+        lower = values[np.searchsorted(cumulative, (n - 1) // 2, side="right")]
+        upper = values[np.searchsorted(cumulative, n // 2, side="right")]
+        return float(lower) if n % 2 else float(np.mean([lower, upper]))
+
+
+def _scan_raw_dtypes(path, chunksize: int) -> tuple[dict[str, object], _StreamingStats]:
+    """First pass: per-column dtypes of the raw CSV and global cleaning stats."""
+    seen: dict[str, list] = {}
+    stats = _StreamingStats()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col in chunk.columns:
+            # A chunk where a column is entirely empty says nothing about its type.
+            if chunk[col].notna().any():
+                seen.setdefault(col, []).append(chunk[col].dtype)
+            else:
+                seen.setdefault(col, []).append(None)
+        stats.update(_prepare_rows(chunk))
+
+    dtypes: dict[str, object] = {}
+    for col, chunk_dtypes in seen.items():
+        known = [d for d in chunk_dtypes if d is not None]
+        non_numeric = [d for d in known if not pd.api.types.is_numeric_dtype(d)]
+        if non_numeric:
+            dtypes[col] = non_numeric[0]
+        elif not known or len(known) < len(chunk_dtypes):
+            dtypes[col] = np.dtype("float64")
+        else:
+            dtypes[col] = np.result_type(*known)
+
+    mixed = stats.mixed_columns()
+    if mixed:
+        # The numeric chunks of these columns were counted as numbers, which
+        # neither match their text form nor end up in the categories. Re-read
+        # them as the second pass will.
+        stats.forget(mixed)
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtypes):
+            stats.update(_prepare_rows(chunk), columns=mixed)
+    return dtypes, stats
+
+
+def clean_data_chunked(path, output_path, chunksize: int = 250_000) -> Path:
+    """Stream ``clean_data`` over a CSV that may not fit in memory.
+
+    The first pass collects the column types and the global statistics
+    (constant columns, numeric medians). The second pass cleans each chunk
+    with them and appends it to a Parquet file. The result matches
+    ``clean_data(load_data(path))``, including the row index.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dtypes, stats = _scan_raw_dtypes(path, chunksize)
+    constant_cols = stats.constant_columns()
+    kept = [c for c in stats.columns if c not in constant_cols]
+    medians: Optional[pd.Series] = None
+    plan: Optional[dict[str, object]] = None
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtypes):
+            chunk = _prepare_rows(chunk)
+            if chunk.empty:
+                continue
+            chunk = chunk[kept]
+            if medians is None:
+                numeric_cols = [
+                    c for c in chunk.select_dtypes(include=["number"]).columns if c != "is_cancelled"
+                ]
+                medians = stats.medians(numeric_cols)
+            chunk = _fill_missing(chunk, medians)
+            if plan is None:
+                plan = _dtype_plan(chunk, stats)
+            chunk = _apply_dtype_plan(chunk, plan)
+            chunk.index = pd.Index(chunk.index.to_numpy(dtype="int64"))
+            table = pa.Table.from_pandas(chunk, preserve_index=True)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        empty = pd.DataFrame(columns=kept)
+        empty.to_parquet(output_path)
+    return output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Clean a raw bookings CSV in chunks into Parquet.")
+    parser.add_argument("--input", required=True, help="Path to the raw bookings CSV")
+    parser.add_argument("--output", required=True, help="Path to the cleaned Parquet file")
+    parser.add_argument("--chunksize", type=int, default=250_000, help="Rows per CSV chunk")
+    args = parser.parse_args()
+
+    output_path = clean_data_chunked(args.input, args.output, chunksize=args.chunksize)
+    print(f"Cleaned data written to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,91 +1,748 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import warnings
+from contextlib import contextmanager, nullcontext
+
 import joblib
 import mlflow
 import mlflow.sklearn
+import numpy as np
+import pandas as pd
 
+from sklearn.base import clone
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import (
+    GridSearchCV,
+    ParameterGrid,
+    RandomizedSearchCV,
+    StratifiedKFold,
+    train_test_split,
+)
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+from threadpoolctl import threadpool_limits
 
 try:
+    from src.drift_monitor import build_reference_profile, save_reference_profile
+    from src.feature_cache import load_clean_data
+    from src.inference import load_model, predict_batch, predict_with_probability_from_payload
+    from src.location_index import LOCATION_COLUMNS, build_location_index, out_of_fold_features, save_location_index
     from src.preprocess import load_data, clean_data
-    from src.config import DATA_PATH, MLFLOW_EXPERIMENT, MLFLOW_TRACKING_URI, MODEL_PATH
+    from src.config import (
+        COMPILED_MODEL_PATH,
+        DATA_PATH,
+        DRIFT_REFERENCE_PATH,
+        DECISION_THRESHOLD,
+        LOCATION_INDEX_PATH,
+        MLFLOW_EXPERIMENT,
+        MLFLOW_TRACKING_URI,
+        MODEL_PATH,
+    )
 except ModuleNotFoundError:
+    from drift_monitor import build_reference_profile, save_reference_profile
+    from feature_cache import load_clean_data
+    from inference import load_model, predict_batch, predict_with_probability_from_payload
+    from location_index import LOCATION_COLUMNS, build_location_index, out_of_fold_features, save_location_index
     from preprocess import load_data, clean_data
-    from config import DATA_PATH, MLFLOW_EXPERIMENT, MLFLOW_TRACKING_URI, MODEL_PATH
+    from config import (
+        COMPILED_MODEL_PATH,
+        DATA_PATH,
+        DRIFT_REFERENCE_PATH,
+        DECISION_THRESHOLD,
+        LOCATION_INDEX_PATH,
+        MLFLOW_EXPERIMENT,
+        MLFLOW_TRACKING_URI,
+        MODEL_PATH,
+    )
+
+
+MODEL_TYPES = ["random_forest", "hist_gradient_boosting"]
+DEFAULT_SEARCH_SPACES = {
+    "random_forest": {
+        "classifier__n_estimators": [100, 200, 300, 500],
+        "classifier__min_samples_leaf": [1, 2, 4, 8],
+        "classifier__max_depth": [None, 16, 32],
+        "classifier__max_features": ["sqrt", 0.3, 0.5],
+    },
+    "hist_gradient_boosting": {
+        "classifier__learning_rate": [0.05, 0.1, 0.2],
+        "classifier__max_iter": [100, 200, 400],
+        "classifier__max_leaf_nodes": [15, 31, 63],
+        "classifier__l2_regularization": [0.0, 1.0],
+    },
+}
+LOGGED_CLASSIFIER_PARAMS = [
+    "n_estimators",
+    "min_samples_leaf",
+    "max_depth",
+    "max_features",
+    "max_iter",
+    "learning_rate",
+    "max_leaf_nodes",
+    "l2_regularization",
+    "class_weight",
+]
+# Rows scored one at a time / in one batch when measuring serving latency.
+LATENCY_SINGLE_ROWS = 200
+LATENCY_BATCH_ROWS = 1000
+
 
+def build_pipeline(
+    df,
+    model_type: str = "random_forest",
+    max_categories: int | None = None,
+    min_category_frequency: int | float | None = None,
+    location_features: bool = False,
+):
+    """Pipeline plus a stratified 80/20 split of ``df``.
 
-def build_pipeline(df):
+    ``max_categories`` and ``min_category_frequency`` cap each categorical
+    column: levels rarer than the frequency (a count, or a share of rows when
+    below 1), or beyond the ``max_categories - 1`` most frequent, share one
+    "other" code. The counts are learned when the pipeline is fitted.
+
+    With ``location_features``, pickup and drop locations are replaced by the
+    aggregates of a ``LocationIndex`` built from the training split (out of
+    fold for the training rows themselves). The index is attached to the
+    pipeline as ``location_index`` and applied to payloads at inference.
+    """
+    location_index = None
+    if location_features and all(col in df.columns for col in LOCATION_COLUMNS):
+        train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df["is_cancelled"])
+        location_index = build_location_index(train_df)
+        df = pd.concat([out_of_fold_features(train_df), location_index.add_features(test_df)])
     X = df.drop("is_cancelled", axis=1)
     y = df["is_cancelled"]
 
-    categorical_cols = X.select_dtypes(include=["object"]).columns
-    numerical_cols = X.select_dtypes(include=["int64", "float64"]).columns
+    categorical_cols = X.select_dtypes(include=["category", "object"]).columns
+    numerical_cols = X.select_dtypes(include=["number"]).columns
 
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_cols),
-            ("num", "passthrough", numerical_cols)
-        ]
-    )
+    if model_type == "random_forest":
+        preprocessor = ColumnTransformer(
+            transformers=[
+                (
+                    "cat",
+                    OneHotEncoder(
+                        handle_unknown="ignore",
+                        max_categories=max_categories,
+                        min_frequency=min_category_frequency,
+                    ),
+                    categorical_cols,
+                ),
+                ("num", "passthrough", numerical_cols)
+            ]
+        )
 
-    model = RandomForestClassifier(
-        n_estimators=300,
-        random_state=42,
-        class_weight="balanced_subsample",
-        n_jobs=-1,
-        min_samples_leaf=2,
-    )
+        model = RandomForestClassifier(
+            n_estimators=300,
+            random_state=42,
+            class_weight="balanced_subsample",
+            n_jobs=-1,
+            min_samples_leaf=2,
+        )
+    elif model_type == "hist_gradient_boosting":
+        # Integer codes feed the booster's native categorical splits instead of
+        # one column per level. Unseen and missing levels become NaN, and levels
+        # beyond the 255 bins the booster supports share one infrequent code.
+        preprocessor = ColumnTransformer(
+            transformers=[
+                (
+                    "cat",
+                    OrdinalEncoder(
+                        handle_unknown="use_encoded_value",
+                        unknown_value=np.nan,
+                        encoded_missing_value=np.nan,
+                        max_categories=min(max_categories or 255, 255),
+                        min_frequency=min_category_frequency,
+                    ),
+                    categorical_cols,
+                ),
+                ("num", "passthrough", numerical_cols)
+            ]
+        )
+
+        model = HistGradientBoostingClassifier(
+            max_iter=200,
+            learning_rate=0.1,
+            categorical_features=[True] * len(categorical_cols) + [False] * len(numerical_cols),
+            class_weight="balanced",
+            random_state=42,
+        )
+    else:
+        raise ValueError(f"Unknown model type '{model_type}'. Choose from: {', '.join(MODEL_TYPES)}.")
 
     pipeline = Pipeline([
         ("preprocessor", preprocessor),
         ("classifier", model)
     ])
 
+    if location_index is not None:
+        pipeline.location_index = location_index
+        # Same rows as the split above; the frame is already ordered train, test.
+        n_train = len(train_df)
+        return pipeline, X.iloc[:n_train], X.iloc[n_train:], y.iloc[:n_train], y.iloc[n_train:]
+
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
 
     return pipeline, X_train, X_test, y_train, y_test
 
 
-def main() -> None:
-    df = load_data(DATA_PATH)
-    df = clean_data(df)
-    pipeline, X_train, X_test, y_train, y_test = build_pipeline(df)
+def export_compiled_model(pipeline, path) -> None:
+    """Flatten a fitted OneHotEncoder + random forest pipeline into NumPy arrays.
+
+    The result is read by ``src.inference.load_compiled_model``, which scores
+    payloads without pandas or the ColumnTransformer.
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.named_steps["classifier"]
+    transformers = {name: (transformer, list(cols)) for name, transformer, cols in preprocessor.transformers_}
+    encoder, categorical_cols = transformers["cat"]
+    _, numerical_cols = transformers["num"]
 
-    pipeline.fit(X_train, y_train)
+    if not hasattr(classifier, "estimators_") or not hasattr(classifier, "predict_proba"):
+        raise ValueError(f"Compiled export does not support {type(classifier).__name__}.")
+    if not isinstance(encoder, OneHotEncoder) or encoder.drop is not None:
+        raise ValueError("Compiled export requires an OneHotEncoder without dropped categories.")
+    if len(classifier.classes_) != 2:
+        raise ValueError("Compiled export supports binary classifiers only.")
+
+    arrays: dict[str, np.ndarray] = {}
+    onehot_offsets = []
+    offset = 0
+    infrequent = getattr(encoder, "infrequent_categories_", None) or [None] * len(encoder.categories_)
+    for index, (categories, rare) in enumerate(zip(encoder.categories_, infrequent)):
+        arrays[f"categories_{index}"] = np.asarray(categories, dtype=str)
+        onehot_offsets.append(offset)
+        if rare is None:
+            offset += len(categories)
+            continue
+        # Frequent levels keep their order; every infrequent level maps to the
+        # shared column after them, as in OneHotEncoder's output.
+        is_rare = np.isin(categories, rare)
+        columns = np.where(is_rare, (~is_rare).sum(), np.cumsum(~is_rare) - 1)
+        arrays[f"category_columns_{index}"] = columns.astype(np.int64)
+        offset += int((~is_rare).sum()) + 1
+
+    features, thresholds, lefts, rights, leaf_values, missing_left, roots = [], [], [], [], [], [], []
+    node_offset = 0
+    max_depth = 0
+    for estimator in classifier.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(tree.node_count) + node_offset
+        # Leaves point at themselves so traversal can run a fixed number of steps.
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left + node_offset))
+        rights.append(np.where(is_leaf, node_ids, tree.children_right + node_offset))
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        missing_left.append(tree.missing_go_to_left.astype(bool))
+        value = tree.value[:, 0, :]
+        leaf_values.append(np.where(is_leaf, value[:, 1] / value.sum(axis=1), 0.0))
+        roots.append(node_offset)
+        node_offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays.update(
+        {
+            "categorical_cols": np.asarray(categorical_cols, dtype=str),
+            "numerical_cols": np.asarray(numerical_cols, dtype=str),
+            "onehot_offsets": np.asarray(onehot_offsets, dtype=np.int64),
+            "n_features": np.asarray(offset + len(numerical_cols), dtype=np.int64),
+            "sparse_input": np.asarray(bool(preprocessor.sparse_output_)),
+            "classes": np.asarray(classifier.classes_),
+            "decision_threshold": np.asarray(
+                getattr(pipeline, "decision_threshold", DECISION_THRESHOLD), dtype=np.float64
+            ),
+            "mlflow_run_id": np.asarray(getattr(pipeline, "mlflow_run_id", "") or "", dtype=str),
+            "location_index": np.asarray(
+                json.dumps(pipeline.location_index.to_dict()) if getattr(pipeline, "location_index", None) else "",
+                dtype=str,
+            ),
+            "feature": np.concatenate(features).astype(np.int64),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "left": np.concatenate(lefts).astype(np.int64),
+            "right": np.concatenate(rights).astype(np.int64),
+            "missing_go_to_left": np.concatenate(missing_left),
+            "leaf_value": np.concatenate(leaf_values).astype(np.float64),
+            "roots": np.asarray(roots, dtype=np.int64),
+            "max_depth": np.asarray(max_depth, dtype=np.int64),
+        }
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # np.savez appends ".npz" to names without it, so keep the suffix last.
+    tmp_path = path.with_name(f"{path.stem}.tmp.npz")
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def save_model(pipeline, path) -> None:
+    # Write then rename so a running API never reloads a half-written file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_search_space(path=None, model_type: str = "random_forest") -> dict[str, list]:
+    """Read a JSON object mapping parameter names to candidate value lists.
+
+    Names without a step prefix refer to the classifier, so
+    ``{"n_estimators": [100, 300]}`` means ``classifier__n_estimators``.
+    """
+    if path is None:
+        return dict(DEFAULT_SEARCH_SPACES[model_type])
+    with open(path, encoding="utf-8") as handle:
+        raw = json.load(handle)
+    if not isinstance(raw, dict) or not all(isinstance(v, list) and v for v in raw.values()):
+        raise ValueError("Search space must be a JSON object of non-empty value lists.")
+    return {name if "__" in name else f"classifier__{name}": values for name, values in raw.items()}
+
+
+def split_cpu_budget(cpu_budget: int, n_tasks: int) -> tuple[int, int]:
+    """Split cores between parallel fits (outer) and each model's threads (inner).
+
+    outer * inner never exceeds the budget, so search workers and the
+    model's own threads do not oversubscribe the machine.
+    """
+    outer = max(1, min(cpu_budget, n_tasks))
+    inner = max(1, cpu_budget // outer)
+    return outer, inner
+
+
+@contextmanager
+def limit_openmp_threads(n_threads: int):
+    """Cap OpenMP threads in this process and in loky workers started in the block."""
+    with threadpool_limits(limits=n_threads, user_api="openmp"):
+        with joblib.parallel_config(backend="loky", inner_max_num_threads=n_threads):
+            yield
+
+
+def run_search(
+    pipeline,
+    X_train,
+    y_train,
+    search_space: dict[str, list],
+    mode: str = "grid",
+    n_iter: int = 20,
+    cv: int = 5,
+    cpu_budget: int = 1,
+):
+    """Cross-validate candidate parameters in parallel and refit the best one.
+
+    Returns the refitted pipeline and the search's ``cv_results_``.
+    """
+    n_candidates = len(ParameterGrid(search_space)) if mode == "grid" else n_iter
+    outer, inner = split_cpu_budget(cpu_budget, n_candidates * cv)
+    search_kwargs = {
+        "scoring": {"roc_auc": "roc_auc", "accuracy": "accuracy"},
+        "refit": False,
+        "cv": StratifiedKFold(n_splits=cv, shuffle=True, random_state=42),
+        "n_jobs": outer,
+        "error_score": "raise",
+    }
+    # Estimators without n_jobs (the gradient booster) run OpenMP threads,
+    # which are capped around the fits instead.
+    thread_param = {"classifier__n_jobs": inner} if "classifier__n_jobs" in pipeline.get_params() else {}
+    base = clone(pipeline).set_params(**thread_param)
+    if mode == "grid":
+        search = GridSearchCV(base, search_space, **search_kwargs)
+    else:
+        search = RandomizedSearchCV(base, search_space, n_iter=n_iter, random_state=42, **search_kwargs)
+    with nullcontext() if thread_param else limit_openmp_threads(inner):
+        search.fit(X_train, y_train)
+
+    results = search.cv_results_
+    best_params = results["params"][int(np.argmin(results["rank_test_roc_auc"]))]
+    best = clone(pipeline).set_params(**best_params)
+    if thread_param:
+        best.set_params(classifier__n_jobs=cpu_budget)
+    with nullcontext() if thread_param else limit_openmp_threads(cpu_budget):
+        best.fit(X_train, y_train)
+    if thread_param:
+        best.set_params(classifier__n_jobs=pipeline.get_params()["classifier__n_jobs"])
+    return best, results
+
+
+def stratified_subsample(X, y, size: float | None, random_state: int = 42):
+    """Keep ``size`` rows (or that share of rows when below 1) with the class balance of ``y``."""
+    if size is None or size >= len(X) or size == 1.0:
+        return X, y
+    train_size = size if size < 1 else int(size)
+    X_sub, _, y_sub, _ = train_test_split(X, y, train_size=train_size, stratify=y, random_state=random_state)
+    return X_sub, y_sub
+
+
+def fit_warm_start(
+    pipeline,
+    X_train,
+    y_train,
+    n_chunks: int,
+    patience: int = 2,
+    validation_fraction: float = 0.1,
+) -> list[dict[str, float]]:
+    """Grow the forest chunk by chunk and stop once validation ROC AUC stalls.
+
+    The preprocessor is fitted once on all training rows, which only counts
+    category levels. Each round then encodes one stratified chunk and adds
+    ``n_estimators / n_chunks`` trees fitted on it, so only one chunk's
+    encoded matrix is alive at a time. Returns the validation history.
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.named_steps["classifier"]
+    params = classifier.get_params()
+    if "warm_start" not in params or "n_estimators" not in params:
+        raise ValueError(f"Warm-start training does not support {type(classifier).__name__}.")
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=validation_fraction, stratify=y_train, random_state=42
+    )
+    preprocessor.fit(X_fit)
+    X_val_encoded = preprocessor.transform(X_val)
+    total_trees = classifier.n_estimators
+    trees_per_chunk = math.ceil(total_trees / n_chunks)
+    chunks = StratifiedKFold(n_splits=n_chunks, shuffle=True, random_state=42).split(X_fit, y_fit)
+
+    history: list[dict[str, float]] = []
+    best, stalled = -np.inf, 0
+    classifier.set_params(warm_start=True)
+    for index, (_, rows) in enumerate(chunks):
+        classifier.set_params(n_estimators=min(total_trees, (index + 1) * trees_per_chunk))
+        with warnings.catch_warnings():
+            # Chunks are stratified, so the balanced class weights of each
+            # chunk match those of the full training set.
+            warnings.filterwarnings("ignore", message=".*class_weight presets.*warm_start.*")
+            classifier.fit(preprocessor.transform(X_fit.iloc[rows]), y_fit.iloc[rows])
+        score = roc_auc_score(y_val, classifier.predict_proba(X_val_encoded)[:, 1])
+        history.append({"trees": classifier.n_estimators, "val_roc_auc": score})
+        if score > best + 1e-4:
+            best, stalled = score, 0
+        else:
+            stalled += 1
+            if patience and stalled >= patience:
+                break
+    classifier.set_params(warm_start=False)
+    return history
+
+
+def _rss_bytes() -> int:
+    # Linux only; elsewhere track_peak_memory falls back to getrusage.
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _max_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # ru_maxrss is in bytes on macOS and KiB on Linux.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+@contextmanager
+def track_peak_memory(interval_s: float = 0.05):
+    """Yield a dict whose ``peak_rss_mb`` follows the enclosed block's peak resident memory.
+
+    Memory is sampled from a thread, so allocations made by sklearn outside
+    Python are seen too. Without /proc the process-wide peak is reported.
+    """
+    usage: dict[str, float] = {}
+    done = threading.Event()
+
+    def sample() -> None:
+        while True:
+            rss = _rss_bytes() or _max_rss_bytes()
+            if rss:
+                usage["peak_rss_mb"] = max(usage.get("peak_rss_mb", 0.0), rss / 2**20)
+            if done.wait(interval_s):
+                return
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield usage
+    finally:
+        done.set()
+        sampler.join()
+
+
+def measure_serving_cost(model_path, X_sample) -> dict[str, float]:
+    """Time loading the saved model and scoring rows the way the API does."""
+    started = time.perf_counter()
+    model = load_model(model_path)
+    load_seconds = time.perf_counter() - started
+
+    payloads = X_sample.head(LATENCY_BATCH_ROWS).to_dict(orient="records")
+    predict_with_probability_from_payload(payloads[0], model)
+    latencies = []
+    for payload in payloads[:LATENCY_SINGLE_ROWS]:
+        started = time.perf_counter()
+        predict_with_probability_from_payload(payload, model)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    predict_batch(payloads, model)
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "model_size_mb": os.path.getsize(model_path) / 1e6,
+        "model_load_seconds": load_seconds,
+        "single_row_latency_ms_p50": float(np.percentile(latencies, 50)) * 1e3,
+        "single_row_latency_ms_p99": float(np.percentile(latencies, 99)) * 1e3,
+        "batch_latency_ms_per_row": batch_seconds / len(payloads) * 1e3,
+    }
+
+
+def _log_search_trials(results) -> None:
+    for index, params in enumerate(results["params"]):
+        with mlflow.start_run(run_name=f"trial-{index:03d}", nested=True):
+            mlflow.log_params({name.split("__", 1)[-1]: value for name, value in params.items()})
+            mlflow.log_metrics(
+                {
+                    "cv_roc_auc_mean": results["mean_test_roc_auc"][index],
+                    "cv_roc_auc_std": results["std_test_roc_auc"][index],
+                    "cv_accuracy_mean": results["mean_test_accuracy"][index],
+                    "cv_rank": int(results["rank_test_roc_auc"][index]),
+                    "mean_fit_seconds": results["mean_fit_time"][index],
+                }
+            )
+
+
+def _count_or_share(value: str) -> int | float:
+    # Encoders take an int count or a float share below 1; 5.0 is neither.
+    number = float(value)
+    if 0 < number < 1:
+        return number
+    if number >= 1 and number.is_integer():
+        return int(number)
+    raise argparse.ArgumentTypeError(f"expected a whole count of at least 1 or a share between 0 and 1, got {value}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the ride-cancellation model.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DECISION_THRESHOLD,
+        help="Decision threshold on the cancellation probability, saved with the model",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Re-run clean_data and overwrite the cached preprocessed dataset",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Skip the preprocessed dataset cache entirely",
+    )
+    parser.add_argument(
+        "--search",
+        choices=["grid", "random"],
+        help="Cross-validated hyperparameter search before the final fit",
+    )
+    parser.add_argument("--search-space", help="JSON file with the parameter grid or random space")
+    parser.add_argument("--n-iter", type=int, default=20, help="Candidates sampled in random search")
+    parser.add_argument("--cv", type=int, default=5, help="Number of cross-validation folds")
+    parser.add_argument(
+        "--cpu-budget",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Total cores shared by parallel trials and each forest's n_jobs",
+    )
+    parser.add_argument(
+        "--model",
+        choices=MODEL_TYPES,
+        default="random_forest",
+        help="Estimator to train",
+    )
+    parser.add_argument(
+        "--location-features",
+        action="store_true",
+        help="Replace pickup/drop locations with smoothed per-location and per-route aggregates",
+    )
+    parser.add_argument(
+        "--max-categories",
+        type=int,
+        help="Keep at most this many levels per categorical column; the rest share one 'other' level",
+    )
+    parser.add_argument(
+        "--min-category-frequency",
+        type=_count_or_share,
+        help="Fold levels rarer than this count (or share, when below 1) into the 'other' level",
+    )
+    parser.add_argument(
+        "--subsample",
+        type=float,
+        help="Train on a stratified subsample: a row count, or a share of training rows when below 1",
+    )
+    parser.add_argument(
+        "--warm-start-chunks",
+        type=int,
+        help="Grow the random forest over this many stratified chunks instead of one fit",
+    )
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=2,
+        help="Stop warm-start training after this many chunks without validation gain (0 disables)",
+    )
+    args = parser.parse_args(argv)
+    if not 0.0 <= args.threshold <= 1.0:
+        parser.error("--threshold must be between 0 and 1.")
+    if args.cv < 2 or args.n_iter < 1 or args.cpu_budget < 1:
+        parser.error("--cv must be at least 2; --n-iter and --cpu-budget at least 1.")
+    if args.max_categories is not None and args.max_categories < 2:
+        parser.error("--max-categories must be at least 2.")
+    if args.subsample is not None and args.subsample <= 0:
+        parser.error("--subsample must be positive.")
+    if args.warm_start_chunks is not None:
+        if args.warm_start_chunks < 2:
+            parser.error("--warm-start-chunks must be at least 2.")
+        if args.search or args.model != "random_forest":
+            parser.error("--warm-start-chunks only applies to a random_forest fit without --search.")
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.no_cache:
+        df = clean_data(load_data(DATA_PATH))
+        cache_info = {}
+    else:
+        df, cache_info = load_clean_data(DATA_PATH, rebuild=args.rebuild_cache)
+        print(f"Feature cache {'hit' if cache_info['feature_cache_hit'] else 'miss'}: {cache_info['feature_cache_path']}")
+    pipeline, X_train, X_test, y_train, y_test = build_pipeline(
+        df,
+        model_type=args.model,
+        max_categories=args.max_categories,
+        min_category_frequency=args.min_category_frequency,
+        location_features=args.location_features,
+    )
+    # Search refits a clone, which drops attributes set on the pipeline.
+    location_index = getattr(pipeline, "location_index", None)
+    X_train, y_train = stratified_subsample(X_train, y_train, args.subsample)
     MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
     mlflow.set_experiment(MLFLOW_EXPERIMENT)
-    with mlflow.start_run():
-        y_pred = pipeline.predict(X_test)
+    with mlflow.start_run() as run:
+        with track_peak_memory() as memory:
+            fit_started = time.perf_counter()
+            if args.search:
+                search_space = load_search_space(args.search_space, model_type=args.model)
+                pipeline, results = run_search(
+                    pipeline,
+                    X_train,
+                    y_train,
+                    search_space,
+                    mode=args.search,
+                    n_iter=args.n_iter,
+                    cv=args.cv,
+                    cpu_budget=args.cpu_budget,
+                )
+                _log_search_trials(results)
+                mlflow.log_params(
+                    {
+                        "search": args.search,
+                        "search_candidates": len(results["params"]),
+                        "cv_folds": args.cv,
+                        "cpu_budget": args.cpu_budget,
+                    }
+                )
+                mlflow.log_metric("best_cv_roc_auc", float(np.max(results["mean_test_roc_auc"])))
+            elif args.warm_start_chunks:
+                history = fit_warm_start(pipeline, X_train, y_train, args.warm_start_chunks, patience=args.patience)
+                for entry in history:
+                    mlflow.log_metric("val_roc_auc", entry["val_roc_auc"], step=entry["trees"])
+                mlflow.log_param("warm_start_chunks_used", len(history))
+            else:
+                pipeline.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - fit_started
+        # Inference derives the label from predict_proba with this threshold.
+        pipeline.decision_threshold = args.threshold
+        if location_index is not None:
+            pipeline.location_index = location_index
+        # Serves as the model version reported by the API.
+        pipeline.mlflow_run_id = run.info.run_id
+        y_proba = pipeline.predict_proba(X_test)[:, 1]
+        y_pred = (y_proba > args.threshold).astype(int)
         metrics = {
             "accuracy": accuracy_score(y_test, y_pred),
             "precision": precision_score(y_test, y_pred, zero_division=0),
             "recall": recall_score(y_test, y_pred, zero_division=0),
             "f1": f1_score(y_test, y_pred, zero_division=0),
+            "roc_auc": roc_auc_score(y_test, y_proba),
         }
-
-        y_proba = pipeline.predict_proba(X_test)[:, 1]
-        metrics["roc_auc"] = roc_auc_score(y_test, y_proba)
         mlflow.log_metrics(metrics)
+        if cache_info:
+            mlflow.log_params(
+                {
+                    "feature_cache": "hit" if cache_info["feature_cache_hit"] else "miss",
+                    "feature_cache_key": cache_info["feature_cache_key"],
+                }
+            )
+            mlflow.log_metrics({k: v for k, v in cache_info.items() if k.endswith("_seconds")})
+        classifier = pipeline.named_steps["classifier"]
+        classifier_params = classifier.get_params()
         mlflow.log_params(
             {
-                "model_type": "RandomForestClassifier",
-                "n_estimators": 300,
-                "min_samples_leaf": 2,
-                "class_weight": "balanced_subsample",
+                "model_type": type(classifier).__name__,
+                **{name: classifier_params[name] for name in LOGGED_CLASSIFIER_PARAMS if name in classifier_params},
+                "decision_threshold": args.threshold,
                 "train_rows": len(X_train),
                 "test_rows": len(X_test),
                 "feature_count": X_train.shape[1],
+                "fit_mode": "search" if args.search else "warm_start" if args.warm_start_chunks else "full",
+                "subsample": args.subsample,
+                "max_categories": args.max_categories,
+                "min_category_frequency": args.min_category_frequency,
+                "location_features": location_index is not None,
             }
         )
+        mlflow.log_metric("fit_seconds", fit_seconds)
+        save_model(pipeline, MODEL_PATH)
+        # Reference sketches for the API's streaming drift monitor.
+        save_reference_profile(build_reference_profile(X_train), DRIFT_REFERENCE_PATH)
+        mlflow.log_artifact(str(DRIFT_REFERENCE_PATH))
+        if location_index is not None:
+            save_location_index(location_index, LOCATION_INDEX_PATH)
+            mlflow.log_artifact(str(LOCATION_INDEX_PATH))
+        else:
+            # An index from an earlier run would not match this model.
+            LOCATION_INDEX_PATH.unlink(missing_ok=True)
+        serving_cost = measure_serving_cost(MODEL_PATH, X_test)
+        mlflow.log_metrics(serving_cost)
         mlflow.sklearn.log_model(pipeline, name="model")
+        if "peak_rss_mb" in memory:
+            mlflow.log_metric("peak_rss_mb", memory["peak_rss_mb"])
 
-    joblib.dump(pipeline, MODEL_PATH)
     print(f"Model trained and saved to: {MODEL_PATH}")
+    print(
+        f"ROC AUC {metrics['roc_auc']:.4f} | {serving_cost['model_size_mb']:.1f} MB | "
+        f"load {serving_cost['model_load_seconds']:.2f}s | "
+        f"single row p50 {serving_cost['single_row_latency_ms_p50']:.2f} ms | "
+        f"batch {serving_cost['batch_latency_ms_per_row']:.3f} ms/row"
+    )
+    print(f"Fit {fit_seconds:.1f}s | peak RSS {memory.get('peak_rss_mb', float('nan')):.0f} MB")
+    try:
+        export_compiled_model(pipeline, COMPILED_MODEL_PATH)
+    except ValueError as exc:
+        # A compiled file from an earlier model would no longer match model.pkl.
+        COMPILED_MODEL_PATH.unlink(missing_ok=True)
+        print(f"Compiled scorer not exported: {exc}")
+    else:
+        print(f"Compiled scorer saved to: {COMPILED_MODEL_PATH}")
 
 
 if __name__ == "__main__":
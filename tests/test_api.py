@@ -0,0 +1,490 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+import api.app as api_app
+from api.admission import AdmissionController, DeadlineExceeded, Overloaded, check_deadline
+from api.batching import MicroBatcher
+from src.drift_monitor import build_reference_profile, save_reference_profile
+from src.prediction_cache import LocalBackend, PredictionCache
+from src.prediction_log import read_prediction_log
+from tests.test_model_inference import _fit_small_model
+
+ADMIN_HEADERS = {"X-Admin-Token": "secret"}
+
+
+class TestModelLifecycle(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model_path = Path(cls.tmp.name) / "model.pkl"
+        joblib.dump(_fit_small_model()[0], cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self._saved = (api_app.MODEL_PATH, api_app.MODEL_MMAP_MODE, api_app.ADMIN_TOKEN)
+        api_app.ADMIN_TOKEN = "secret"
+        api_app.serving = (None, {})
+
+    def tearDown(self):
+        api_app.MODEL_PATH, api_app.MODEL_MMAP_MODE, api_app.ADMIN_TOKEN = self._saved
+        api_app.serving = (None, {})
+
+    def test_model_is_loaded_and_warmed_at_startup(self):
+        api_app.MODEL_PATH = self.model_path
+        api_app.MODEL_MMAP_MODE = "r"
+        with TestClient(api_app.app) as client:
+            self.assertIsNotNone(api_app.serving[0])
+            body = client.get("/ready").json()
+            self.assertTrue(body["ready"])
+            self.assertTrue(body["mmap"])
+            self.assertEqual(body["model_size_bytes"], self.model_path.stat().st_size)
+            self.assertGreater(body["load_seconds"], 0)
+            self.assertGreater(body["warmup_seconds"], 0)
+
+    def test_hot_reload_does_not_fail_or_stall_requests(self):
+        api_app.MODEL_PATH = Path(self.tmp.name) / "served.pkl"
+        joblib.dump(joblib.load(self.model_path), api_app.MODEL_PATH)
+        load_delay = 1.0
+        original_load_model = api_app.load_model
+
+        def slow_load_model(path, mmap_mode=None):
+            time.sleep(load_delay)
+            return original_load_model(path, mmap_mode=mmap_mode)
+
+        with TestClient(api_app.app) as client:
+            old_version = client.get("/").json()["model_version"]
+            new_model = joblib.load(self.model_path)
+            new_model.mlflow_run_id = "retrained"
+            joblib.dump(new_model, api_app.MODEL_PATH)
+
+            stop = threading.Event()
+            latencies, statuses = [], []
+
+            def hammer():
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    response = client.post("/predict", json={"booking_hour": 10, "distance": 3.0})
+                    latencies.append(time.perf_counter() - started)
+                    statuses.append(response.status_code)
+
+            workers = [threading.Thread(target=hammer) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            api_app.load_model = slow_load_model
+            try:
+                self.assertEqual(client.post("/admin/reload", headers=ADMIN_HEADERS).status_code, 202)
+            finally:
+                api_app.load_model = original_load_model
+                stop.set()
+                for worker in workers:
+                    worker.join()
+
+            self.assertEqual(client.get("/").json()["model_version"], "run:retrained")
+            self.assertNotEqual(old_version, "run:retrained")
+            self.assertEqual(client.get("/ready").json()["reload"]["state"], "ok")
+
+        self.assertGreater(len(statuses), 4)
+        self.assertEqual(set(statuses), {200})
+        self.assertLess(max(latencies), load_delay)
+
+    def test_reload_requires_a_configured_admin_token(self):
+        api_app.MODEL_PATH = self.model_path
+        with TestClient(api_app.app) as client:
+            self.assertEqual(client.post("/admin/reload").status_code, 403)
+            self.assertEqual(client.post("/admin/reload", headers={"X-Admin-Token": "guess"}).status_code, 403)
+            api_app.ADMIN_TOKEN = None
+            self.assertEqual(client.post("/admin/reload", headers=ADMIN_HEADERS).status_code, 404)
+
+    def test_first_load_and_reload_share_one_lock(self):
+        api_app.MODEL_PATH = self.model_path
+        original = api_app._load_model_version
+        loads = []
+
+        def slow_load(run_id=None):
+            loads.append(run_id)
+            time.sleep(0.2)
+            return original(run_id)
+
+        with mock.patch.object(api_app, "_load_model_version", side_effect=slow_load):
+            reload = threading.Thread(target=api_app.reload_model)
+            reload.start()
+            time.sleep(0.05)
+            first_loads = [threading.Thread(target=api_app._get_serving) for _ in range(3)]
+            for thread in first_loads:
+                thread.start()
+            for thread in [reload, *first_loads]:
+                thread.join()
+        # The first loads waited for the reload instead of loading again.
+        self.assertEqual(loads, [None])
+        self.assertIsNotNone(api_app.serving[0])
+
+        with mock.patch.object(api_app, "_load_model_version", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                api_app.reload_model()
+        self.assertFalse(api_app.reload_lock.locked())
+        self.assertEqual(api_app.reload_status["state"], "failed")
+
+    def test_results_are_versioned_with_the_model_that_scored_them(self):
+        old_model, new_model = joblib.load(self.model_path), joblib.load(self.model_path)
+
+        class SwapWhileReading(dict):
+            # A reload lands between reading the model and reading its version.
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                if key == "model_version" and api_app.serving[0] is old_model:
+                    api_app._swap_model(new_model, {"model_version": "run:new"})
+                return value
+
+        api_app.serving = (old_model, SwapWhileReading(model_version="run:old"))
+        current_model, version = api_app._served_model()
+        self.assertIs(current_model, old_model)
+        self.assertEqual(version, "run:old")
+        current_model, version = api_app._served_model()
+        self.assertIs(current_model, new_model)
+        self.assertEqual(version, "run:new")
+
+    def test_model_file_change_is_picked_up_by_watcher(self):
+        api_app.MODEL_PATH = Path(self.tmp.name) / "watched.pkl"
+        joblib.dump(joblib.load(self.model_path), api_app.MODEL_PATH)
+        saved_interval = api_app.RELOAD_INTERVAL_S
+        api_app.RELOAD_INTERVAL_S = 0.05
+        try:
+            with TestClient(api_app.app) as client:
+                new_model = joblib.load(self.model_path)
+                new_model.mlflow_run_id = "watched"
+                joblib.dump(new_model, api_app.MODEL_PATH)
+                stat = api_app.MODEL_PATH.stat()
+                os.utime(api_app.MODEL_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline:
+                    if client.get("/").json()["model_version"] == "run:watched":
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(client.get("/").json()["model_version"], "run:watched")
+        finally:
+            api_app.RELOAD_INTERVAL_S = saved_interval
+
+    def test_missing_model_reports_not_ready(self):
+        api_app.MODEL_PATH = Path(self.tmp.name) / "missing.pkl"
+        with TestClient(api_app.app) as client:
+            self.assertEqual(client.get("/ready").status_code, 503)
+            self.assertEqual(client.post("/predict", json={"booking_hour": 10}).status_code, 503)
+
+    def test_metrics_endpoint_reports_stages_requests_and_errors(self):
+        api_app.MODEL_PATH = self.model_path
+        with TestClient(api_app.app) as client:
+            self.assertEqual(client.post("/predict", json={"booking_hour": 10}).status_code, 200)
+            self.assertEqual(client.post("/predict", json={"booking_hour": 99}).status_code, 422)
+            client.post("/predict/batch", json={"rows": [{"booking_hour": 10}, {"booking_hour": 99}]})
+            response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        text = response.text
+        for stage in ["parse_validate", "build_model_row", "dataframe", "preprocess", "model"]:
+            self.assertIn(f'ride_stage_duration_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn('ride_api_requests_total{route="/predict",method="POST",status="200"}', text)
+        self.assertIn('ride_api_requests_total{route="/predict",method="POST",status="422"}', text)
+        self.assertIn('ride_api_errors_total{route="/predict",error="invalid_payload"}', text)
+        self.assertIn('ride_api_errors_total{route="/predict/batch",error="invalid_row"}', text)
+        self.assertIn('ride_api_batch_rows_bucket{source="batch_endpoint",le="2"}', text)
+        self.assertIn('ride_model_load_seconds{phase="load"}', text)
+
+    def test_batch_rows_with_unusable_values_fail_alone(self):
+        api_app.MODEL_PATH = self.model_path
+        rows = [{"booking_hour": 10}, {"ride_distance": "inf"}, {"vehicle_type": ["a"]}, {"booking_hour": 11}]
+        with TestClient(api_app.app) as client:
+            response = client.post("/predict/batch", json={"rows": rows})
+        self.assertEqual(response.status_code, 200)
+        errors = [result["error"] for result in response.json()["results"]]
+        self.assertIsNone(errors[0])
+        self.assertIn("ride_distance", errors[1])
+        self.assertIn("vehicle_type", errors[2])
+        self.assertIsNone(errors[3])
+
+    def test_error_status_does_not_depend_on_micro_batching(self):
+        api_app.MODEL_PATH = self.model_path
+        payloads = [{"distance": None}, {"ride_distance": "far"}, {"booking_hour": 99}]
+        saved = api_app.BATCH_WINDOW_MS
+        responses = {}
+        try:
+            for window_ms in (0, 5):
+                api_app.BATCH_WINDOW_MS = window_ms
+                with TestClient(api_app.app) as client:
+                    responses[window_ms] = [client.post("/predict", json=payload) for payload in payloads]
+        finally:
+            api_app.BATCH_WINDOW_MS = saved
+        self.assertEqual([r.status_code for r in responses[0]], [400, 422, 422])
+        self.assertEqual([r.json() for r in responses[5]], [r.json() for r in responses[0]])
+        self.assertEqual([r.status_code for r in responses[5]], [400, 422, 422])
+
+    def test_prediction_cache_is_invalidated_when_the_model_changes(self):
+        api_app.MODEL_PATH = Path(self.tmp.name) / "cached.pkl"
+        joblib.dump(joblib.load(self.model_path), api_app.MODEL_PATH)
+        saved_cache = api_app.prediction_cache
+        api_app.prediction_cache = PredictionCache(LocalBackend(100, 60))
+        payload = {"booking_hour": 10, "distance": 3.0}
+        try:
+            with TestClient(api_app.app) as client:
+                first = client.post("/predict", json=payload).json()
+                self.assertEqual(client.post("/predict", json=payload).json(), first)
+                self.assertEqual(client.get("/ready").json()["cache"]["hits"], 1)
+
+                new_model = joblib.load(self.model_path)
+                new_model.mlflow_run_id = "flipped"
+                new_model.decision_threshold = 1.1
+                joblib.dump(new_model, api_app.MODEL_PATH)
+                client.post("/admin/reload", headers=ADMIN_HEADERS)
+                self.assertEqual(client.get("/").json()["model_version"], "run:flipped")
+
+                after = client.post("/predict", json=payload).json()
+                self.assertEqual(after["is_cancelled"], 0)
+                self.assertEqual(client.get("/ready").json()["cache"]["misses"], 2)
+        finally:
+            api_app.prediction_cache = saved_cache
+
+    def test_drift_endpoint_tracks_scored_rows(self):
+        api_app.MODEL_PATH = self.model_path
+        saved = (api_app.DRIFT_WINDOW, api_app.DRIFT_REFERENCE_PATH, api_app.DRIFT_MIN_SAMPLES)
+        api_app.DRIFT_REFERENCE_PATH = Path(self.tmp.name) / "drift_reference.json"
+        model, X_test = _fit_small_model()
+        save_reference_profile(build_reference_profile(X_test), api_app.DRIFT_REFERENCE_PATH)
+        api_app.DRIFT_WINDOW, api_app.DRIFT_MIN_SAMPLES = 100, 5
+        try:
+            with TestClient(api_app.app) as client:
+                rows = X_test.head(10).to_dict(orient="records")
+                client.post("/predict", json=rows[0])
+                client.post("/predict/batch", json={"rows": rows[1:]})
+                report = client.get("/drift").json()
+            self.assertEqual(report["window_rows"], 10)
+            self.assertIn(report["status"], {"ok", "drift"})
+            self.assertEqual(set(report["features"]), set(X_test.columns))
+        finally:
+            api_app.DRIFT_WINDOW, api_app.DRIFT_REFERENCE_PATH, api_app.DRIFT_MIN_SAMPLES = saved
+            api_app.drift_monitor = None
+
+    def test_scored_requests_are_logged_for_drift_detection(self):
+        api_app.MODEL_PATH = self.model_path
+        saved = api_app.PREDICTION_LOG_DIR
+        api_app.PREDICTION_LOG_DIR = str(Path(self.tmp.name) / "prediction-log")
+        try:
+            with TestClient(api_app.app) as client:
+                client.post("/predict", json={"booking_hour": 10, "distance": 3.0})
+                client.post("/predict", json={"booking_hour": 99})
+                client.post("/predict/batch", json={"rows": [{"booking_hour": 8}, {"booking_hour": 9}]})
+            logged = read_prediction_log(Path(api_app.PREDICTION_LOG_DIR))
+        finally:
+            api_app.PREDICTION_LOG_DIR = saved
+
+        self.assertEqual(list(logged["booking_hour"]), [10.0, 8.0, 9.0])
+        self.assertEqual(list(logged["_endpoint"]), ["/predict", "/predict/batch", "/predict/batch"])
+        self.assertTrue((logged["_latency_ms"] > 0).all())
+        self.assertTrue(logged["_model_version"].str.startswith("sha256:").all())
+
+    def test_overload_is_shed_and_slow_requests_time_out(self):
+        api_app.MODEL_PATH = self.model_path
+        saved = (api_app.MAX_CONCURRENCY, api_app.MAX_QUEUE, api_app.REQUEST_TIMEOUT_S, api_app._score_single)
+        api_app.MAX_CONCURRENCY, api_app.MAX_QUEUE, api_app.REQUEST_TIMEOUT_S = 1, 0, 0.3
+        original_score = api_app._score_single
+
+        def slow_score(payload, deadline=None):
+            time.sleep(payload.get("delay", 0))
+            return original_score(payload, deadline)
+
+        api_app._score_single = slow_score
+        try:
+            with TestClient(api_app.app) as client:
+                responses = {}
+
+                def post(name, payload):
+                    responses[name] = client.post("/predict", json=payload)
+
+                slow = threading.Thread(target=post, args=("slow", {"booking_hour": 10, "delay": 0.6}))
+                slow.start()
+                time.sleep(0.1)
+                post("shed", {"booking_hour": 10})
+                slow.join()
+                # The 504 is sent at the deadline; the slot frees once the scoring thread ends.
+                deadline = time.monotonic() + 5
+                while client.get("/ready").json()["admission"]["active"] and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                post("ok", {"booking_hour": 10})
+                limiter = client.get("/ready").json()["admission"]
+                text = client.get("/metrics").text
+        finally:
+            api_app.MAX_CONCURRENCY, api_app.MAX_QUEUE, api_app.REQUEST_TIMEOUT_S, api_app._score_single = saved
+
+        self.assertEqual(responses["shed"].status_code, 503)
+        self.assertEqual(responses["shed"].headers["Retry-After"], "1")
+        self.assertEqual(responses["slow"].status_code, 504)
+        self.assertEqual(responses["ok"].status_code, 200)
+        self.assertEqual((limiter["shed"], limiter["timed_out"], limiter["active"]), (1, 1, 0))
+        self.assertIn('ride_api_shed_total{route="/predict"}', text)
+        self.assertIn('ride_api_timeouts_total{route="/predict"}', text)
+
+    def test_disabled_metrics_are_not_exposed(self):
+        api_app.MODEL_PATH = self.model_path
+        saved = api_app.metrics.ENABLED
+        api_app.metrics.ENABLED = False
+        try:
+            with TestClient(api_app.app) as client:
+                self.assertEqual(client.get("/metrics").status_code, 404)
+        finally:
+            api_app.metrics.ENABLED = saved
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_requests_are_scored_together_in_order(self):
+        batch_sizes = []
+
+        def score(payloads):
+            batch_sizes.append(len(payloads))
+            return [ValueError("bad row") if p["x"] < 0 else p["x"] * 2 for p in payloads]
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_wait_ms=50, max_batch_rows=8)
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    *(batcher.submit({"x": x}) for x in [1, 2, -1, 3]), return_exceptions=True
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results[:2], [2, 4])
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3], 6)
+        self.assertEqual(batch_sizes, [4])
+
+    def test_batch_is_capped_at_max_rows(self):
+        batch_sizes = []
+
+        def score(payloads):
+            batch_sizes.append(len(payloads))
+            return payloads
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_wait_ms=50, max_batch_rows=3)
+            await batcher.start()
+            try:
+                await asyncio.gather(*(batcher.submit({"x": x}) for x in range(7)))
+            finally:
+                await batcher.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(batch_sizes, [3, 3, 1])
+
+    def test_requests_past_their_deadline_are_not_scored(self):
+        scored = []
+
+        def score(payloads):
+            scored.extend(p["x"] for p in payloads)
+            return payloads
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_wait_ms=20, max_batch_rows=8)
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    batcher.submit({"x": 1}), batcher.submit({"x": 2}, deadline=time.monotonic()),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results[0], {"x": 1})
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(scored, [1])
+
+    def test_deadline_that_expires_inside_the_batching_window_is_not_scored(self):
+        scored = []
+
+        def score(payloads):
+            scored.extend(p["x"] for p in payloads)
+            return payloads
+
+        async def scenario():
+            batcher = MicroBatcher(score, max_wait_ms=200, max_batch_rows=8)
+            await batcher.start()
+            try:
+                # Alive when queued, expired well before the 200 ms window closes.
+                return await asyncio.gather(
+                    batcher.submit({"x": 1}), batcher.submit({"x": 2}, deadline=time.monotonic() + 0.05),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results[0], {"x": 1})
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(scored, [1])
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_requests_beyond_the_queue_are_shed(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrency=2, max_queue=1)
+            release = asyncio.Event()
+
+            async def work(deadline):
+                await release.wait()
+                return "done"
+
+            running = [asyncio.create_task(controller.run(work)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            with self.assertRaises(Overloaded):
+                await controller.run(work)
+            self.assertEqual((controller.active, controller.waiting), (2, 1))
+            release.set()
+            results = await asyncio.gather(*running)
+            return results, controller.stats()
+
+        results, stats = asyncio.run(scenario())
+        self.assertEqual(results, ["done"] * 3)
+        self.assertEqual((stats["shed"], stats["active"], stats["waiting"]), (1, 0, 0))
+
+    def test_deadline_abandons_queued_work_and_holds_the_slot_until_running_work_ends(self):
+        started = []
+
+        def score(name, deadline):
+            check_deadline(deadline)
+            started.append(name)
+            time.sleep(0.2)
+            return name
+
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=4, timeout_s=0.05)
+            outcomes = await asyncio.gather(
+                controller.run(lambda deadline: run_in_threadpool(score, "first", deadline)),
+                controller.run(lambda deadline: run_in_threadpool(score, "second", deadline)),
+                return_exceptions=True,
+            )
+            active_after_timeout = controller.active
+            await asyncio.sleep(0.3)
+            return outcomes, active_after_timeout, controller.stats()
+
+        outcomes, active_after_timeout, stats = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(outcome, DeadlineExceeded) for outcome in outcomes))
+        self.assertEqual(started, ["first"])
+        self.assertEqual(active_after_timeout, 1)
+        self.assertEqual((stats["timed_out"], stats["active"]), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from benchmarks.suite import compare_results
+
+
+def _results(**values):
+    better = {"rows_per_s": "higher", "latency_ms": "lower"}
+    return {"metrics": {name: {"value": value, "unit": "", "better": better[name]} for name, value in values.items()}}
+
+
+class TestCompareResults(unittest.TestCase):
+    def test_regressions_respect_metric_direction(self):
+        baseline = _results(rows_per_s=1000.0, latency_ms=10.0)
+
+        slower = compare_results(_results(rows_per_s=700.0, latency_ms=13.0), baseline, threshold=0.25)
+        self.assertEqual({row["metric"]: row["regression"] for row in slower}, {"rows_per_s": True, "latency_ms": True})
+        self.assertAlmostEqual(slower[0]["change"], 0.3)
+
+        faster = compare_results(_results(rows_per_s=1500.0, latency_ms=5.0), baseline, threshold=0.25)
+        self.assertFalse(any(row["regression"] for row in faster))
+        self.assertLess(faster[1]["change"], 0)
+
+        within = compare_results(_results(rows_per_s=900.0, latency_ms=12.0), baseline, threshold=0.25)
+        self.assertFalse(any(row["regression"] for row in within))
+
+    def test_metrics_missing_from_the_baseline_are_skipped(self):
+        rows = compare_results(_results(rows_per_s=1.0, latency_ms=1.0), _results(latency_ms=1.0))
+        self.assertEqual([row["metric"] for row in rows], ["latency_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import contextlib
+import io
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src import predict
+from src.inference import load_compiled_model, predict_batch, predict_frame
+from src.train import export_compiled_model
+from tests.test_model_inference import _fit_small_model
+
+
+class TestBulkPredict(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model, X_test = _fit_small_model()
+        payloads = X_test.to_dict(orient="records")
+        payloads[0]["booking_hour"] = 30
+        payloads[1]["ride_distance"] = "abc"
+        payloads[2]["distance"] = "4.5"
+        payloads[3]["booking_hour"] = 7.9
+        payloads[4] = {"vehicle_type": "Bike"}
+        cls.payloads = payloads
+        cls.frame = pd.DataFrame(payloads)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        self.model_path = self.dir / "model.pkl"
+        joblib.dump(self.model, self.model_path)
+
+    def assert_matches_predict_batch(self, scored: pd.DataFrame):
+        expected = predict_batch(self.payloads, self.model)
+        self.assertEqual(len(scored), len(expected))
+        for (_, row), result in zip(scored.iterrows(), expected):
+            if result["error"] is not None:
+                self.assertEqual(row["error"], result["error"])
+                self.assertTrue(pd.isna(row["is_cancelled"]))
+                continue
+            self.assertTrue(pd.isna(row["error"]))
+            self.assertEqual(row["is_cancelled"], result["is_cancelled"])
+            self.assertAlmostEqual(row["cancellation_probability"], result["cancellation_probability"], places=12)
+
+    def test_predict_frame_matches_predict_batch(self):
+        self.assert_matches_predict_batch(predict_frame(self.frame, self.model))
+
+    def test_predict_frame_with_compiled_model(self):
+        compiled_path = self.dir / "model_compiled.npz"
+        export_compiled_model(self.model, compiled_path)
+        scored = predict_frame(self.frame, load_compiled_model(compiled_path))
+        self.assert_matches_predict_batch(scored)
+
+    def test_single_prediction_without_daemon_loads_a_compiled_model(self):
+        compiled_path = self.dir / "model_compiled.npz"
+        export_compiled_model(self.model, compiled_path)
+        payload = self.payloads[5]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            predict.main(["--model-path", str(compiled_path), "--no-daemon", "--payload", json.dumps(payload)])
+        expected = predict_batch([payload], self.model)[0]["is_cancelled"]
+        self.assertEqual(json.loads(stdout.getvalue()), {"is_cancelled": expected})
+
+    def test_timing_counts_startup_from_the_given_start(self):
+        argv = ["--model-path", str(self.model_path), "--no-daemon", "--timing", "--distance", "4.5"]
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            predict.main(argv, started=time.perf_counter() - 5.0)
+        timing = json.loads(stderr.getvalue().strip().splitlines()[-1])
+        self.assertEqual(timing["mode"], "in_process")
+        self.assertGreaterEqual(timing["startup_seconds"], 5.0)
+        self.assertGreaterEqual(timing["total_seconds"], timing["startup_seconds"])
+
+    def test_string_hours_are_validated_like_build_model_row(self):
+        payloads = [{"booking_hour": "7.5"}, {"booking_hour": " 8 "}, {"booking_hour": 9.5}]
+        scored = predict_frame(pd.DataFrame(payloads), self.model)
+        expected = predict_batch(payloads, self.model)
+        self.assertIn("invalid literal for int()", expected[0]["error"])
+        self.assertEqual(scored["error"].iloc[0], expected[0]["error"])
+        for position in (1, 2):
+            self.assertIsNone(expected[position]["error"])
+            self.assertAlmostEqual(
+                scored["cancellation_probability"].iloc[position],
+                expected[position]["cancellation_probability"],
+                places=12,
+            )
+
+    def test_bulk_scoring_keeps_input_order_across_workers_and_formats(self):
+        input_path = self.dir / "input.jsonl"
+        self.frame.assign(row_id=np.arange(len(self.frame))).to_json(input_path, orient="records", lines=True)
+        for name, workers in [("out.parquet", 2), ("out.csv", 1)]:
+            output_path = self.dir / name
+            summary = predict.score_file(
+                input_path, output_path, self.model_path, chunksize=7, workers=workers, keep_columns=["row_id"]
+            )
+            scored = pd.read_parquet(output_path) if name.endswith(".parquet") else pd.read_csv(output_path)
+            self.assertEqual(summary["scored_rows"], len(self.frame))
+            np.testing.assert_array_equal(scored["row_id"], np.arange(len(self.frame)))
+            self.assert_matches_predict_batch(scored)
+            self.assertFalse(output_path.with_name(name + ".parts").exists())
+
+    def test_resume_skips_finished_chunks(self):
+        input_path = self.dir / "input.csv"
+        output_path = self.dir / "out.csv"
+        self.frame.to_csv(input_path, index=False)
+        score_chunk = predict._score_chunk
+
+        def interrupted(index, *args):
+            if index == 2:
+                raise KeyboardInterrupt
+            return score_chunk(index, *args)
+
+        with mock.patch.object(predict, "_score_chunk", side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                predict.score_file(input_path, output_path, self.model_path, chunksize=20)
+        self.assertFalse(output_path.exists())
+
+        with mock.patch.object(predict, "_score_chunk", side_effect=interrupted):
+            with self.assertRaises(ValueError):
+                predict.score_file(input_path, output_path, self.model_path, chunksize=10, resume=True)
+
+        with mock.patch.object(predict, "_score_chunk", side_effect=score_chunk) as scored_chunks:
+            summary = predict.score_file(input_path, output_path, self.model_path, chunksize=20, resume=True)
+        self.assertEqual(summary["resumed_chunks"], 2)
+        self.assertEqual(scored_chunks.call_args_list[0].args[0], 2)
+        self.assert_matches_predict_batch(pd.read_csv(output_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_bookings
+from monitoring.drift_detection import DTYPE_SAMPLE_ROWS, load_table, run_column_tests
+
+
+class TestDriftDetection(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.reference_path = Path(cls.tmp.name) / "reference.csv"
+        cls.current_path = Path(cls.tmp.name) / "current.csv"
+        make_bookings(6000, seed=0).to_csv(cls.reference_path, index=False)
+        current = make_bookings(6000, seed=1)
+        current["Ride Distance"] = current["Ride Distance"] * 1.5
+        current.to_csv(cls.current_path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_sample_is_seeded_and_keeps_strata(self):
+        options = {"sample_size": 1500, "stratify_by": "vehicle_type", "chunksize": 1000}
+        first = load_table(self.reference_path, "reference", ["vehicle_type", "ride_distance"], seed=7, **options)
+        again = load_table(self.reference_path, "reference", ["vehicle_type", "ride_distance"], seed=7, **options)
+        other = load_table(self.reference_path, "reference", ["vehicle_type", "ride_distance"], seed=8, **options)
+        full = load_table(self.reference_path, "reference", ["vehicle_type"])
+
+        self.assertEqual(list(first.columns), ["vehicle_type", "ride_distance"])
+        self.assertTrue(first.equals(again))
+        self.assertFalse(first.equals(other))
+        self.assertLess(abs(len(first) - 1500), 60)
+        sample_shares = first["vehicle_type"].value_counts(normalize=True)
+        full_shares = full["vehicle_type"].value_counts(normalize=True)
+        np.testing.assert_allclose(sample_shares[full_shares.index], full_shares, atol=0.03)
+
+    def test_columns_that_turn_to_text_after_the_dtype_sample_still_load(self):
+        n = DTYPE_SAMPLE_ROWS + 500
+        raw = pd.DataFrame(
+            {
+                "Surge": [1.5] * DTYPE_SAMPLE_ROWS + ["high"] * 500,
+                "Promo Code": [None] * DTYPE_SAMPLE_ROWS + ["NEW50"] * 500,
+                "Ride Distance": np.linspace(1, 40, n),
+            }
+        )
+        path = Path(self.tmp.name) / "late_text.csv"
+        raw.to_csv(path, index=False)
+
+        full = load_table(path, "current")
+        self.assertEqual(full["surge"].iloc[-1], "high")
+        self.assertEqual(full["promo_code"].iloc[-1], "NEW50")
+        self.assertEqual(len(full), n)
+        sampled = load_table(path, "current", sample_size=n, chunksize=4000)
+        self.assertEqual(len(sampled), n)
+        self.assertEqual(load_table(path, "current", ["ride_distance"])["ride_distance"].dtype, np.float32)
+
+    def test_parallel_tests_match_serial_and_flag_the_shifted_column(self):
+        columns = ["vehicle_type", "ride_distance", "booking_value"]
+        reference = load_table(self.reference_path, "reference", columns)
+        current = load_table(self.current_path, "current", columns)
+
+        serial = run_column_tests(reference, current, columns, jobs=1)
+        parallel = run_column_tests(reference, current, columns, jobs=2)
+
+        self.assertEqual([result["column"] for result in parallel], columns)
+        for left, right in zip(serial, parallel):
+            self.assertEqual(left["test"], right["test"])
+            self.assertAlmostEqual(left["statistic"], right["statistic"])
+            self.assertGreaterEqual(right["seconds"], 0.0)
+        drifted = {result["column"]: result["drift"] for result in serial}
+        self.assertEqual(drifted, {"vehicle_type": False, "ride_distance": True, "booking_value": False})
+        self.assertEqual(serial[1]["test"], "wasserstein_normed")
+        self.assertEqual(serial[0]["test"], "jensen_shannon")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.drift_monitor import DriftMonitor, build_reference_profile
+
+
+def _rows(n, seed, shift=0.0, vehicles=("Auto", "Bike", "Go Mini")):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "vehicle_type": rng.choice(vehicles, n),
+            "ride_distance": rng.normal(20 + shift, 5, n),
+            "booking_hour": rng.integers(0, 24, n).astype(float),
+        }
+    )
+
+
+class TestDriftMonitor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.profile = build_reference_profile(_rows(5000, seed=0))
+
+    def test_sliding_window_matches_a_fresh_window(self):
+        stream = _rows(1300, seed=1, shift=3.0)
+        incremental = DriftMonitor(self.profile, window_size=500, min_samples=1)
+        for start in range(0, len(stream), 170):
+            incremental.update(stream.iloc[start:start + 170])
+        fresh = DriftMonitor(self.profile, window_size=500, min_samples=1)
+        fresh.update(stream.tail(500))
+
+        first, second = incremental.report(), fresh.report()
+        self.assertEqual(first["window_rows"], 500)
+        self.assertEqual(first["rows_seen"], 1300)
+        for name, stats in first["features"].items():
+            for metric, value in stats.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(value, second["features"][name][metric], places=9)
+
+    def test_shifted_inputs_raise_alerts(self):
+        monitor = DriftMonitor(self.profile, window_size=2000, min_samples=200)
+        monitor.update(_rows(100, seed=2).to_dict(orient="records"))
+        self.assertEqual(monitor.report()["status"], "insufficient_data")
+
+        monitor.update(_rows(1900, seed=3))
+        report = monitor.report()
+        self.assertEqual(report["status"], "ok", report["alerts"])
+
+        monitor.update(_rows(2000, seed=4, shift=8.0, vehicles=("Auto", "eBike")))
+        report = monitor.report()
+        self.assertEqual(report["status"], "drift")
+        fired = {(alert["feature"], alert["metric"]) for alert in report["alerts"]}
+        self.assertIn(("ride_distance", "ks"), fired)
+        self.assertIn(("ride_distance", "psi"), fired)
+        self.assertIn(("vehicle_type", "chi2_p_value"), fired)
+        self.assertFalse(report["features"]["booking_hour"]["drifted"])
+        self.assertLess(report["computed_ms"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from src import feature_cache
+
+
+class TestFeatureCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_path = Path(self.tmp.name) / "bookings.csv"
+        self.cache_dir = Path(self.tmp.name) / "cache"
+        pd.DataFrame(
+            {
+                "Booking Status": ["Completed", "Cancelled by Driver", "No Driver Found", "Completed"],
+                "Date": ["2024-01-01", "2024-01-06", "2024-02-03", None],
+                "Time": ["10:15:00", "11:30:00", "22:00:00", "08:45:00"],
+                "Vehicle Type": ["Auto", "Bike", None, "Auto"],
+                "Ride Distance": [1.5, None, 3.0, 4.25],
+            }
+        ).to_csv(self.csv_path, index=False)
+
+    def test_second_load_is_a_cache_hit_with_identical_frame(self):
+        first, first_info = feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir)
+        second, second_info = feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir)
+        self.assertFalse(first_info["feature_cache_hit"])
+        self.assertTrue(second_info["feature_cache_hit"])
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_rebuild_and_changed_inputs_miss_the_cache(self):
+        feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir)
+        _, info = feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir, rebuild=True)
+        self.assertFalse(info["feature_cache_hit"])
+
+        with mock.patch.object(feature_cache, "preprocess_version", return_value="changed-logic"):
+            _, info = feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir)
+        self.assertFalse(info["feature_cache_hit"])
+
+        with open(self.csv_path, "a", encoding="utf-8") as handle:
+            handle.write("Completed,2024-03-01,09:00:00,Auto,2.0\n")
+        _, info = feature_cache.load_clean_data(self.csv_path, cache_dir=self.cache_dir)
+        self.assertFalse(info["feature_cache_hit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.inference import load_compiled_model, predict_batch, predict_frame
+from src.location_index import build_location_index, load_location_index, out_of_fold_features, save_location_index
+from src.train import build_pipeline, export_compiled_model
+
+
+def _bookings(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    locations = np.array(["Saket", "AIIMS", "Rohini", "Cyber Hub", "Jhilmil"])
+    df = pd.DataFrame(
+        {
+            "vehicle_type": rng.choice(["Auto", "Bike", "Go Mini"], n).astype(object),
+            "pickup_location": rng.choice(locations, n).astype(object),
+            "drop_location": rng.choice(locations, n).astype(object),
+            "avg_vtat": rng.uniform(2, 20, n),
+            "avg_ctat": rng.uniform(10, 40, n),
+        }
+    )
+    risky = (df["pickup_location"] == "Saket") | (df["drop_location"] == "Rohini")
+    df["is_cancelled"] = (risky ^ (rng.random(n) < 0.1)).astype(int)
+    return df
+
+
+class TestLocationIndex(unittest.TestCase):
+    def test_levels_are_shrunk_towards_the_global_value(self):
+        df = _bookings()
+        index = build_location_index(df, smoothing=10.0)
+        self.assertEqual(len(index.feature_names), 9)
+
+        saket = df[df["pickup_location"] == "Saket"]
+        weight = len(saket) / (len(saket) + 10.0)
+        expected_rate = weight * saket["is_cancelled"].mean() + (1 - weight) * df["is_cancelled"].mean()
+        features = dict(zip(index.feature_names, index.lookup("Saket", "AIIMS")))
+        self.assertAlmostEqual(features["pickup_cancel_rate"], expected_rate)
+
+        unseen = dict(zip(index.feature_names, index.lookup("Mars", ["not", "a", "location"])))
+        self.assertAlmostEqual(unseen["pickup_cancel_rate"], df["is_cancelled"].mean())
+        self.assertAlmostEqual(unseen["route_median_vtat"], df["avg_vtat"].median())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "location_index.json"
+            save_location_index(index, path)
+            loaded = load_location_index(path)
+        self.assertEqual(loaded.lookup("Saket", "Rohini"), index.lookup("Saket", "Rohini"))
+        np.testing.assert_allclose(
+            loaded.transform(df["pickup_location"], df["drop_location"]),
+            index.transform(df["pickup_location"], df["drop_location"]),
+        )
+
+    def test_out_of_fold_rows_never_see_their_own_label(self):
+        df = _bookings(200)
+        # Every pickup appears once, so its level value could only come from its own label.
+        df["pickup_location"] = [f"Stop {i}" for i in range(len(df))]
+        features = out_of_fold_features(df, n_folds=4)
+        self.assertNotIn("pickup_location", features.columns)
+        self.assertLessEqual(features["pickup_cancel_rate"].round(6).nunique(), 4)
+
+
+class TestLocationFeaturesInference(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        df = _bookings()
+        cls.pipeline, X_train, X_test, y_train, _ = build_pipeline(df, location_features=True)
+        cls.pipeline.set_params(classifier__n_estimators=15, classifier__n_jobs=1)
+        cls.pipeline.fit(X_train, y_train)
+        cls.X_test = X_test
+        cls.payloads = df.loc[X_test.index].drop(columns="is_cancelled").to_dict(orient="records")
+        cls.payloads.append({"vehicle_type": "Auto", "pickup_location": "Nowhere", "avg_vtat": 5.0})
+
+    def test_pipeline_drops_raw_locations(self):
+        self.assertNotIn("pickup_location", self.X_test.columns)
+        self.assertIn("route_cancel_rate", self.X_test.columns)
+        self.assertIsNotNone(self.pipeline.location_index)
+
+    def test_payloads_are_scored_through_the_index(self):
+        results = predict_batch(self.payloads, self.pipeline)
+        expected = self.pipeline.predict_proba(self.X_test)[:, 1]
+        for result, probability in zip(results, expected):
+            self.assertAlmostEqual(result["cancellation_probability"], probability, places=12)
+        self.assertIsNone(results[-1]["error"])
+
+        scored = predict_frame(pd.DataFrame(self.payloads), self.pipeline)
+        np.testing.assert_allclose(
+            scored["cancellation_probability"].to_numpy(dtype=float),
+            [result["cancellation_probability"] for result in results],
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model_compiled.npz"
+            export_compiled_model(self.pipeline, path)
+            compiled = load_compiled_model(path)
+        for result, reference in zip(predict_batch(self.payloads, compiled), results):
+            self.assertAlmostEqual(result["cancellation_probability"], reference["cancellation_probability"], places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src import inference
+from src.inference import (
+    extract_expected_columns,
+    load_compiled_model,
+    predict_batch,
+    predict_frame,
+    predict_with_probability_from_payload,
+)
+from src.train import build_pipeline, export_compiled_model
+
+
+def _fit_small_model():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "vehicle_type": rng.choice(["Auto", "Bike", "Go Mini"], n).astype(object),
+            "pickup_location": rng.choice(["Saket", "AIIMS", "Rohini", "Vaishali"], n).astype(object),
+            "ride_distance": rng.uniform(1, 40, n),
+            "avg_vtat": rng.uniform(2, 20, n),
+            "booking_hour": rng.integers(0, 24, n).astype("int64"),
+        }
+    )
+    df["is_cancelled"] = ((df["avg_vtat"] > 11) ^ (df["vehicle_type"] == "Auto")).astype(int)
+    pipeline, X_train, X_test, y_train, _ = build_pipeline(df)
+    pipeline.set_params(classifier__n_estimators=20, classifier__n_jobs=1)
+    pipeline.fit(X_train, y_train)
+    return pipeline, X_test
+
+
+class TestModelInference(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model, cls.X_test = _fit_small_model()
+        cls.payloads = cls.X_test.head(25).to_dict(orient="records")
+
+    def test_predict_batch_matches_single_row_path(self):
+        results = predict_batch(self.payloads, self.model)
+        self.assertEqual(len(results), len(self.payloads))
+        for payload, result in zip(self.payloads, results):
+            prediction, probability = predict_with_probability_from_payload(payload, self.model)
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["is_cancelled"], prediction)
+            self.assertAlmostEqual(result["cancellation_probability"], probability, places=12)
+
+    def test_predict_batch_reports_row_errors_in_order(self):
+        payloads = [self.payloads[0], {"booking_hour": 30}, {"ride_distance": "far"}, self.payloads[1]]
+        results = predict_batch(payloads, self.model)
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[1]["error"], "booking_hour must be between 0 and 23.")
+        self.assertIn("ride_distance", results[2]["error"])
+        self.assertIsNone(results[2]["is_cancelled"])
+        self.assertIsNone(results[3]["error"])
+
+    def test_values_the_model_would_reject_fail_only_their_row(self):
+        bad = [
+            {"ride_distance": "inf"},
+            {"ride_distance": float("-inf")},
+            {"avg_vtat": "1e400"},
+            {"booking_hour": float("inf")},
+            {"vehicle_type": ["Auto"]},
+            {"vehicle_type": {"name": "Auto"}},
+        ]
+        payloads = self.payloads[:3] + bad
+        results = predict_batch(payloads, self.model)
+        self.assertEqual([r["error"] is None for r in results], [True] * 3 + [False] * len(bad))
+        self.assertEqual(results[3]["error"], "Invalid numeric value for 'ride_distance': inf")
+        self.assertEqual(results[6]["error"], "booking_hour must be between 0 and 23.")
+        self.assertEqual(results[7]["error"], "Invalid categorical value for 'vehicle_type': ['Auto']")
+
+        scored = predict_frame(pd.DataFrame(payloads), self.model)
+        self.assertEqual(scored["error"].tolist(), [r["error"] for r in results])
+
+    def test_scoring_failure_falls_back_to_single_rows(self):
+        score_rows = inference._score_rows
+
+        def fails_on_marker(rows, model):
+            if (rows.numeric == 13.0).any():
+                raise ValueError("model rejected row")
+            return score_rows(rows, model)
+
+        payloads = [dict(payload) for payload in self.payloads[:4]]
+        payloads[2]["ride_distance"] = 13.0
+        expected = predict_batch(self.payloads[:4], self.model)
+        with mock.patch.object(inference, "_score_rows", side_effect=fails_on_marker):
+            results = predict_batch(payloads, self.model)
+        self.assertEqual(results[2]["error"], "model rejected row")
+        for position in (0, 1, 3):
+            self.assertEqual(results[position], expected[position])
+
+    def test_label_uses_saved_decision_threshold(self):
+        payload = self.payloads[0]
+        _, probability = predict_with_probability_from_payload(payload, self.model)
+        try:
+            self.model.decision_threshold = probability
+            self.assertEqual(predict_with_probability_from_payload(payload, self.model)[0], 0)
+            self.model.decision_threshold = probability - 1e-9
+            self.assertEqual(predict_with_probability_from_payload(payload, self.model)[0], 1)
+        finally:
+            del self.model.decision_threshold
+
+    def test_default_threshold_matches_predict_on_ties(self):
+        df = pd.DataFrame(
+            {
+                "vehicle_type": ["Auto"] * 4,
+                "avg_vtat": [5.0] * 4,
+                "is_cancelled": [0, 1, 0, 1],
+            }
+        )
+        pipeline, *_ = build_pipeline(df.iloc[[0, 1, 2, 3, 0, 1, 2, 3]].reset_index(drop=True))
+        pipeline.set_params(classifier__n_estimators=4, classifier__bootstrap=False, classifier__n_jobs=1)
+        X = df.drop(columns="is_cancelled")
+        pipeline.fit(X, df["is_cancelled"])
+        self.assertEqual(pipeline.predict_proba(X)[:, 1].tolist(), [0.5] * 4)
+
+        expected = pipeline.predict(X).tolist()
+        results = predict_batch(X.to_dict(orient="records"), pipeline)
+        self.assertEqual([result["is_cancelled"] for result in results], expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model_compiled.npz"
+            export_compiled_model(pipeline, path)
+            compiled = load_compiled_model(path)
+        results = predict_batch(X.to_dict(orient="records"), compiled)
+        self.assertEqual([result["is_cancelled"] for result in results], expected)
+
+    def test_extract_expected_columns_is_cached_per_model(self):
+        self.assertIs(extract_expected_columns(self.model), extract_expected_columns(self.model))
+
+    def test_compiled_model_matches_pipeline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model_compiled.npz"
+            export_compiled_model(self.model, path)
+            compiled = load_compiled_model(path)
+
+        payloads = self.X_test.to_dict(orient="records")
+        payloads.append({"vehicle_type": "Spaceship", "distance": 12.0, "booking_hour": 3})
+        expected = predict_batch(payloads, self.model)
+        actual = predict_batch(payloads, compiled)
+        for want, got in zip(expected, actual):
+            self.assertEqual(got["is_cancelled"], want["is_cancelled"])
+            self.assertAlmostEqual(got["cancellation_probability"], want["cancellation_probability"], delta=1e-9)
+
+        with self.assertRaisesRegex(ValueError, "booking_hour must be between 0 and 23."):
+            predict_with_probability_from_payload({"booking_hour": 24}, compiled)
+
+
+if __name__ == "__main__":
+    unittest.main()
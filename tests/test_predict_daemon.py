@@ -0,0 +1,71 @@
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import joblib
+
+from src import predict
+from src.inference import predict_batch
+from tests.test_model_inference import _fit_small_model
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestScoringDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model, _ = _fit_small_model()
+        cls.payloads = [
+            {"vehicle_type": "Auto", "ride_distance": 12.0, "avg_vtat": 15.0, "booking_hour": 9},
+            {"vehicle_type": "Bike", "distance": "4.5"},
+            {"booking_hour": 30},
+        ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.model_path = Path(tmp.name) / "model.pkl"
+        self.socket_path = Path(tmp.name) / "predict.sock"
+        joblib.dump(self.model, self.model_path)
+
+    def start_daemon(self):
+        server = predict.ScoringDaemon(self.socket_path, self.model_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.addCleanup(stop)
+        return server
+
+    def test_forwarded_payloads_match_in_process_scoring(self):
+        self.start_daemon()
+        results = predict.score_via_daemon(self.payloads, self.model_path, self.socket_path)
+        expected = predict_batch(self.payloads, self.model)
+        self.assertEqual([result["error"] for result in results], [result["error"] for result in expected])
+        for result, reference in zip(results[:2], expected[:2]):
+            self.assertEqual(result["is_cancelled"], reference["is_cancelled"])
+            self.assertAlmostEqual(result["cancellation_probability"], reference["cancellation_probability"])
+
+    def test_client_falls_back_without_a_matching_daemon(self):
+        self.assertIsNone(predict.score_via_daemon(self.payloads, self.model_path, self.socket_path))
+        self.start_daemon()
+        other_model = self.model_path.with_name("other.pkl")
+        self.assertIsNone(predict.score_via_daemon(self.payloads, other_model, self.socket_path))
+
+    def test_stale_socket_is_replaced_and_a_live_one_is_not(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(self.socket_path))
+        stale.close()
+        self.start_daemon()
+        self.assertIsNotNone(predict.score_via_daemon(self.payloads[:1], self.model_path, self.socket_path))
+        with self.assertRaises(RuntimeError):
+            predict.ScoringDaemon(self.socket_path, self.model_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+from src import inference
+from src.inference import predict_batch, predict_with_probability_from_payload
+from src.prediction_cache import LocalBackend, PredictionCache, RedisBackend
+from tests.test_model_inference import _fit_small_model
+
+
+class FakeRedis:
+    """Stand-in for redis.Redis shared by several caches."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode("utf-8")
+
+
+class TestLocalBackend(unittest.TestCase):
+    def test_lru_eviction_and_ttl(self):
+        now = [0.0]
+        backend = LocalBackend(max_entries=2, ttl_s=10, clock=lambda: now[0])
+        backend.set("a", (1, 0.9))
+        backend.set("b", (0, 0.1))
+        self.assertEqual(backend.get("a"), (1, 0.9))
+        backend.set("c", (0, 0.2))
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(len(backend), 2)
+
+        now[0] = 10.0
+        self.assertIsNone(backend.get("a"))
+        self.assertIsNone(backend.get("c"))
+        self.assertEqual(len(backend), 0)
+
+
+class TestPredictionCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model, X_test = _fit_small_model()
+        cls.payloads = X_test.head(5).to_dict(orient="records")
+
+    def test_repeated_payload_is_served_from_cache(self):
+        cache = PredictionCache(LocalBackend(100, 60))
+        expected = predict_with_probability_from_payload(self.payloads[0], self.model)
+        first = predict_with_probability_from_payload(self.payloads[0], self.model, cache, "v1")
+        with mock.patch.object(inference, "_score_rows", side_effect=AssertionError("model was called")):
+            second = predict_with_probability_from_payload(self.payloads[0], self.model, cache, "v1")
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Aliases that canonicalise to the same model row share the entry.
+        payload = {"booking_hour": 10, "ride_distance": 3}
+        predict_with_probability_from_payload(payload, self.model, cache, "v1")
+        predict_with_probability_from_payload({"booking_hour": 10.0, "distance": "3"}, self.model, cache, "v1")
+        self.assertEqual(cache.hits, 2)
+
+        predict_with_probability_from_payload(self.payloads[0], self.model, cache, "v2")
+        self.assertEqual(cache.misses, 3)
+
+    def test_batch_scores_only_misses_and_matches_uncached(self):
+        cache = PredictionCache(LocalBackend(100, 60))
+        predict_batch(self.payloads[:2], self.model, cache, "v1")
+        payloads = self.payloads + [{"booking_hour": 99}]
+        with mock.patch.object(inference, "_score_rows", wraps=inference._score_rows) as score_rows:
+            results = predict_batch(payloads, self.model, cache, "v1")
+        self.assertEqual(len(score_rows.call_args.args[0]), 3)
+        self.assertEqual(results, predict_batch(payloads, self.model))
+
+    def test_shared_backend_is_seen_by_other_workers(self):
+        client = FakeRedis()
+        worker_a = PredictionCache(RedisBackend(client, ttl_s=60))
+        worker_b = PredictionCache(RedisBackend(client, ttl_s=60))
+        result = predict_with_probability_from_payload(self.payloads[0], self.model, worker_a, "v1")
+        self.assertEqual(predict_with_probability_from_payload(self.payloads[0], self.model, worker_b, "v1"), result)
+        self.assertEqual((worker_b.hits, worker_b.misses), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.inference import build_model_row, extract_expected_columns
+from src.prediction_log import PredictionLogger, read_prediction_log
+from tests.test_model_inference import _fit_small_model
+
+
+class TestPredictionLog(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model, X_test = _fit_small_model()
+        cls.payloads = X_test.head(20).to_dict(orient="records")
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = Path(self.tmp.name)
+
+    def test_logged_rows_round_trip_with_rotation(self):
+        logger = PredictionLogger(self.directory, max_segment_bytes=1)
+        logger.start()
+        for i, payload in enumerate(self.payloads):
+            self.assertTrue(logger.log(payload, self.model, i % 2, i / 100, "run:a", 1.5))
+            # Let the writer drain so each record lands in its own segment.
+            time.sleep(0.005)
+        logger.stop()
+
+        self.assertGreater(len(list(self.directory.glob("predictions-*.jsonl"))), 1)
+        logged = read_prediction_log(self.directory)
+        self.assertEqual(len(logged), len(self.payloads))
+        categorical_cols, numerical_cols, expected_cols = extract_expected_columns(self.model)
+        for (_, row), payload in zip(logged.iterrows(), self.payloads):
+            expected = build_model_row(payload, categorical_cols, numerical_cols)
+            self.assertEqual({col: row[col] for col in expected_cols}, expected)
+        self.assertEqual(list(logged["_probability"]), [i / 100 for i in range(len(self.payloads))])
+        self.assertEqual(logger.stats()["written"], len(self.payloads))
+
+        self.assertEqual(len(read_prediction_log(self.directory, max_rows=5)), 5)
+        self.assertTrue(read_prediction_log(self.directory, model_version="run:b").empty)
+
+    def test_full_queue_drops_without_blocking(self):
+        logger = PredictionLogger(self.directory, max_queue=3)
+        # Not started: nothing drains the queue.
+        started = time.perf_counter()
+        accepted = [logger.log(payload, self.model, 0, 0.1, "run:a", 1.0) for payload in self.payloads]
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(accepted.count(True), 3)
+        self.assertEqual(logger.stats()["dropped"], len(self.payloads) - 3)
+
+        logger.start()
+        logger.stop()
+        self.assertEqual(len(read_prediction_log(self.directory)), 3)
+
+    def test_partial_trailing_line_is_skipped(self):
+        logger = PredictionLogger(self.directory)
+        logger.start()
+        logger.log(self.payloads[0], self.model, 1, 0.9, "run:a", 2.0)
+        logger.stop()
+        segment = next(self.directory.glob("predictions-*.jsonl"))
+        with open(segment, "a", encoding="utf-8") as handle:
+            handle.write('{"ts": 1, "row": {"vehicle')
+        self.assertEqual(len(read_prediction_log(self.directory)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
+import tempfile
 import unittest
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from src.inference import build_model_row
-from src.preprocess import clean_data
+from src.inference import PayloadSchema, build_model_row
+from src.preprocess import clean_data, clean_data_chunked, load_data
 
 
 class TestPreprocessAndInference(unittest.TestCase):
@@ -27,6 +30,65 @@ class TestPreprocessAndInference(unittest.TestCase):
         self.assertIn("booking_hour", clean.columns)
         self.assertNotIn("date", clean.columns)
 
+    def test_clean_data_returns_compact_dtypes(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        raw = pd.DataFrame(
+            {
+                "Booking Status": rng.choice(["Completed", "Cancelled by Driver"], n),
+                "Time": rng.choice(["10:15", "22:00"], n),
+                "Ride Distance": rng.uniform(1, 40, n),
+                "Avg VTAT": rng.integers(1, 20, n),
+                "Booking Value": rng.integers(50, 3000, n),
+                "Vehicle Type": rng.choice(["Auto", "Bike", "eBike"], n),
+            }
+        )
+        clean = clean_data(raw)
+        expected = {
+            "ride_distance": np.dtype("float32"),
+            "avg_vtat": np.dtype("int8"),
+            "booking_value": np.dtype("int16"),
+            "booking_hour": np.dtype("int8"),
+            "is_cancelled": np.dtype("int8"),
+        }
+        self.assertEqual({col: clean[col].dtype for col in expected}, expected)
+        self.assertEqual(list(clean["vehicle_type"].cat.categories), ["Auto", "Bike", "eBike"])
+
+        wide = clean.astype({col: "int64" for col in expected if col != "ride_distance"})
+        wide = wide.astype({"ride_distance": "float64", "vehicle_type": object})
+        self.assertLess(clean.memory_usage(deep=True).sum(), wide.memory_usage(deep=True).sum() / 4)
+
+    def test_clean_data_chunked_matches_in_memory(self):
+        rng = np.random.default_rng(7)
+        n = 53
+        statuses = ["Completed", "cancelled by driver", " No Driver Found ", "Incomplete", None, "unknown"]
+        raw = pd.DataFrame(
+            {
+                "Booking Status": rng.choice(np.array(statuses, dtype=object), n),
+                "Date": rng.choice(["2024-03-01", "2024-03-02", None], n),
+                "Time": rng.choice(["10:15:00", "23:59:59", "7:05:00", "bad"], n),
+                "Pickup Location": rng.choice(["Saket", "AIIMS", None], n),
+                # Empty for the first chunks, populated later.
+                "Payment Method": [None] * 20 + list(rng.choice(["UPI", "Cash"], n - 20)),
+                # Parsed as numbers in the first chunks and as text later.
+                "Vehicle Code": list(rng.choice(["1", "2", "07"], 30)) + list(rng.choice(["A", "B", "2"], n - 30)),
+                "Ride Distance": np.where(rng.random(n) < 0.3, np.nan, rng.integers(1, 30, n)),
+                "Customer Rating": rng.choice([4.0, 4.5, np.nan], n),
+                "Avg VTAT": rng.integers(1, 9, n),
+                "Region": ["NCR"] * n,
+                "Booking ID": [f"b{i}" for i in range(n)],
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "bookings.csv"
+            raw.to_csv(csv_path, index=False)
+            expected = clean_data(load_data(csv_path))
+            output = clean_data_chunked(csv_path, Path(tmp) / "clean.parquet", chunksize=6)
+            actual = pd.read_parquet(output)
+
+        self.assertNotIn("region", actual.columns)
+        pd.testing.assert_frame_equal(actual, expected)
+
     def test_build_model_row_maps_aliases(self):
         payload = {"distance": 4.5, "booking_hour": 10}
         row = build_model_row(
@@ -37,6 +99,45 @@ class TestPreprocessAndInference(unittest.TestCase):
         self.assertEqual(row["ride_distance"], 4.5)
         self.assertEqual(row["booking_hour"], 10.0)
 
+    def test_payload_schema_encodes_expected_rows(self):
+        categorical_cols = ["pickup_location", "time"]
+        numerical_cols = ["ride_distance", "avg_vtat"]
+        schema = PayloadSchema(categorical_cols, numerical_cols)
+        payloads = [
+            {"pickup_location": "Saket", "distance": "4.5", "booking_hour": 7.9, "extra": 1},
+            {"avg_vtat": None},
+            {"ride_distance": "far"},
+            {"booking_hour": 24},
+            {"distance": None},
+            {},
+            {"ride_distance": 2, "distance": 6, "avg_vtat": True, "time": "18:30"},
+        ]
+        expected = {
+            0: {"pickup_location": "Saket", "time": "07:00", "ride_distance": 4.5, "avg_vtat": 0.0},
+            5: {"pickup_location": "unknown", "time": "unknown", "ride_distance": 0.0, "avg_vtat": 0.0},
+            # The alias wins over the model column and booleans become floats.
+            6: {"pickup_location": "unknown", "time": "18:30", "ride_distance": 6.0, "avg_vtat": 1.0},
+        }
+
+        rows, positions, errors = schema.encode_rows(payloads)
+        self.assertEqual(positions, list(expected))
+        self.assertEqual([rows.row(i) for i in range(len(positions))], list(expected.values()))
+        self.assertEqual(list(rows.frame().columns), categorical_cols + numerical_cols)
+        self.assertEqual(errors[1], "Invalid numeric value for 'avg_vtat': None")
+        self.assertEqual(errors[2], "Invalid numeric value for 'ride_distance': far")
+        self.assertEqual(errors[3], "booking_hour must be between 0 and 23.")
+        for index, row in expected.items():
+            self.assertEqual(build_model_row(payloads[index], categorical_cols, numerical_cols), row)
+        with self.assertRaises(TypeError):
+            schema.encode(payloads[4])
+
+        # With a booking_hour column the hour is stored as a number, not a time label.
+        hour_schema = PayloadSchema(["time"], ["booking_hour", "ride_distance"])
+        self.assertEqual(
+            hour_schema.encode({"booking_hour": "9", "ride_distance": " 3.25 "}),
+            {"time": "unknown", "booking_hour": 9.0, "ride_distance": 3.25},
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
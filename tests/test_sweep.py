@@ -0,0 +1,85 @@
+import threading
+import unittest
+
+from app.sweep import PredictionAPIError, build_grid, grid_values, score_payloads
+
+
+class _Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class _FakeSession:
+    """Scores ``booking_hour / 100``; rejects hours above 23 like the API."""
+
+    def __init__(self, batch=True):
+        self.batch = batch
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _score(payload):
+        if payload["booking_hour"] > 23:
+            return None
+        return {"is_cancelled": 0, "cancellation_probability": payload["booking_hour"] / 100}
+
+    def post(self, url, json, timeout):
+        with self._lock:
+            self.calls.append(url)
+        if url.endswith("/batch"):
+            if not self.batch:
+                return _Response(405, {"detail": "Method Not Allowed"})
+            results = []
+            for row in json["rows"]:
+                scored = self._score(row)
+                results.append({**scored, "error": None} if scored else {"error": "booking_hour must be between 0 and 23."})
+            return _Response(200, {"results": results})
+        scored = self._score(json)
+        if scored is None:
+            return _Response(422, {"detail": "booking_hour must be between 0 and 23."})
+        return _Response(200, scored)
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        hours = grid_values("booking_hour", 0, 24, 25)
+        self.grid = build_grid({"vehicle_type": "Auto"}, "booking_hour", hours, "ride_distance", [2.0, 9.5])
+
+    def test_grid_crosses_the_sweep_and_series_fields(self):
+        self.assertEqual(grid_values("booking_hour", 0, 23, 24), list(range(24)))
+        self.assertEqual(len(self.grid), 50)
+        self.assertEqual(self.grid[25], {"vehicle_type": "Auto", "booking_hour": 0, "ride_distance": 9.5})
+
+    def test_batch_chunks_keep_order(self):
+        session = _FakeSession()
+        results, endpoint = score_payloads(session, "http://api/predict", self.grid, chunk_rows=7)
+        self.assertEqual(endpoint, "batch")
+        self.assertEqual(len(session.calls), 8)
+        self.assertEqual([r.get("cancellation_probability") for r in results[:3]], [0.0, 0.01, 0.02])
+        self.assertIsNotNone(results[24]["error"])
+
+    def test_falls_back_to_single_predictions_without_a_batch_endpoint(self):
+        session = _FakeSession(batch=False)
+        batch_results, _ = score_payloads(_FakeSession(), "http://api/predict", self.grid)
+        results, endpoint = score_payloads(session, "http://api/predict", self.grid)
+        self.assertEqual(endpoint, "single")
+        self.assertEqual(len(session.calls), 1 + len(self.grid))
+        self.assertEqual(
+            [r["cancellation_probability"] for r in results], [r.get("cancellation_probability") for r in batch_results]
+        )
+        self.assertEqual(results[24]["error"], "booking_hour must be between 0 and 23.")
+
+    def test_server_errors_are_raised(self):
+        session = _FakeSession()
+        session.post = lambda url, json, timeout: _Response(500, {"detail": "Prediction failed: boom"})
+        with self.assertRaises(PredictionAPIError):
+            score_payloads(session, "http://api/predict", self.grid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_info
+
+from src.inference import load_compiled_model, predict_batch, predict_with_probability_from_payload
+from src.train import (
+    build_pipeline,
+    export_compiled_model,
+    fit_warm_start,
+    limit_openmp_threads,
+    load_search_space,
+    measure_serving_cost,
+    parse_args,
+    run_search,
+    save_model,
+    split_cpu_budget,
+    stratified_subsample,
+    track_peak_memory,
+)
+
+
+def _small_frame():
+    rng = np.random.default_rng(1)
+    n = 240
+    df = pd.DataFrame(
+        {
+            "vehicle_type": rng.choice(["Auto", "Bike", "Go Mini"], n).astype(object),
+            "ride_distance": rng.uniform(1, 40, n),
+            "avg_vtat": rng.uniform(2, 20, n),
+        }
+    )
+    df["is_cancelled"] = ((df["avg_vtat"] > 11) ^ (df["vehicle_type"] == "Auto")).astype(int)
+    return df
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def test_cpu_budget_is_never_oversubscribed(self):
+        self.assertEqual(split_cpu_budget(8, 40), (8, 1))
+        self.assertEqual(split_cpu_budget(8, 2), (2, 4))
+        self.assertEqual(split_cpu_budget(1, 10), (1, 1))
+        for budget, tasks in [(6, 4), (16, 3), (3, 100)]:
+            outer, inner = split_cpu_budget(budget, tasks)
+            self.assertLessEqual(outer * inner, budget)
+
+    def test_search_space_file_prefixes_classifier_params(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "space.json"
+            path.write_text(json.dumps({"n_estimators": [5, 10], "preprocessor__remainder": ["drop"]}))
+            space = load_search_space(path)
+        self.assertEqual(space, {"classifier__n_estimators": [5, 10], "preprocessor__remainder": ["drop"]})
+
+    def test_run_search_refits_best_candidate(self):
+        pipeline, X_train, _, y_train, _ = build_pipeline(_small_frame())
+        space = {"classifier__n_estimators": [5, 10], "classifier__min_samples_leaf": [1, 4]}
+        best, results = run_search(pipeline, X_train, y_train, space, mode="grid", cv=2, cpu_budget=1)
+
+        self.assertEqual(len(results["params"]), 4)
+        best_params = results["params"][int(np.argmin(results["rank_test_roc_auc"]))]
+        for name, value in best_params.items():
+            self.assertEqual(best.get_params()[name], value)
+        self.assertEqual(best.get_params()["classifier__n_jobs"], -1)
+        self.assertTrue(hasattr(best.named_steps["classifier"], "estimators_"))
+
+        _, results = run_search(pipeline, X_train, y_train, space, mode="random", n_iter=3, cv=2, cpu_budget=1)
+        self.assertEqual(len(results["params"]), 3)
+
+
+def _openmp_threads():
+    import sklearn.ensemble._hist_gradient_boosting.gradient_boosting  # noqa: F401  (loads OpenMP)
+
+    return {info["num_threads"] for info in threadpool_info() if info["user_api"] == "openmp"}
+
+
+class TestHyperparameterSearchThreads(unittest.TestCase):
+    def test_openmp_threads_are_capped_here_and_in_search_workers(self):
+        with limit_openmp_threads(3):
+            self.assertEqual(_openmp_threads(), {3})
+            workers = joblib.Parallel(n_jobs=2)(joblib.delayed(_openmp_threads)() for _ in range(2))
+        self.assertEqual(workers, [{3}, {3}])
+
+    def test_run_search_fits_the_gradient_booster_within_the_budget(self):
+        pipeline, X_train, _, y_train, _ = build_pipeline(_small_frame(), model_type="hist_gradient_boosting")
+        space = {"classifier__max_iter": [10, 20]}
+        best, results = run_search(pipeline, X_train, y_train, space, mode="grid", cv=2, cpu_budget=2)
+        self.assertEqual(len(results["params"]), 2)
+        self.assertTrue(hasattr(best.named_steps["classifier"], "n_iter_"))
+
+
+class TestModelBackends(unittest.TestCase):
+    def test_hist_gradient_boosting_scores_payloads_and_skips_compiled_export(self):
+        pipeline, X_train, X_test, y_train, y_test = build_pipeline(_small_frame(), model_type="hist_gradient_boosting")
+        pipeline.set_params(classifier__max_iter=20)
+        pipeline.fit(X_train, y_train)
+        self.assertGreater(pipeline.score(X_test, y_test), 0.8)
+
+        payloads = X_test.head(5).to_dict(orient="records")
+        payloads.append({"vehicle_type": "Rickshaw", "ride_distance": 3.0})
+        results = predict_batch(payloads, pipeline)
+        for payload, result in zip(payloads, results):
+            self.assertIsNone(result["error"])
+            _, probability = predict_with_probability_from_payload(payload, pipeline)
+            self.assertAlmostEqual(result["cancellation_probability"], probability, places=12)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesRegex(ValueError, "HistGradientBoostingClassifier"):
+                export_compiled_model(pipeline, Path(tmp) / "model_compiled.npz")
+            model_path = Path(tmp) / "model.pkl"
+            save_model(pipeline, model_path)
+            cost = measure_serving_cost(model_path, X_test)
+        self.assertEqual(
+            set(cost),
+            {
+                "model_size_mb",
+                "model_load_seconds",
+                "single_row_latency_ms_p50",
+                "single_row_latency_ms_p99",
+                "batch_latency_ms_per_row",
+            },
+        )
+        self.assertGreater(cost["model_size_mb"], 0)
+
+    def test_unknown_model_type_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Unknown model type"):
+            build_pipeline(_small_frame(), model_type="svm")
+
+
+class TestMemoryBoundedTraining(unittest.TestCase):
+    def test_capped_categories_share_one_level_and_compile(self):
+        df = _small_frame()
+        rare = ["Rickshaw", "Bike XL", "eBike"]
+        df.loc[: len(rare) - 1, "vehicle_type"] = rare
+        pipeline, X_train, X_test, y_train, _ = build_pipeline(df, min_category_frequency=5)
+        pipeline.set_params(classifier__n_estimators=10)
+        # Make sure every rare level is seen during fit, whichever side of the split it fell on.
+        head = df.head(len(rare))
+        pipeline.fit(pd.concat([X_train, head.drop(columns="is_cancelled")]), pd.concat([y_train, head["is_cancelled"]]))
+        encoder = pipeline.named_steps["preprocessor"].named_transformers_["cat"]
+        self.assertEqual(len(encoder.get_feature_names_out()), 4)
+
+        payloads = X_test.head(10).to_dict(orient="records")
+        payloads += [{"vehicle_type": level, "ride_distance": 5.0, "avg_vtat": 14.0} for level in rare + ["Unseen"]]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model_compiled.npz"
+            export_compiled_model(pipeline, path)
+            compiled = load_compiled_model(path)
+        for expected, actual in zip(predict_batch(payloads, pipeline), predict_batch(payloads, compiled)):
+            self.assertAlmostEqual(actual["cancellation_probability"], expected["cancellation_probability"], places=12)
+
+    def test_min_category_frequency_flag_accepts_counts_and_shares(self):
+        self.assertEqual(parse_args(["--min-category-frequency", "0.05"]).min_category_frequency, 0.05)
+        args = parse_args(["--min-category-frequency", "5"])
+        self.assertIsInstance(args.min_category_frequency, int)
+        for value in ["0", "2.5"]:
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                parse_args(["--min-category-frequency", value])
+
+        for model_type in ["random_forest", "hist_gradient_boosting"]:
+            pipeline, X_train, _, y_train, _ = build_pipeline(
+                _small_frame(), model_type=model_type, min_category_frequency=args.min_category_frequency
+            )
+            size = {"classifier__n_estimators": 5} if model_type == "random_forest" else {"classifier__max_iter": 5}
+            pipeline.set_params(**size)
+            pipeline.fit(X_train, y_train)
+
+    def test_subsample_keeps_class_balance(self):
+        _, X_train, _, y_train, _ = build_pipeline(_small_frame())
+        X_sub, y_sub = stratified_subsample(X_train, y_train, 0.5)
+        self.assertEqual(len(X_sub), len(X_train) // 2)
+        self.assertAlmostEqual(y_sub.mean(), y_train.mean(), places=1)
+        self.assertEqual(len(stratified_subsample(X_train, y_train, 60)[0]), 60)
+        self.assertIs(stratified_subsample(X_train, y_train, None)[0], X_train)
+
+    def test_warm_start_grows_the_forest_per_chunk(self):
+        pipeline, X_train, X_test, y_train, y_test = build_pipeline(_small_frame())
+        pipeline.set_params(classifier__n_estimators=12, classifier__n_jobs=1)
+        with track_peak_memory() as memory:
+            history = fit_warm_start(pipeline, X_train, y_train, n_chunks=3, patience=0)
+        self.assertEqual([entry["trees"] for entry in history], [4, 8, 12])
+        self.assertEqual(len(pipeline.named_steps["classifier"].estimators_), 12)
+        self.assertFalse(pipeline.named_steps["classifier"].warm_start)
+        self.assertGreater(pipeline.score(X_test, y_test), 0.8)
+        self.assertGreater(memory["peak_rss_mb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()